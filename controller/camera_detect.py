@@ -1,15 +1,28 @@
 from datetime import datetime
+import os
 import cv2
 import numpy as np
 import sys
-from PySide6.QtCore import Qt, QObject 
-from PySide6.QtWidgets import QMessageBox, QDialog
+from PySide6.QtCore import Qt, QObject, QTimer
+from PySide6.QtWidgets import QMessageBox, QDialog, QPushButton, QMenu, QFileDialog, QInputDialog, QSlider
 
 from module.detection_thread import DetectionThread
 from module.detection_thread import FrameSkipDialog
+from module.tracking import BoxTracker
+from module.frame_skip import AdaptiveFrameSkip
+from module.frame_writer import FrameWriterPool
+from module.session_store import SessionStore
+from module.frame_pool import FramePool
+from module.motion import MotionGate
+from module.roi import RegionInference
+from module.roi_dialog import RoiDialog
 from module.model import model_instance
 from module.image_utils import ImageUtils
 from module.data_exporter import DataExporter
+from module.detections import Detections
+from module.resolution import AdaptiveResolution
+from module.scheduler import InferenceScheduler
+from module.camera_grid import CameraGrid
 
 if sys.platform.startswith("win"):
     from pygrabber.dshow_graph import FilterGraph
@@ -18,8 +31,13 @@ class CameraDetector(QObject):
     def __init__(self, ui, settings):
         super().__init__()
         self.ui = ui
-        self.thread = None
+        self.thread = None  # Luồng camera chính (dùng cho chụp và lưu dữ liệu)
+        self.threads = {}  # {camera_index: DetectionThread} của tất cả camera đang mở
+        self.camera_detections = {}  # {camera_index: Detections} mới nhất của từng camera
+        self.grid = CameraGrid()
+        self.scheduler = None  # InferenceScheduler dùng chung của tab này (giải phóng khi không còn dùng)
         self.current_frame = None
+        self.model = model_instance  # Model dùng cho tab camera (mặc định là model đang hoạt động)
         self.image_utils = ImageUtils()
         self.settings = settings
         self.data_exporter = DataExporter(settings=self.settings)
@@ -27,6 +45,24 @@ class CameraDetector(QObject):
         self.setup_ui_connections()
         self.setup_camera_list()
         
+    def set_model(self, model=None):
+        """
+        Choose the model used by this tab
+
+        Args:
+            model: Loaded YOLOModel, or None to follow the active model
+        """
+        self.model = model or model_instance
+
+        # Regions and the batching scheduler are bound to a model: rebuild them for the new one
+        batching = any(thread.scheduler is not None for thread in self.threads.values())
+        scheduler = self.create_scheduler() if batching else None
+        for thread in self.threads.values():
+            thread.model = self.model
+            thread.roi = RegionInference.from_settings(self.model, self.settings, self.roi_key(thread))
+            if thread.scheduler is not None:
+                thread.scheduler = scheduler
+
     def setup_ui(self):
         """Configure initial UI components and states"""
         # Configure image display frames
@@ -40,6 +76,40 @@ class CameraDetector(QObject):
         self.ui.buttonCapture.setEnabled(False)
         self.ui.buttonSaveAllDetectCam.setEnabled(False)
         
+        # Nút mở thêm camera (nhiều camera dùng chung một model, hiển thị dạng lưới)
+        self.buttonAddCamera = QPushButton("Thêm camera", self.ui.tabCamera)
+        self.buttonAddCamera.setMinimumSize(120, 30)
+        self.buttonAddCamera.setToolTip("Mở thêm camera đang chọn, các camera dùng chung model đã tải")
+        self.buttonAddCamera.setEnabled(False)
+        self.ui.CameraSelection.addWidget(self.buttonAddCamera)
+        
+        # Nguồn khác camera: tệp video, thư mục ảnh, luồng mạng
+        self.buttonOpenSource = QPushButton("Mở nguồn khác", self.ui.tabCamera)
+        self.buttonOpenSource.setMinimumSize(120, 30)
+        self.buttonOpenSource.setToolTip("Thêm tệp video, thư mục ảnh hoặc địa chỉ luồng (RTSP/HTTP) vào danh sách")
+        source_menu = QMenu(self.buttonOpenSource)
+        source_menu.addAction("Tệp video...", self.add_video_source)
+        source_menu.addAction("Thư mục ảnh...", self.add_image_folder_source)
+        source_menu.addAction("Địa chỉ luồng...", self.add_stream_source)
+        self.buttonOpenSource.setMenu(source_menu)
+        self.ui.CameraSelection.addWidget(self.buttonOpenSource)
+        
+        # Vùng quan tâm: chỉ các vùng này được đưa vào model
+        self.buttonRoi = QPushButton("Vùng quan tâm", self.ui.tabCamera)
+        self.buttonRoi.setMinimumSize(120, 30)
+        self.buttonRoi.setToolTip("Vẽ các vùng cần nhận diện trên khung hình hiện tại (lưu riêng cho từng nguồn)")
+        self.ui.CameraSelection.addWidget(self.buttonRoi)
+        
+        # Thanh tua cho tệp video / thư mục ảnh
+        self.sliderSeek = QSlider(Qt.Horizontal, self.ui.tabCamera)
+        self.sliderSeek.setMinimumWidth(150)
+        self.sliderSeek.setVisible(False)
+        self.ui.CameraSelection.addWidget(self.sliderSeek)
+        
+        # Lưới camera được vẽ lại theo nhịp cố định thay vì mỗi frame của mỗi camera
+        self.grid_timer = QTimer(self)
+        self.grid_timer.timeout.connect(self.refresh_grid)
+        
         # Hiển thị trạng thái khởi tạo
         self.ui.statusbar.showMessage("Sẵn sàng. Vui lòng chọn camera để bắt đầu.")
    
@@ -49,6 +119,9 @@ class CameraDetector(QObject):
         self.ui.buttonDetect.clicked.connect(self.toggle_detection)
         self.ui.buttonCapture.clicked.connect(self.capture_frame)
         self.ui.buttonSaveAllDetectCam.clicked.connect(self.save_all_data_detect_cam)
+        self.buttonAddCamera.clicked.connect(self.add_camera)
+        self.sliderSeek.sliderReleased.connect(self.seek_source)
+        self.buttonRoi.clicked.connect(self.edit_regions)
         
     def setup_camera_list(self):
         """Scan for available cameras and populate the dropdown list"""
@@ -95,24 +168,24 @@ class CameraDetector(QObject):
                 return
                 
             # Initialize detection thread
-            self.thread = DetectionThread(camera_index)
-            self.thread.frame_signal.connect(self.update_camera_feed)
-            self.thread.error_signal.connect(self.handle_camera_error)
-            self.thread.detection_signal.connect(self.update_detections_info)
-            self.thread.start()
+            self.thread = self.open_stream(camera_index)
             
             # Update UI state
             self.ui.buttonStartRecord.setText("Dừng nhận hình ảnh")
             self.ui.buttonDetect.setEnabled(True)
-            self.ui.comboBoxChooseCamera.setEnabled(False)
+            self.buttonAddCamera.setEnabled(True)
             self.ui.statusbar.showMessage("Camera đang hoạt động")
         else:
             # Stop camera
             if self.thread.detecting:
                 self.toggle_detection()  # Stop detection if running
             
-            self.thread.stop_capture()
+            for camera_index in list(self.threads):
+                self.close_stream(camera_index)
             self.thread = None
+            self.grid_timer.stop()
+            self.grid.clear()
+            self.sliderSeek.setVisible(False)
             
             # Clear display frames
             self.ui.frameCameraBindingBox.clear()
@@ -124,8 +197,146 @@ class CameraDetector(QObject):
             self.ui.buttonDetect.setText("Bắt đầu nhận diện")
             self.ui.buttonCapture.setEnabled(False)
             self.ui.buttonSaveAllDetectCam.setEnabled(False)
-            self.ui.comboBoxChooseCamera.setEnabled(True)
+            self.buttonAddCamera.setEnabled(False)
             self.ui.statusbar.showMessage("Camera đã dừng")
+
+    def open_stream(self, camera_index):
+        """Start a detection thread for a camera and register it"""
+        thread = DetectionThread(self.source_for_index(camera_index), model=self.model)
+        thread.capture_fps = self.settings.capture_fps
+        thread.fast_mode = bool(self.settings.source_fast_mode)
+        thread.tracker = BoxTracker.from_settings(self.settings)
+        thread.motion_gate = MotionGate.from_settings(self.settings)
+        thread.roi = RegionInference.from_settings(self.model, self.settings, self.roi_key(thread))
+        thread.writer = FrameWriterPool.from_settings(
+            self.settings, on_drop=thread.forget_temp_frame, on_written=thread.temp_frame_written
+        )
+        thread.frame_pool = FramePool.from_settings(self.settings)
+        thread.temp_store = SessionStore.from_settings(os.path.join(thread.temp_dir, "store"), self.settings)
+        thread.record_session = bool(self.settings.session_recording)
+        thread.session_codec = self.settings.session_codec
+        thread.source_finished_signal.connect(lambda index=camera_index: self.handle_source_finished(index))
+        thread.frame_signal.connect(lambda frames, index=camera_index: self.handle_stream_frames(index, frames))
+        thread.error_signal.connect(lambda message, index=camera_index: self.handle_stream_error(index, message))
+        thread.detection_signal.connect(
+            lambda detections, index=camera_index: self.update_detections_info(detections, index)
+        )
+        self.threads[camera_index] = thread
+        self.grid.update(camera_index, {}, label=self.ui.comboBoxChooseCamera.itemText(camera_index))
+        thread.start()
+        return thread
+
+    def close_stream(self, camera_index):
+        """Stop and unregister the detection thread of a camera"""
+        thread = self.threads.pop(camera_index, None)
+        if thread is None:
+            return
+        thread.stop_capture()
+        self.grid.remove(camera_index)
+        self.camera_detections.pop(camera_index, None)
+        if not self.threads:
+            self.release_scheduler()
+
+    def source_for_index(self, index):
+        """Return the source of a list entry: its stored path/URL, or the camera index"""
+        data = self.ui.comboBoxChooseCamera.itemData(index)
+        return data if data is not None else index
+
+    def add_source(self, label, source):
+        """Add a video file, image folder or stream to the source list and select it"""
+        if self.ui.comboBoxChooseCamera.itemText(0) == "Không tìm thấy camera":
+            self.ui.comboBoxChooseCamera.removeItem(0)
+        self.ui.comboBoxChooseCamera.addItem(label, source)
+        self.ui.comboBoxChooseCamera.setCurrentIndex(self.ui.comboBoxChooseCamera.count() - 1)
+        self.ui.buttonStartRecord.setEnabled(True)
+        self.ui.statusbar.showMessage(f"Đã thêm nguồn: {source}")
+
+    def add_video_source(self):
+        """Choose a video file as a source"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            None, "Chọn tệp video", "", "Tệp video (*.mp4 *.avi *.mov *.mkv *.wmv *.m4v)"
+        )
+        if file_path:
+            self.add_source(f"Video: {os.path.basename(file_path)}", file_path)
+
+    def add_image_folder_source(self):
+        """Choose a folder of images as a source"""
+        folder_path = QFileDialog.getExistingDirectory(None, "Chọn thư mục ảnh")
+        if folder_path:
+            self.add_source(f"Ảnh: {os.path.basename(folder_path)}", folder_path)
+
+    def add_stream_source(self):
+        """Enter a network stream URL as a source"""
+        url, ok = QInputDialog.getText(None, "Địa chỉ luồng", "Nhập địa chỉ (rtsp://, http://, ...):")
+        if ok and url.strip():
+            self.add_source(f"Luồng: {url.strip()}", url.strip())
+
+    def seek_source(self):
+        """Jump to the frame selected on the seek bar"""
+        if self.thread and not self.thread.seek(self.sliderSeek.value()):
+            self.ui.statusbar.showMessage("Nguồn này không hỗ trợ tua")
+
+    def update_seek_bar(self):
+        """Show the seek bar and follow the position of a file source"""
+        source = self.thread.source if self.thread else None
+        frames = source.frame_count() if source is not None and not source.live else 0
+        self.sliderSeek.setVisible(frames > 0)
+        if frames > 0 and not self.sliderSeek.isSliderDown():
+            self.sliderSeek.setMaximum(frames - 1)
+            self.sliderSeek.blockSignals(True)
+            self.sliderSeek.setValue(source.position())
+            self.sliderSeek.blockSignals(False)
+
+    @staticmethod
+    def roi_key(thread):
+        """Settings key of the regions of interest of a stream's source"""
+        return f"camera:{thread.camera_index}"
+
+    def edit_regions(self):
+        """Draw the regions of interest on the current frame and apply them to the main stream's source"""
+        frame = self.thread.current_frame if self.thread else None
+        if frame is None:
+            QMessageBox.warning(None, "Lỗi", "Vui lòng bật camera trước khi chọn vùng quan tâm!")
+            return
+
+        key = self.roi_key(self.thread)
+        dialog = RoiDialog(frame, RegionInference.settings_regions(self.settings, key))
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        regions = dialog.get_regions()
+        RegionInference.save_regions(self.settings, key, regions)
+        self.settings.save_config()
+        for thread in self.threads.values():
+            if self.roi_key(thread) == key:
+                thread.roi = RegionInference.from_settings(self.model, self.settings, key)
+        self.ui.statusbar.showMessage(
+            f"Đã lưu {len(regions)} vùng quan tâm cho nguồn này" if regions
+            else "Đã xóa vùng quan tâm, nhận diện trên toàn bộ khung hình"
+        )
+
+    def add_camera(self):
+        """Open the camera selected in the list as an additional stream"""
+        camera_index = self.ui.comboBoxChooseCamera.currentIndex()
+        if camera_index < 0 or not self.thread:
+            return
+        if camera_index in self.threads:
+            self.ui.statusbar.showMessage("Camera này đang được mở")
+            return
+
+        thread = self.open_stream(camera_index)
+
+        # Several streams share the model through the batching scheduler
+        scheduler = self.create_scheduler()
+        for stream in self.threads.values():
+            stream.scheduler = scheduler
+        if self.thread.detecting:
+            thread.skip_control = AdaptiveFrameSkip.from_settings(self.settings, self.thread.frame_skip)
+            thread.resolution = self.create_resolution()
+            thread.start_detection()
+
+        self.grid_timer.start(66)  # ~15 fps
+        self.ui.statusbar.showMessage(f"Đang mở {len(self.threads)} camera")
             
     def toggle_detection(self):
         """Start or stop object detection"""
@@ -134,18 +345,27 @@ class CameraDetector(QObject):
             
         if not self.thread.detecting:
             # Start detection
-            if model_instance.model is None:
+            if self.model.model is None:
                 QMessageBox.warning(None, "Lỗi", "Vui lòng tải Model trước!")
                 self.ui.statusbar.showMessage("Lỗi: Chưa tải Model nhận diện")
                 return
             
-            dialog = FrameSkipDialog(self.ui.centralwidget) 
+            dialog = FrameSkipDialog(self.ui.centralwidget, self.settings) 
             if dialog.exec_() == QDialog.Accepted:
                 frame_skip = dialog.get_frame_skip()
                 
-                # Bắt đầu detection với frame skip đã chọn
-                self.thread.frame_skip = frame_skip
-                self.thread.start_detection()
+                # Lưu thiết lập frame skip tự động vào cấu hình
+                for key, value in dialog.get_adaptive_settings().items():
+                    setattr(self.settings, key, value)
+                self.settings.save_config()
+                
+                # Bắt đầu detection với frame skip và độ phân giải inference đã cấu hình
+                scheduler = self.create_scheduler()
+                for thread in self.threads.values():
+                    thread.skip_control = AdaptiveFrameSkip.from_settings(self.settings, frame_skip)
+                    thread.resolution = self.create_resolution()
+                    thread.scheduler = scheduler
+                    thread.start_detection()
                 self.ui.buttonDetect.setText("Dừng nhận diện")
                 self.ui.buttonCapture.setEnabled(True)
                 self.ui.buttonSaveAllDetectCam.setEnabled(False)
@@ -156,15 +376,110 @@ class CameraDetector(QObject):
                 self.ui.textEditCameraInfo.append(
                     f"Bắt đầu nhận diện với frame skip: {frame_skip}\n"
                     f"Xử lý 1 frame trong mỗi {frame_skip} frame"
+                    + (f" (tự động trong khoảng {self.settings.frame_skip_min}-{self.settings.frame_skip_max}, "
+                       f"ngân sách CPU {self.settings.frame_skip_target_load * 100:.0f}%)"
+                       if self.settings.adaptive_frame_skip else "")
+                    + "\n"
+                    f"Độ phân giải inference: {self.thread.resolution.size}"
+                    + (f" (tự động, ngân sách {self.settings.target_latency_ms} ms)"
+                       if self.thread.resolution.adaptive else "")
+                    + ("\nTheo dõi đối tượng: bật" if self.thread.tracker is not None else "")
                 )
         else:
             # Stop detection
             self.ui.statusbar.showMessage("Đã dừng nhận diện")
-            self.thread.stop_detection()
+            for thread in self.threads.values():
+                thread.stop_detection()
+                thread.scheduler = None
+            self.release_scheduler()
             self.ui.buttonDetect.setText("Bắt đầu nhận diện")
             self.ui.buttonCapture.setEnabled(False)
             self.ui.buttonSaveAllDetectCam.setEnabled(True)
             
+    def create_resolution(self):
+        """Create the inference resolution controller from the settings"""
+        imgsz = self.settings.camera_imgsz or self.model.inference_size()
+        return AdaptiveResolution(
+            imgsz=imgsz,
+            adaptive=bool(self.settings.adaptive_resolution),
+            target_latency=self.settings.target_latency_ms / 1000.0,
+            min_size=self.settings.min_imgsz
+        )
+
+    def create_scheduler(self):
+        """
+        Return the batching scheduler shared by the streams of this model
+
+        Several cameras always go through the scheduler so they share one model;
+        a single camera uses it only when dynamic batching is enabled. The tab
+        holds one reference to the shared scheduler: the previous one is
+        released, so switching models does not keep the old model alive.
+        """
+        scheduler = None
+        if self.settings.dynamic_batching or len(self.threads) >= 2:
+            scheduler = InferenceScheduler.shared(
+                self.model,
+                max_batch=self.settings.stream_max_batch,
+                max_wait=self.settings.stream_max_wait_ms / 1000.0
+            )
+        self.release_scheduler()
+        self.scheduler = scheduler
+        return scheduler
+
+    def release_scheduler(self):
+        """Give back the shared scheduler once the streams of this tab stop using it"""
+        if self.scheduler is not None:
+            self.scheduler.release()
+            self.scheduler = None
+
+    def handle_stream_frames(self, camera_index, frames):
+        """Route the frames of a stream to the single view or to the grid"""
+        if len(self.threads) < 2:
+            self.update_camera_feed(frames)
+            return
+
+        if self.threads.get(camera_index) is self.thread:
+            self.current_frame = frames.get('binding_box')
+            self.update_seek_bar()
+        self.grid.update(camera_index, frames)
+
+    def refresh_grid(self):
+        """Display the mosaic of all streams"""
+        if len(self.threads) < 2:
+            return
+
+        for key, widget in (('binding_box', self.ui.frameCameraBindingBox), ('warm_up', self.ui.frameCameraWarmUp)):
+            mosaic = self.grid.compose(key)
+            if mosaic is not None:
+                ImageUtils.display_image_in_widget(mosaic, widget)
+
+    def handle_stream_error(self, camera_index, error_msg):
+        """Close a failing additional camera, or stop everything if it was the only one"""
+        if len(self.threads) < 2:
+            self.handle_camera_error(error_msg)
+            return
+
+        was_primary = self.threads.get(camera_index) is self.thread
+        self.close_stream(camera_index)
+        if was_primary:
+            self.thread = next(iter(self.threads.values()))
+        if len(self.threads) < 2:
+            self.grid_timer.stop()
+        self.ui.statusbar.showMessage(f"Lỗi Camera {camera_index}: {error_msg} - đã đóng camera này")
+
+    def handle_source_finished(self, camera_index):
+        """Close a video file or image folder stream once all of its frames are processed"""
+        if len(self.threads) < 2:
+            self.toggle_camera()
+        else:
+            was_primary = self.threads.get(camera_index) is self.thread
+            self.close_stream(camera_index)
+            if was_primary:
+                self.thread = next(iter(self.threads.values()))
+            if len(self.threads) < 2:
+                self.grid_timer.stop()
+        self.ui.statusbar.showMessage(f"Đã xử lý hết nguồn: {self.ui.comboBoxChooseCamera.itemText(camera_index)}")
+
     def update_camera_feed(self, frames):
         """Update camera frames in UI"""
         if not isinstance(frames, dict):
@@ -172,6 +487,7 @@ class CameraDetector(QObject):
             
         # Store binding box frame for later use
         self.current_frame = frames.get('binding_box')
+        self.update_seek_bar()
         
         # Update both frame displays
         if 'binding_box' in frames:
@@ -188,17 +504,19 @@ class CameraDetector(QObject):
         self.ui.statusbar.showMessage(f"Lỗi Camera: {error_msg}")
         self.toggle_camera()  # Stop camera on error
         
-    def update_detections_info(self, detections):
+    def update_detections_info(self, detections, camera_index=None):
         """Update detection information in the text display"""
+        if camera_index is not None:
+            self.camera_detections[camera_index] = detections
+        if len(self.threads) > 1:
+            self.update_multi_camera_info()
+            return
+
         self.ui.textEditCameraInfo.clear()
         
         # Count objects by class
         total_objects = len(detections)
-        class_counts = {}
-        
-        for det in detections:
-            class_id = det['class']
-            class_counts[class_id] = class_counts.get(class_id, 0) + 1
+        class_counts = Detections.coerce(detections).class_counts()
         
         # Display summary information
         self.ui.textEditCameraInfo.append(f"Tổng số đối tượng: {total_objects}")
@@ -211,10 +529,98 @@ class CameraDetector(QObject):
             self.ui.textEditCameraInfo.append("\nThông tin khung hình:")
             self.ui.textEditCameraInfo.append(f"- Số frame: {self.thread.frame_count}")
             self.ui.textEditCameraInfo.append(f"- Kích thước: {self.current_frame.shape[1]}x{self.current_frame.shape[0]}")
+            self.ui.textEditCameraInfo.append(f"- Độ phân giải inference: {self.thread.resolution.size}")
+            status = self.thread.get_status()
+            self.ui.textEditCameraInfo.append(
+                f"- Frame đã nhận diện: {status['inferred_frames']}, "
+                f"bỏ qua do inference chậm: {status['dropped_frames']}"
+            )
+            self.ui.textEditCameraInfo.append(
+                f"- FPS: {status['achieved_fps']:.1f}/{status['target_fps']:.0f}, "
+                f"dao động {status['jitter_ms']:.1f} ms, trễ hạn {status['overruns']} lần"
+            )
+            if status['adaptive_frame_skip']:
+                self.ui.textEditCameraInfo.append(
+                    f"- Frame skip tự động: {status['frame_skip']} (đã điều chỉnh {status['frame_skip_changes']} lần)"
+                )
+                for changed_at, old_skip, new_skip, reason in list(self.thread.skip_control.history)[-3:]:
+                    self.ui.textEditCameraInfo.append(
+                        f"  {datetime.fromtimestamp(changed_at).strftime('%H:%M:%S')}: "
+                        f"{old_skip} -> {new_skip} ({reason})"
+                    )
+            if 'recorded_frames' in status:
+                self.ui.textEditCameraInfo.append(
+                    f"- Ghi phiên: {status['recorded_frames']} frame, "
+                    f"hàng đợi {status['recorder_queue_depth']}, bỏ {status['recorder_dropped']}"
+                )
+            self.ui.textEditCameraInfo.append(
+                f"- Frame đã lưu: {status['stored_frames']} ({status['memory_frames']} trong bộ nhớ, "
+                f"{status['spilled_frames']} trên đĩa, {status['stored_mb']:.0f} MB), "
+                f"đã xóa do giới hạn lưu trữ {status['evicted_frames']}"
+            )
+            if 'frame_pool_buffers' in status:
+                self.ui.textEditCameraInfo.append(
+                    f"- Bộ đệm frame: {status['frame_pool_buffers']} bộ đệm rảnh, {status['frame_pool_leased']} đang dùng, "
+                    f"dùng lại {status['frame_pool_reused']} lần, "
+                    f"cấp phát mới {status['frame_pool_allocated']} lần"
+                )
+            if 'writer_written' in status:
+                self.ui.textEditCameraInfo.append(
+                    f"- Ghi frame: hàng đợi {status['writer_queue_depth']}/{self.thread.writer.max_queue} "
+                    f"(tối đa {status['writer_max_depth']}), đã ghi {status['writer_written']}, "
+                    f"bỏ {status['writer_dropped']}, thời gian ghi {status['writer_latency_ms']:.0f} ms"
+                )
+            if self.thread.tracker is not None:
+                self.ui.textEditCameraInfo.append(f"- Đối tượng đang theo dõi: {status['tracks']}")
+            if self.thread.motion_gate is not None:
+                self.ui.textEditCameraInfo.append(
+                    f"- Bỏ qua do khung cảnh tĩnh: {status['motion_skipped']}/{status['motion_checks']} frame "
+                    f"({status['motion_hit_rate'] * 100:.0f}%)"
+                )
+            if self.thread.scheduler is not None:
+                stats = self.thread.scheduler.get_stats()
+                stream = stats['streams'].get(self.thread.camera_index, {})
+                self.ui.textEditCameraInfo.append(
+                    f"- Lô inference: trung bình {stats['mean_batch_size']:.1f} frame "
+                    f"(lấp đầy {stats['fill_rate'] * 100:.0f}%), "
+                    f"độ trễ luồng {stream.get('latency_ms', 0.0):.1f} ms"
+                )
             
         # Cập nhật statusbar với tổng số đối tượng
         self.ui.statusbar.showMessage(f"Đang nhận diện - Phát hiện {total_objects} đối tượng")
 
+    def update_multi_camera_info(self):
+        """Show per-camera detection and performance statistics"""
+        self.ui.textEditCameraInfo.clear()
+        total_objects = 0
+        for camera_index, thread in sorted(self.threads.items()):
+            detections = Detections.coerce(self.camera_detections.get(camera_index))
+            status = thread.get_status()
+            total_objects += len(detections)
+
+            self.ui.textEditCameraInfo.append(f"{self.ui.comboBoxChooseCamera.itemText(camera_index)}:")
+            self.ui.textEditCameraInfo.append(f"- Đối tượng: {len(detections)}")
+            for class_name, count in detections.class_counts().items():
+                self.ui.textEditCameraInfo.append(f"  + Lớp {class_name}: {count}")
+            self.ui.textEditCameraInfo.append(
+                f"- FPS: {status['achieved_fps']:.1f}, frame đã nhận diện: {status['inferred_frames']}, "
+                f"bỏ qua: {status['dropped_frames']}"
+            )
+
+        scheduler = self.thread.scheduler if self.thread is not None else None
+        if scheduler is not None:
+            stats = scheduler.get_stats()
+            self.ui.textEditCameraInfo.append(
+                f"\nLô inference dùng chung: trung bình {stats['mean_batch_size']:.1f} frame "
+                f"(lấp đầy {stats['fill_rate'] * 100:.0f}%)"
+            )
+            for stream_id, stream in sorted(stats['streams'].items(), key=lambda item: str(item[0])):
+                self.ui.textEditCameraInfo.append(f"- Nguồn {stream_id}: độ trễ {stream['latency_ms']:.1f} ms")
+
+        self.ui.statusbar.showMessage(
+            f"Đang nhận diện {len(self.threads)} camera - Phát hiện {total_objects} đối tượng"
+        )
+
     def capture_frame(self):
         """Capture current frame and save with detection data"""
         # Get current frames and detection data
@@ -1,5 +1,5 @@
 from PySide6.QtCore import QObject, Signal, Qt
-from PySide6.QtWidgets import QMessageBox, QFileDialog, QPushButton, QListWidgetItem, QApplication
+from PySide6.QtWidgets import QMessageBox, QFileDialog, QPushButton, QListWidgetItem, QApplication, QDialog
 from PySide6.QtGui import QPixmap, QImage, QResizeEvent
 import os
 import cv2
@@ -11,6 +11,13 @@ from module.model import model_instance
 from module.detection_thread import DetectionThread
 from module.image_utils import ImageUtils
 from module.data_exporter import DataExporter
+from module.detections import Detections
+from module.slicing import SlicedInference
+from module.roi import RegionInference
+from module.roi_dialog import RoiDialog
+from module.detection_cache import DetectionCache
+from module.folder_engine import FolderEngine
+from module.rendering import OverlayRenderer
 
 
 class MultiplePictureDetector(QObject):
@@ -29,12 +36,26 @@ class MultiplePictureDetector(QObject):
         self.current_folder = None
         self.image_files = []  # List of image paths
         self.detection_thread = None
+        self.detection_cache = None  # DetectionCache, opened on the first folder run
+        self.folder_engine = None  # FolderEngine when folder_workers > 1
         self.processing_cancelled = False
         self.current_displayed_image = None
+        self.model = model_instance  # Model dùng cho tab thư mục (mặc định là model đang hoạt động)
+        self.renderer = OverlayRenderer()  # Views of the folder engine results, rendered when shown
+        self.rendered_views = (None, None)  # (image_path, (binding_box, warm_up)) of the last rendered result
 
         self.setup_ui()
         self.setup_connections()
 
+    def set_model(self, model=None):
+        """
+        Choose the model used by this tab
+
+        Args:
+            model: Loaded YOLOModel, or None to follow the active model
+        """
+        self.model = model or model_instance
+
     def setup_ui(self):
         """Setup initial UI configuration"""
         # Configure initial button states
@@ -73,6 +94,12 @@ class MultiplePictureDetector(QObject):
         self.ui.buttonCancelProcessing.setVisible(False)
         self.ui.folderControls.addWidget(self.ui.buttonCancelProcessing)
 
+        # Vùng quan tâm riêng cho từng thư mục
+        self.buttonRoi = QPushButton("Vùng quan tâm")
+        self.buttonRoi.setToolTip("Vẽ các vùng cần nhận diện trên ảnh đang xem và xử lý lại thư mục này")
+        self.buttonRoi.setEnabled(False)
+        self.ui.folderControls.addWidget(self.buttonRoi)
+
     def setup_connections(self):
         """Setup signals/slots connections"""
         # UI Button connections
@@ -80,6 +107,7 @@ class MultiplePictureDetector(QObject):
         self.ui.buttonSaveAllData.clicked.connect(self.save_all_detection_data)
         self.ui.buttonSaveImageChoose.clicked.connect(self.save_selected_image)
         self.ui.buttonCancelProcessing.clicked.connect(self.cancel_processing)
+        self.buttonRoi.clicked.connect(self.edit_regions)
 
         # List widget connections
         self.ui.listImage.itemClicked.connect(self.display_selected_image)
@@ -108,17 +136,38 @@ class MultiplePictureDetector(QObject):
         if not self.current_displayed_image or self.current_displayed_image not in self.detection_results:
             return
 
-        results = self.detection_results[self.current_displayed_image]
+        binding_box, warm_up = self.get_result_views(self.current_displayed_image)
         current_tab = self.ui.tabWidgetResultFolder.currentIndex()
 
         # Display images based on current tab
         if current_tab == 0:  # Binding Box tab
-            self._display_image_with_scaling(results['binding_box'], self.ui.frameFolderBindingBox)
+            self._display_image_with_scaling(binding_box, self.ui.frameFolderBindingBox)
         elif current_tab == 1:  # Warm Up tab
-            self._display_image_with_scaling(results['warm_up'], self.ui.frameFolderWarmUp)
+            self._display_image_with_scaling(warm_up, self.ui.frameFolderWarmUp)
         else:  # For status tab or any other tab, update both
-            self._display_image_with_scaling(results['binding_box'], self.ui.frameFolderBindingBox)
-            self._display_image_with_scaling(results['warm_up'], self.ui.frameFolderWarmUp)
+            self._display_image_with_scaling(binding_box, self.ui.frameFolderBindingBox)
+            self._display_image_with_scaling(warm_up, self.ui.frameFolderWarmUp)
+
+    def get_result_views(self, image_path):
+        """
+        Return the binding box and warm-up views of a result
+
+        Results of the folder engine only hold detections; their views are
+        rendered from the image file here, and only the last one is kept.
+        """
+        results = self.detection_results[image_path]
+        if results['binding_box'] is not None:
+            return results['binding_box'], results['warm_up']
+
+        if self.rendered_views[0] != image_path:
+            frame = cv2.imread(image_path)
+            if frame is None:
+                raise Exception(f"Không thể đọc ảnh gốc: {image_path}")
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            binding_box, _ = self.renderer.draw_detections(frame, results['detections'])
+            warm_up = self.renderer.process_warmup(frame, results['detections'])
+            self.rendered_views = (image_path, (binding_box, warm_up))
+        return self.rendered_views[1]
 
     def _display_image_with_scaling(self, image, frame_widget):
         """
@@ -153,7 +202,7 @@ class MultiplePictureDetector(QObject):
     def select_folder(self):
         """Select folder containing images and start processing"""
         # Check if model is loaded
-        if model_instance.model is None:
+        if self.model.model is None:
             QMessageBox.warning(None, "Lỗi", "Chưa tải Model. Vui lòng tải Model trước!")
             return
 
@@ -183,10 +232,45 @@ class MultiplePictureDetector(QObject):
         if not folder_path:
             return  # User cancelled selection
 
+        self.start_folder(folder_path)
+
+    def roi_key(self):
+        """Settings key of the regions of interest of the current folder"""
+        return f"folder:{os.path.abspath(self.current_folder)}"
+
+    def _update_roi_button(self):
+        """Show on the button whether regions of interest crop the current folder"""
+        count = len(RegionInference.settings_regions(self.settings, self.roi_key())) if self.current_folder else 0
+        self.buttonRoi.setText(f"Vùng quan tâm ({count})" if count else "Vùng quan tâm")
+
+    def edit_regions(self):
+        """Draw the regions of interest of the current folder and process it again"""
+        image_path = self.current_displayed_image or next(iter(self.detection_results), None)
+        image = cv2.imread(image_path) if image_path else None
+        if image is None:
+            QMessageBox.warning(None, "Lỗi", "Vui lòng chọn thư mục ảnh trước khi chọn vùng quan tâm!")
+            return
+
+        key = self.roi_key()
+        dialog = RoiDialog(ImageUtils.convert_bgr_to_rgb(image), RegionInference.settings_regions(self.settings, key))
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        RegionInference.save_regions(self.settings, key, dialog.get_regions())
+        self.settings.save_config()
+        if self.model.model is None:
+            self._update_roi_button()
+            return
+        self.cleanup_detection_thread()
+        self.start_folder(self.current_folder)
+
+    def start_folder(self, folder_path):
+        """Process every image of a folder"""
         try:
             # Reset previous data
             self.reset_detection_state()
             self.current_folder = folder_path
+            self._update_roi_button()
             QApplication.processEvents()  # Process UI events
 
             # Get list of image files with supported extensions
@@ -210,20 +294,35 @@ class MultiplePictureDetector(QObject):
     def cleanup_detection_thread(self):
         """Clean up detection thread if it exists"""
         if self.detection_thread:
-            if self.detection_thread.isRunning():
-                self.detection_thread.terminate()
-                self.detection_thread.wait()
             # Disconnect all signals
             try:
                 self.detection_thread.frame_signal.disconnect()
                 self.detection_thread.detection_signal.disconnect()
                 self.detection_thread.static_detection_complete_signal.disconnect()
+                self.detection_thread.static_batch_complete_signal.disconnect()
                 self.detection_thread.error_signal.disconnect()
             except:
                 # Ignore disconnection errors
                 pass
+            if self.detection_thread.isRunning():
+                # Let the current batch finish instead of killing the thread mid-inference
+                self.detection_thread.running = False
+                self.detection_thread.wait()
             self.detection_thread = None
 
+        if self.folder_engine:
+            try:
+                self.folder_engine.result_signal.disconnect()
+                self.folder_engine.error_signal.disconnect()
+                self.folder_engine.finished_signal.disconnect()
+            except:
+                pass
+            if self.folder_engine.isRunning():
+                # Running chunks finish, queued chunks are cancelled
+                self.folder_engine.stop()
+                self.folder_engine.wait()
+            self.folder_engine = None
+
     def reset_detection_state(self):
         """Reset detection state for a new folder"""
         self.detection_results.clear()
@@ -262,6 +361,7 @@ class MultiplePictureDetector(QObject):
         # Configure buttons
         self.ui.buttonCancelProcessing.setVisible(True)
         self.ui.buttonChooseFolder.setEnabled(False)
+        self.buttonRoi.setEnabled(False)
 
         # Hide save buttons during processing
         self.ui.buttonSaveAllData.setVisible(False)
@@ -270,6 +370,11 @@ class MultiplePictureDetector(QObject):
         # Display initial messages
         self.ui.textEditFolderStatus.append(f"Bắt đầu xử lý {file_count} ảnh từ thư mục:")
         self.ui.textEditFolderStatus.append(f"{folder_path}\n")
+        regions = RegionInference.settings_regions(self.settings, self.roi_key())
+        if regions:
+            self.ui.textEditFolderStatus.append(
+                f"Chỉ nhận diện trong {len(regions)} vùng quan tâm của thư mục này\n"
+            )
 
         # Set initial frame messages
         if hasattr(self.ui.frameFolderBindingBox, 'setText'):
@@ -277,7 +382,7 @@ class MultiplePictureDetector(QObject):
             self.ui.frameFolderWarmUp.setText("Đang trong quá trình nhận dạng ...")
 
     def process_next_image(self):
-        """Process next image in the list"""
+        """Process the remaining images in the list in batches"""
         # Check if processing should stop
         if self.processing_cancelled or not self.image_files:
             if self.processing_cancelled:
@@ -286,44 +391,101 @@ class MultiplePictureDetector(QObject):
             self.all_detections_finished.emit()
             return
 
-        # Get next image path
-        image_path = self.image_files.pop(0)
-        base_name = os.path.basename(image_path)
+        # Hand all remaining images to one detection thread
+        image_paths = self.image_files
+        self.image_files = []
 
         try:
             # Update status
-            self.ui.textEditFolderStatus.append(f"Đang xử lý: {base_name}")
+            batch_size = getattr(self.settings, 'batch_size', 8)
+            self.ui.textEditFolderStatus.append(
+                f"Đang xử lý {len(image_paths)} ảnh (mỗi lượt {batch_size} ảnh)"
+            )
             QApplication.processEvents()  # Ensure UI updates
 
-            # Initialize and configure detection thread
-            self.initialize_detection_thread(image_path)
+            # Use the process pool engine when several workers are configured
+            if self.settings.folder_workers > 1:
+                self.initialize_folder_engine(image_paths, batch_size)
+            else:
+                self.initialize_detection_thread(image_paths, batch_size)
 
         except Exception as e:
-            self.ui.textEditFolderStatus.append(f"Lỗi xử lý {base_name}: {str(e)}")
+            self.ui.textEditFolderStatus.append(f"Lỗi xử lý thư mục: {str(e)}")
             QApplication.processEvents()
+            self.all_detections_finished.emit()
 
-            # Continue with next image
-            self.progress_updated.emit(self.ui.multiProcessBar.value() + 1)
-            self.process_next_image()
-
-    def initialize_detection_thread(self, image_path):
-        """Initialize and start detection thread for an image"""
+    def initialize_detection_thread(self, image_paths, batch_size):
+        """Initialize and start a detection thread for a list of images"""
         # Clean up any existing detection thread
         self.cleanup_detection_thread()
 
         # Create new detection thread
-        self.detection_thread = DetectionThread(0)
+        self.detection_thread = DetectionThread(0, model=self.model)
+        self.detection_thread.slicer = SlicedInference.from_settings(self.model, self.settings)
+        self.detection_thread.cache = self.get_detection_cache()
+        self.detection_thread.roi = RegionInference.from_settings(self.model, self.settings, self.roi_key())
 
         # Connect signals
         self.detection_thread.frame_signal.connect(self.handle_frame_update)
         self.detection_thread.detection_signal.connect(self.handle_detection_update)
         self.detection_thread.static_detection_complete_signal.connect(
-            lambda results: self.handle_static_detection_complete(results, image_path)
+            lambda results: self.handle_static_detection_complete(results, results['image_path'])
         )
+        self.detection_thread.static_batch_complete_signal.connect(self.handle_batch_complete)
         self.detection_thread.error_signal.connect(self.handle_detection_error)
 
-        # Start detection for current image
-        self.detection_thread.detect_static_image(image_path)
+        # Start detection for all images
+        self.detection_thread.detect_static_images(image_paths, batch_size=batch_size)
+
+    def initialize_folder_engine(self, image_paths, batch_size):
+        """Initialize and start a process pool engine for a list of images"""
+        self.cleanup_detection_thread()
+
+        self.folder_engine = FolderEngine(
+            self.model,
+            image_paths,
+            workers=self.settings.folder_workers,
+            threads_per_worker=self.settings.threads_per_worker or None,
+            batch_size=batch_size,
+            slicer=SlicedInference.from_settings(self.model, self.settings),
+            cache=self.get_detection_cache(),
+            roi=RegionInference.from_settings(self.model, self.settings, self.roi_key())
+        )
+        self.folder_engine.result_signal.connect(
+            lambda results: self.handle_static_detection_complete(results, results['image_path'])
+        )
+        self.folder_engine.error_signal.connect(self.handle_detection_error)
+        self.folder_engine.finished_signal.connect(self.handle_engine_finished)
+
+        self.ui.textEditFolderStatus.append(
+            f"Sử dụng {self.folder_engine.workers} tiến trình, "
+            f"{self.folder_engine.threads_per_worker} luồng mỗi tiến trình"
+        )
+        self.folder_engine.start()
+
+    def handle_engine_finished(self, ordered_results):
+        """Restore the input order of the results once the engine is done"""
+        if self.processing_cancelled:
+            return
+
+        # Results arrive in completion order, list and store them in file order
+        self.detection_results = {
+            image_path: self.detection_results[image_path]
+            for image_path, _ in ordered_results
+            if image_path in self.detection_results
+        }
+        self.ui.listImage.clear()
+        for image_path in self.detection_results:
+            self.add_image_to_list(image_path)
+
+        if self.folder_engine and self.folder_engine.cache_hits:
+            self.ui.textEditFolderStatus.append(
+                f"Dùng lại kết quả đã lưu cho {self.folder_engine.cache_hits} ảnh (không chạy lại model)"
+            )
+        if self.folder_engine and self.folder_engine.failed:
+            self.ui.textEditFolderStatus.append(f"Không xử lý được {len(self.folder_engine.failed)} ảnh")
+
+        self.process_next_image()
 
     def handle_frame_update(self, frames):
         """Handle frame updates from DetectionThread"""
@@ -346,7 +508,6 @@ class MultiplePictureDetector(QObject):
     def handle_static_detection_complete(self, results, image_path):
         """Handle completed detection results for an image"""
         if self.processing_cancelled:
-            self.process_next_image()
             return
 
         if results:
@@ -363,16 +524,35 @@ class MultiplePictureDetector(QObject):
             )
             QApplication.processEvents()
 
-        # Update progress and continue
+        # Update progress
         self.progress_updated.emit(self.ui.multiProcessBar.value() + 1)
         self.detection_finished.emit(image_path)
+
+    def handle_batch_complete(self):
+        """Handle completion of the detection thread's image list"""
+        if self.processing_cancelled:
+            return
+
+        if self.detection_thread and self.detection_thread.cache_hits:
+            self.ui.textEditFolderStatus.append(
+                f"Dùng lại kết quả đã lưu cho {self.detection_thread.cache_hits} ảnh (không chạy lại model)"
+            )
+
         self.process_next_image()
 
+    def get_detection_cache(self):
+        """Open the persistent detection cache once, or return None when it is disabled"""
+        if self.detection_cache is None:
+            self.detection_cache = DetectionCache.from_settings(self.settings)
+        return self.detection_cache
+
     def store_detection_results(self, results, image_path):
         """Store detection results with timestamp"""
+        if self.rendered_views[0] == image_path:
+            self.rendered_views = (None, None)
         self.detection_results[image_path] = {
-            'binding_box': results['binding_box_frame'],
-            'warm_up': results['warmup_frame'],
+            'binding_box': results.get('binding_box_frame'),
+            'warm_up': results.get('warmup_frame'),
             'detections': results['detections'],
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
@@ -385,12 +565,14 @@ class MultiplePictureDetector(QObject):
 
     def handle_detection_error(self, error_message):
         """Handle errors from DetectionThread"""
+        if self.processing_cancelled:
+            return
+
         self.ui.textEditFolderStatus.append(f"Lỗi: {error_message}")
         QApplication.processEvents()
 
-        # Continue with next image
+        # The thread moves on to the next image by itself
         self.progress_updated.emit(self.ui.multiProcessBar.value() + 1)
-        self.process_next_image()
 
     def display_selected_image(self, item):
         """Display selected image from the list"""
@@ -428,11 +610,7 @@ class MultiplePictureDetector(QObject):
 
         # Calculate statistics
         total_objects = len(detections)
-        class_counts = {}
-
-        for det in detections:
-            class_id = det['class']
-            class_counts[class_id] = class_counts.get(class_id, 0) + 1
+        class_counts = Detections.coerce(detections).class_counts()
 
         # Display overview
         self.ui.textEditFolderStatus.append("=== TỔNG QUAN ===")
@@ -507,8 +685,9 @@ class MultiplePictureDetector(QObject):
                 warm_up_path = os.path.join(temp_dir, f"{os.path.basename(image_path)}_warm_up.jpg")
 
                 # Convert RGB to BGR for OpenCV and write to files
-                cv2.imwrite(binding_box_path, cv2.cvtColor(results['binding_box'], cv2.COLOR_RGB2BGR))
-                cv2.imwrite(warm_up_path, cv2.cvtColor(results['warm_up'], cv2.COLOR_RGB2BGR))
+                binding_box, warm_up = self.get_result_views(image_path)
+                cv2.imwrite(binding_box_path, cv2.cvtColor(binding_box, cv2.COLOR_RGB2BGR))
+                cv2.imwrite(warm_up_path, cv2.cvtColor(warm_up, cv2.COLOR_RGB2BGR))
 
                 # Create frame_info with file paths
                 frame_info = {
@@ -559,11 +738,12 @@ class MultiplePictureDetector(QObject):
 
             original_rgb = cv2.cvtColor(original_img, cv2.COLOR_BGR2RGB)
 
-            # Use existing frames directly
+            # Use existing frames directly (rendered now for folder engine results)
+            binding_box, warm_up = self.get_result_views(image_path)
             frames = {
                 'original': original_rgb,
-                'binding_box': results['binding_box'],
-                'warm_up': results['warm_up']
+                'binding_box': binding_box,
+                'warm_up': warm_up
             }
 
             # Use DataExporter to save single frame
@@ -639,6 +819,7 @@ class MultiplePictureDetector(QObject):
         self.ui.multiProcessBar.setVisible(False)
         self.ui.buttonCancelProcessing.setVisible(False)
         self.ui.buttonChooseFolder.setEnabled(True)
+        self.buttonRoi.setEnabled(self.current_folder is not None)
 
         # Show save buttons again (they'll be enabled/disabled based on results)
         self.ui.buttonSaveAllData.setVisible(True)
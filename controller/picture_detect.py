@@ -1,5 +1,5 @@
 from PySide6.QtCore import QObject, Signal, Qt
-from PySide6.QtWidgets import QMessageBox, QFileDialog
+from PySide6.QtWidgets import QMessageBox, QFileDialog, QPushButton, QDialog
 from PySide6.QtGui import QPixmap, QImage, QResizeEvent
 
 import cv2
@@ -10,6 +10,10 @@ from module.detection_thread import DetectionThread
 from module.image_utils import ImageUtils
 from module.data_exporter import DataExporter
 from module.process_dialog import ProcessDialog
+from module.detections import Detections
+from module.slicing import SlicedInference
+from module.roi import RegionInference
+from module.roi_dialog import RoiDialog
 
 
 class PictureDetector(QObject):
@@ -18,6 +22,8 @@ class PictureDetector(QObject):
     """
     detection_finished = Signal()
 
+    ROI_KEY = "picture"  # Settings key of the regions of interest of this tab
+
     def __init__(self, ui, settings):
         """
         Initialize the PictureDetector with UI and settings.
@@ -32,9 +38,11 @@ class PictureDetector(QObject):
 
         # Image data
         self.current_image = None
+        self.current_image_path = None
         self.processed_image_binding_box = None
         self.processed_image_warm_up = None
         self.detections = None
+        self.model = model_instance  # Model dùng cho tab ảnh (mặc định là model đang hoạt động)
 
         # Helper components
         self.detection_thread = None
@@ -45,6 +53,15 @@ class PictureDetector(QObject):
         self._setup_ui()
         self._setup_ui_connections()
 
+    def set_model(self, model=None):
+        """
+        Choose the model used by this tab
+
+        Args:
+            model: Loaded YOLOModel, or None to follow the active model
+        """
+        self.model = model or model_instance
+
     def _setup_ui(self):
         """Configure initial UI state"""
         self.ui.buttonDownloadPictureBindingBox.setEnabled(False)
@@ -52,6 +69,13 @@ class PictureDetector(QObject):
         self.ui.buttonChoosePicture.setEnabled(True)
         self.ui.buttonSaveDataDetectImg.setEnabled(False)
 
+        # Vùng quan tâm riêng của tab ảnh
+        self.buttonRoi = QPushButton("Vùng quan tâm", self.ui.tabPicture)
+        self.buttonRoi.setMinimumSize(120, 30)
+        self.buttonRoi.setToolTip("Vẽ các vùng cần nhận diện trên ảnh hiện tại và nhận diện lại")
+        self.ui.pictureSelection.addWidget(self.buttonRoi)
+        self._update_roi_button()
+
         # Set up frame resize events to maintain proper image sizing
         self.ui.framePictureBindingBox.resizeEvent = lambda event: self._handle_frame_resize(
             event, 'binding_box', self.ui.framePictureBindingBox
@@ -115,6 +139,7 @@ class PictureDetector(QObject):
         self.ui.buttonDownloadPictureWarmUp.clicked.connect(
             lambda: self.save_detected_picture("warm_up"))
         self.ui.buttonSaveDataDetectImg.clicked.connect(self.save_data_detected_picture)
+        self.buttonRoi.clicked.connect(self.edit_regions)
         self.detection_finished.connect(self._on_detection_complete)
 
         # Fix for image resizing when switching tabs
@@ -156,6 +181,28 @@ class PictureDetector(QObject):
         except Exception as e:
             self._handle_error(f"Không thể tải hình ảnh: {str(e)}")
 
+    def edit_regions(self):
+        """Draw the regions of interest on the current image and run the detection again"""
+        if self.current_image is None:
+            QMessageBox.warning(None, "Lỗi", "Vui lòng chọn hình ảnh trước khi chọn vùng quan tâm!")
+            return
+
+        dialog = RoiDialog(self.current_image, RegionInference.settings_regions(self.settings, self.ROI_KEY))
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        RegionInference.save_regions(self.settings, self.ROI_KEY, dialog.get_regions())
+        self.settings.save_config()
+        self._update_roi_button()
+        if self.current_image_path and self._check_model_loaded():
+            self.process_dialog.show()
+            self._detect_static_image(self.current_image_path)
+
+    def _update_roi_button(self):
+        """Show on the button whether regions of interest crop the detection"""
+        count = len(RegionInference.settings_regions(self.settings, self.ROI_KEY))
+        self.buttonRoi.setText(f"Vùng quan tâm ({count})" if count else "Vùng quan tâm")
+
     def _check_model_loaded(self):
         """
         Check if the model is loaded
@@ -163,7 +210,7 @@ class PictureDetector(QObject):
         Returns:
             bool: True if model is loaded, False otherwise
         """
-        if model_instance.model is None:
+        if self.model.model is None:
             QMessageBox.warning(None, "Lỗi", "Chưa tải Model. Vui lòng tải Model trước!")
             self.reset_ui()
             return False
@@ -196,6 +243,7 @@ class PictureDetector(QObject):
             raise ValueError("Không thể đọc file ảnh")
 
         self.current_image = ImageUtils.convert_bgr_to_rgb(image)
+        self.current_image_path = file_path
         self._display_image_with_scaling(self.current_image, self.ui.framePictureBindingBox)
 
         # Start detection process
@@ -209,7 +257,9 @@ class PictureDetector(QObject):
             image_path: Path to the image file
         """
         # Configure DetectionThread
-        self.detection_thread = DetectionThread(0)  # camera_index not important for static images
+        self.detection_thread = DetectionThread(0, model=self.model)  # camera_index not important for static images
+        self.detection_thread.slicer = SlicedInference.from_settings(self.model, self.settings)
+        self.detection_thread.roi = RegionInference.from_settings(self.model, self.settings, self.ROI_KEY)
         self._connect_detection_thread_signals()
 
         # Start detection
@@ -312,11 +362,7 @@ class PictureDetector(QObject):
 
         # Calculate statistics
         total_objects = len(detections)
-        class_counts = {}
-
-        for det in detections:
-            class_id = det['class']
-            class_counts[class_id] = class_counts.get(class_id, 0) + 1
+        class_counts = Detections.coerce(detections).class_counts()
 
         # Display summary
         text_edit.append("=== TỔNG QUAN ===")
@@ -9,6 +9,97 @@ class Settings:
     SAVE_TO_CONFIGURED_PATH = 0  # Lưu vào đường dẫn đã cài đặt sẵn
     SAVE_WITH_PROMPT = 1         # Hỏi người dùng chọn đường dẫn trước khi lưu
 
+    # Các thiết lập inference (không có trên giao diện, chỉnh trong tệp .config)
+    INFERENCE_DEFAULTS = {
+        # Số ảnh được đưa vào model trong một lần inference (chế độ thư mục)
+        "batch_size": 8,
+        # Backend inference: "torch" hoặc "onnx" (ONNX Runtime, xuất model một lần và lưu cache)
+        "inference_backend": "torch",
+        # Thư mục lưu các model đã xuất (để trống để dùng thư mục mặc định)
+        "model_cache_dir": "",
+        # Lượng tử hóa INT8: "" (tắt), "dynamic" hoặc "static" (dùng backend onnx-int8)
+        "quantization": "",
+        # Thư mục ảnh hiệu chỉnh cho chế độ static và báo cáo so sánh độ chính xác/tốc độ
+        "calibration_folder": "",
+        # Độ phân giải inference (0 = mặc định của model)
+        "imgsz": 0,
+        # Số lượt warm-up chạy ngay sau khi tải model
+        "warmup_runs": 3,
+        # Bộ nhớ tối đa (MB) cho các model được giữ lại để chuyển đổi nhanh
+        "model_memory_budget_mb": 2048,
+        # Số bản sao model chạy song song (0 hoặc 1 = tắt)
+        "inference_replicas": 0,
+        # Số luồng PyTorch của mỗi lượt inference, áp dụng cho cả tiến trình (0 = số nhân CPU / số bản sao)
+        "threads_per_replica": 0,
+        # Độ phân giải inference của camera (0 = dùng imgsz / mặc định của model)
+        "camera_imgsz": 0,
+        # Tự động giảm/tăng độ phân giải camera để giữ độ trễ trong ngân sách
+        "adaptive_resolution": False,
+        # Ngân sách độ trễ inference mỗi frame (ms) cho chế độ tự động
+        "target_latency_ms": 100,
+        # Độ phân giải nhỏ nhất trong chế độ tự động
+        "min_imgsz": 320,
+        # Nhận diện theo ô (tile) cho ảnh rất lớn ở tab Ảnh và Thư mục
+        "sliced_inference": False,
+        # Kích thước mỗi ô (pixel)
+        "tile_size": 1024,
+        # Tỉ lệ chồng lấn giữa các ô liền kề (0 - 0.9)
+        "tile_overlap": 0.2,
+        # Số ô được đưa vào model trong một lần inference (0 = dùng batch_size)
+        "tile_batch_size": 0,
+        # Lưu kết quả nhận diện thư mục (SQLite) để không chạy lại ảnh và model không đổi
+        "detection_cache": True,
+        # Đường dẫn tệp cache (để trống để dùng thư mục mặc định)
+        "detection_cache_path": "",
+        # Số tiến trình xử lý thư mục (0 hoặc 1 = một luồng trong ứng dụng)
+        "folder_workers": 0,
+        # Số luồng torch/OpenCV cho mỗi tiến trình (0 = chia đều số nhân CPU)
+        "threads_per_worker": 0,
+        # Gom frame từ nhiều camera thành lô khi dùng chung một model
+        "dynamic_batching": False,
+        # Số frame tối đa trong một lô
+        "stream_max_batch": 8,
+        # Thời gian chờ tối đa (ms) để lô được lấp đầy
+        "stream_max_wait_ms": 10,
+        # Tốc độ đọc camera (0 = theo FPS của camera)
+        "capture_fps": 0,
+        # Xử lý tệp video / thư mục ảnh nhanh nhất có thể thay vì theo FPS của nguồn
+        "source_fast_mode": False,
+        # Theo dõi đối tượng giữa các frame bỏ qua (ID cố định cho mỗi đối tượng)
+        "tracking": False,
+        "track_iou_threshold": 0.3,
+        "track_max_age": 30,
+        # Bỏ qua nhận diện khi khung cảnh không thay đổi
+        "motion_gate": False,
+        "motion_sensitivity": 0.01,
+        "motion_max_idle_s": 2.0,
+        # Vùng quan tâm [x1, y1, x2, y2] theo tỉ lệ khung hình (0 - 1), lưu riêng theo tab và nguồn
+        # ("camera:<nguồn>", "picture", "folder:<thư mục>"), không có vùng = toàn bộ khung hình
+        "rois": {},
+        # Frame skip tự động theo thời gian inference (chỉnh trong hộp thoại Frame Skip)
+        "adaptive_frame_skip": False,
+        "frame_skip_min": 1,
+        "frame_skip_max": 30,
+        "frame_skip_target_load": 0.5,
+        "frame_skip_target_latency_ms": 0,
+        # Ghi frame nhận diện ra đĩa ở nền: số luồng, kích thước hàng đợi và cách xử lý khi đầy
+        # ("block", "drop_oldest" hoặc "drop_new")
+        "writer_threads": 2,
+        "writer_queue_size": 32,
+        "writer_policy": "drop_oldest",
+        # Ghi các frame nhận diện vào một tệp video + tệp kết quả (JSON Lines) thay vì 3 ảnh JPEG mỗi frame
+        "session_recording": False,
+        "session_codec": "MJPG",
+        # Giới hạn lưu trữ frame nhận diện của phiên camera (0 = không giới hạn): số frame, dung lượng ảnh (MB),
+        # tuổi tối đa (giây); số frame gần nhất giữ trong bộ nhớ, các frame cũ hơn được ghi ra đĩa
+        "session_max_frames": 10000,
+        "session_max_mb": 2048,
+        "session_max_age_s": 0,
+        "session_memory_frames": 64,
+        # Số bộ đệm giải mã được dùng lại khi đọc camera (0 = tắt, cấp phát mới mỗi frame)
+        "frame_pool_size": 0,
+    }
+
     def __init__(self, ui):
         self.ui = ui
         
@@ -36,8 +127,13 @@ class Settings:
         self.default_config = {
             "save_path": self.default_downloads_path,
             "save_prompt_type": self.SAVE_TO_CONFIGURED_PATH,
+            **self.INFERENCE_DEFAULTS,
         }
         
+        # Khởi tạo các thiết lập inference với giá trị mặc định
+        for key, default_value in self.INFERENCE_DEFAULTS.items():
+            setattr(self, key, default_value)
+        
         # Tạo thư mục configuration nếu không tồn tại (chỉ khi chạy từ mã nguồn)
         if not getattr(sys, 'frozen', False):
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
@@ -60,6 +156,8 @@ class Settings:
             # Update config_data với các giá trị hiện tại
             self.config_data["save_path"] = self.save_path
             self.config_data["save_prompt_type"] = self.save_prompt_type
+            for key in self.INFERENCE_DEFAULTS:
+                self.config_data[key] = getattr(self, key)
             
             with open(self.config_path, 'w', encoding='utf-8') as file:
                 json.dump(self.config_data, file, indent=4, ensure_ascii=False)
@@ -100,6 +198,8 @@ class Settings:
                 # Load vào instance attributes
                 self.save_path = self.config_data.get("save_path", self.default_downloads_path)
                 self.save_prompt_type = self.config_data.get("save_prompt_type", self.SAVE_TO_CONFIGURED_PATH)
+                for key, default_value in self.INFERENCE_DEFAULTS.items():
+                    setattr(self, key, self.config_data.get(key, default_value))
             else:
                 # Tạo cấu hình mặc định nếu tệp không tồn tại
                 self.save_path = self.default_downloads_path
@@ -1,5 +1,8 @@
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QSplashScreen
+import os
+import multiprocessing
+
+from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QSplashScreen, QLabel, QComboBox
 from PySide6.QtGui import QPixmap, QIcon
 from PySide6.QtCore import Qt, QTimer
 
@@ -9,6 +12,8 @@ from controller.picture_detect import PictureDetector
 from controller.multiple_picture_detect import MultiplePictureDetector
 from controller.settings import Settings
 from module.model import model_instance
+from module.model_loader import ModelLoaderThread
+from module.model_registry import model_registry
 
 
 class MainWindow(QMainWindow):
@@ -26,36 +31,170 @@ class MainWindow(QMainWindow):
 
             print(self.settings.save_prompt_type)
 
+            # Giới hạn bộ nhớ cho các model được giữ trong registry
+            model_registry.set_memory_budget(self.settings.model_memory_budget_mb)
+
             # Connect model selection button
             self.ui.buttonChooseModel.clicked.connect(self.select_model)
+            self.model_loader = None
+
+            # Loaded models (switching between them does not reload) and the tab they apply to
+            self.comboBoxLoadedModels = QComboBox(self.ui.modelGroup)
+            self.comboBoxLoadedModels.setMinimumSize(200, 30)
+            self.comboBoxLoadedModels.setToolTip("Các model đã tải, chọn để chuyển đổi ngay lập tức")
+            self.comboBoxModelTarget = QComboBox(self.ui.modelGroup)
+            self.comboBoxModelTarget.setMinimumSize(120, 30)
+            self.comboBoxModelTarget.setToolTip("Tab sử dụng model được chọn")
+            self.model_targets = [
+                ("Tất cả các tab", None),
+                ("Camera", self.camera_detector),
+                ("Ảnh", self.picture_detector),
+                ("Thư mục", self.multiple_picture_detector)
+            ]
+            for label, _ in self.model_targets:
+                self.comboBoxModelTarget.addItem(label)
+            self.ui.model_layout.addWidget(self.comboBoxLoadedModels)
+            self.ui.model_layout.addWidget(self.comboBoxModelTarget)
+            self.comboBoxLoadedModels.activated.connect(self.switch_model)
+
+            # Permanent status bar label with model load/latency metrics
+            self.model_metrics_label = QLabel("")
+            self.ui.statusbar.addPermanentWidget(self.model_metrics_label)
+            self.metrics_timer = QTimer(self)
+            self.metrics_timer.timeout.connect(self.update_model_metrics)
+            self.metrics_timer.start(1000)
 
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể khởi tạo ứng dụng: {str(e)}")
 
     def select_model(self):
         try:
+            if self.model_loader is not None and self.model_loader.isRunning():
+                return
+
             file_path, _ = QFileDialog.getOpenFileName(
                 self,
                 "Chọn Model",
                 "",
-                "Tập tin Model (*.pt *.pth *.weights)"
+                "Tập tin Model (*.pt *.pth *.weights *.onnx)"
             )
 
             if file_path:
                 self.ui.statusbar.showMessage(f"Đang tải Model từ: {file_path}")
                 self.ui.labelPictureDirect.setText("Đang khởi tạo model ...")
-
-                if model_instance.load_model(file_path):
-                    self.ui.labelPictureDirect.setText(file_path)
-                    self.ui.buttonChoosePicture.setEnabled(True)
-                    self.ui.statusbar.showMessage("Model đã được khởi tạo")
-                else:
-                    self.ui.statusbar.showMessage("Model không được khởi tạo thành công. Vui lòng chọn file khác.")
-                    QMessageBox.warning(self, "Lỗi", "Không thể khởi tạo Model. Vui lòng chọn file khác.")
+                self.ui.buttonChooseModel.setEnabled(False)
+
+                # Load and warm up the model on a worker thread so the window stays responsive
+                self.model_loader = ModelLoaderThread(
+                    file_path,
+                    load_options={
+                        'backend': self.settings.inference_backend,
+                        'cache_dir': self.settings.model_cache_dir or None,
+                        'imgsz': self.settings.imgsz or None,
+                        'quantization': self.settings.quantization or None,
+                        'calibration_folder': self.settings.calibration_folder or None
+                    },
+                    warmup_runs=self.settings.warmup_runs,
+                    quantization_report=bool(self.settings.quantization and self.settings.calibration_folder),
+                    replicas=self.settings.inference_replicas,
+                    threads_per_replica=self.settings.threads_per_replica or None
+                )
+                self.model_loader.progress_signal.connect(self.on_model_load_progress)
+                self.model_loader.loaded_signal.connect(lambda metrics: self.on_model_loaded(file_path, metrics))
+                self.model_loader.error_signal.connect(self.on_model_load_error)
+                self.model_loader.start()
 
         except Exception as e:
+            self.ui.buttonChooseModel.setEnabled(True)
             QMessageBox.warning(self, "Lỗi", f"Không thể chọn Model: {str(e)}")
 
+    def on_model_load_progress(self, percent, message):
+        """Show model loading progress in the status bar"""
+        self.ui.statusbar.showMessage(f"{message} ({percent}%)")
+
+    def on_model_loaded(self, file_path, metrics):
+        """Update the UI once the model is loaded and warmed up"""
+        self.ui.buttonChooseModel.setEnabled(True)
+        self.apply_model(self.model_loader.model)
+        self.refresh_loaded_models(self.model_loader.model)
+        self.ui.buttonChoosePicture.setEnabled(True)
+        self.ui.statusbar.showMessage(
+            f"Model đã được khởi tạo - tải: {metrics['load_time']:.2f}s, "
+            f"warm-up: {(metrics['warmup_time'] or 0):.2f}s"
+        )
+        self.update_model_metrics()
+
+        report = self.model_loader.report
+        if report:
+            self.ui.statusbar.showMessage(
+                f"Model INT8: nhanh hơn {report['speedup']:.2f}x, "
+                f"trùng khớp {report['recall'] * 100:.1f}% đối tượng, "
+                f"IoU trung bình {report['mean_iou']:.2f}"
+                + (f", {report['failed_images']} ảnh lỗi" if report.get('failed_images') else "")
+                + f" - báo cáo: {self.model_loader.model.backend.report_path()}"
+            )
+
+    def apply_model(self, model):
+        """Use a loaded model for the tab selected in comboBoxModelTarget"""
+        label, controller = self.model_targets[self.comboBoxModelTarget.currentIndex()]
+        if controller is None:
+            # Switch the active model followed by every tab that has no model of its own
+            model_instance.use(model)
+            model_registry.pin('active', model)
+            for _, target in self.model_targets[1:]:
+                target.set_model(None)
+                model_registry.unpin(target)
+        else:
+            controller.set_model(model)
+            # Models in use are never evicted (their replica pool is shared with the tab)
+            model_registry.pin(controller, model)
+
+        self.ui.labelPictureDirect.setText(f"{model.model_path} ({label})")
+
+    def refresh_loaded_models(self, current_model=None):
+        """List the models held by the registry, most recently used first"""
+        self.comboBoxLoadedModels.clear()
+        for key, model, size in reversed(model_registry.entries()):
+            self.comboBoxLoadedModels.addItem(
+                f"{os.path.basename(model.model_path)} ({size / (1024 * 1024):.0f} MB)",
+                key
+            )
+            if model is current_model:
+                self.comboBoxLoadedModels.setCurrentIndex(self.comboBoxLoadedModels.count() - 1)
+
+    def switch_model(self, index):
+        """Switch to a model already held by the registry"""
+        model = model_registry.get(self.comboBoxLoadedModels.itemData(index))
+        if model is None:
+            self.ui.statusbar.showMessage("Model đã bị giải phóng khỏi bộ nhớ. Vui lòng tải lại.")
+            self.refresh_loaded_models()
+            return
+
+        self.apply_model(model)
+        self.refresh_loaded_models(model)
+        self.ui.statusbar.showMessage(f"Đã chuyển sang model: {model.model_path}")
+
+    def on_model_load_error(self, error_message):
+        """Report a failed model load"""
+        self.ui.buttonChooseModel.setEnabled(True)
+        self.ui.labelPictureDirect.setText("Model không được khởi tạo")
+        self.ui.statusbar.showMessage("Model không được khởi tạo thành công. Vui lòng chọn file khác.")
+        QMessageBox.warning(self, "Lỗi", f"Không thể khởi tạo Model: {error_message}\nVui lòng chọn file khác.")
+
+    def update_model_metrics(self):
+        """Refresh the permanent status bar label with the model load/latency metrics"""
+        metrics = model_instance.metrics
+        if model_instance.model is None or metrics.get('load_time') is None:
+            self.model_metrics_label.setText("")
+            return
+
+        text = f"Tải: {metrics['load_time']:.2f}s"
+        if metrics.get('warmup_time') is not None:
+            text += f" | Warm-up: {metrics['warmup_time']:.2f}s"
+        if metrics.get('latency') is not None:
+            text += f" | Độ trễ: {metrics['latency'] * 1000:.1f} ms"
+        self.model_metrics_label.setText(text)
+
 
 def main():
     try:
@@ -87,4 +226,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Cần cho các tiến trình xử lý thư mục khi chạy từ ứng dụng đóng gói
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -0,0 +1,291 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import importlib.util
+from pathlib import Path
+
+from ultralytics import YOLO
+
+# Default location for exported models (ONNX files, ...)
+DEFAULT_CACHE_DIR = str(Path.home() / ".cache" / "qtobjectdetection" / "models")
+
+# Default inference size used when exporting fixed-size models
+DEFAULT_IMGSZ = 640
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 hash of a file, reading it in chunks
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes read per chunk
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InferenceBackend:
+    """
+    Base class for inference backends.
+
+    A backend turns a weights file into a callable Ultralytics model. Every backend
+    returns standard Ultralytics Results, so the rest of the pipeline does not
+    depend on the backend in use.
+
+    Attributes:
+        name: Backend identifier used in the settings file
+        cache_dir: Directory where derived model files are stored
+        imgsz: Inference size the backend is prepared for
+    """
+    name = None
+
+    def __init__(self, cache_dir=None, imgsz=None):
+        """
+        Initialize the backend
+
+        Args:
+            cache_dir: Directory for derived model files (defaults to DEFAULT_CACHE_DIR)
+            imgsz: Inference size, or None for the model default
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.imgsz = imgsz
+
+    def load(self, model_path):
+        """
+        Load a model
+
+        Args:
+            model_path: Path to the weights file
+
+        Returns:
+            tuple: (model, class_names) where model is callable like YOLO
+        """
+        raise NotImplementedError
+
+    def predict_kwargs(self):
+        """Extra keyword arguments passed to the model on every call"""
+        return {'imgsz': self.imgsz} if self.imgsz else {}
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch backend, runs the weights file directly through YOLO()"""
+    name = 'torch'
+
+    def load(self, model_path):
+        model = YOLO(model_path)
+        return model, getattr(model, 'names', {}) or {}
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    ONNX Runtime backend.
+
+    PyTorch weights are exported to ONNX once and stored in cache_dir under a name
+    derived from the weights hash and the input size, so later starts reuse the
+    exported file. The class names are kept in a JSON file next to it.
+    """
+    name = 'onnx'
+
+    def __init__(self, cache_dir=None, imgsz=None):
+        super().__init__(cache_dir, imgsz or DEFAULT_IMGSZ)
+
+    def cache_path(self, model_path, suffix=''):
+        """
+        Return the cached ONNX path for a weights file
+
+        Args:
+            model_path: Path to the PyTorch weights file
+            suffix: Optional suffix to distinguish derived variants
+
+        Returns:
+            str: Path of the ONNX file inside cache_dir
+        """
+        stem = os.path.splitext(os.path.basename(model_path))[0]
+        key = file_hash(model_path)[:16]
+        return os.path.join(self.cache_dir, f"{stem}_{key}_{self.imgsz}{suffix}.onnx")
+
+    def export(self, model_path):
+        """
+        Export the weights to ONNX if no cached export exists
+
+        Args:
+            model_path: Path to the PyTorch weights file
+
+        Returns:
+            str: Path to the cached ONNX file
+        """
+        onnx_path = self.cache_path(model_path)
+        if os.path.exists(onnx_path) and os.path.exists(onnx_path + '.json'):
+            return onnx_path
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Ultralytics writes the export next to the weights: export a private copy
+        # so read-only weight folders and concurrent loads of the same weights work
+        work_dir = tempfile.mkdtemp(prefix='export_', dir=self.cache_dir)
+        try:
+            work_path = os.path.join(work_dir, os.path.basename(model_path))
+            shutil.copyfile(model_path, work_path)
+            source_model = YOLO(work_path)
+            exported_path = source_model.export(format='onnx', imgsz=self.imgsz, dynamic=True, verbose=False)
+
+            # Move the export into the cache (replace is atomic on the same filesystem)
+            names_path = os.path.join(work_dir, 'names.json')
+            with open(names_path, 'w', encoding='utf-8') as f:
+                json.dump({str(k): v for k, v in (source_model.names or {}).items()}, f, ensure_ascii=False)
+            os.replace(exported_path, onnx_path)
+            os.replace(names_path, onnx_path + '.json')
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return onnx_path
+
+    def load(self, model_path):
+        if importlib.util.find_spec('onnxruntime') is None:
+            raise ImportError("onnxruntime chưa được cài đặt (pip install onnxruntime)")
+
+        if model_path.lower().endswith('.onnx'):
+            model = YOLO(model_path, task='detect')
+            return model, getattr(model, 'names', {}) or {}
+
+        onnx_path = self.export(model_path)
+        return YOLO(onnx_path, task='detect'), self.load_class_names(onnx_path)
+
+    @staticmethod
+    def load_class_names(onnx_path):
+        """Read the class names stored next to a cached ONNX file"""
+        try:
+            with open(onnx_path + '.json', 'r', encoding='utf-8') as f:
+                return {int(k): v for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+
+class OnnxRuntimeInt8Backend(OnnxRuntimeBackend):
+    """
+    ONNX Runtime backend running an INT8 quantized model.
+
+    The float ONNX export of OnnxRuntimeBackend is quantized once (dynamically, or
+    statically using a calibration image folder) and cached next to it.
+    """
+    name = 'onnx-int8'
+
+    def __init__(self, cache_dir=None, imgsz=None, mode='dynamic', calibration_folder=None,
+                 max_calibration_images=200):
+        """
+        Initialize the backend
+
+        Args:
+            cache_dir: Directory for derived model files
+            imgsz: Inference size used for export and calibration
+            mode: 'dynamic' or 'static' quantization
+            calibration_folder: Folder of images used for static calibration and the report
+            max_calibration_images: Maximum number of calibration images used
+        """
+        super().__init__(cache_dir, imgsz)
+        self.mode = mode or 'dynamic'
+        self.calibration_folder = calibration_folder or None
+        self.max_calibration_images = max_calibration_images
+        self.float_path = None
+        self.quantized_path = None
+
+    def calibration_images(self):
+        """Return the calibration image paths (empty list if no folder is configured)"""
+        from module.quantization import list_calibration_images
+
+        if not self.calibration_folder or not os.path.isdir(self.calibration_folder):
+            return []
+        return list_calibration_images(self.calibration_folder, self.max_calibration_images)
+
+    def quantized_cache_path(self, model_path):
+        """
+        Cached path of the quantized model, keyed by mode and calibration set
+
+        The calibration key covers the path, size and modification time of every
+        image, so replacing or editing calibration images produces a new model.
+        """
+        suffix = f"_int8_{self.mode}"
+        if self.mode == 'static':
+            calibration_key = hashlib.sha256()
+            for image_path in self.calibration_images():
+                try:
+                    stat = os.stat(image_path)
+                    signature = f"{image_path}|{stat.st_size}|{stat.st_mtime_ns}"
+                except OSError:
+                    signature = image_path
+                calibration_key.update((signature + '\n').encode('utf-8'))
+            suffix += f"_{calibration_key.hexdigest()[:8]}"
+        return self.cache_path(model_path, suffix)
+
+    def report_path(self):
+        """Path of the accuracy/speed report written next to the quantized model"""
+        return self.quantized_path + '.report.json' if self.quantized_path else None
+
+    def load(self, model_path):
+        from module.quantization import quantize_onnx_model
+
+        if importlib.util.find_spec('onnxruntime') is None:
+            raise ImportError("onnxruntime chưa được cài đặt (pip install onnxruntime)")
+
+        if model_path.lower().endswith('.onnx'):
+            self.float_path = model_path
+            class_names = {}
+        else:
+            self.float_path = self.export(model_path)
+            class_names = self.load_class_names(self.float_path)
+
+        self.quantized_path = self.quantized_cache_path(model_path)
+        if not os.path.exists(self.quantized_path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # Quantize in a private folder: concurrent loads never share a partial file
+            work_dir = tempfile.mkdtemp(prefix='quantize_', dir=self.cache_dir)
+            try:
+                temp_path = os.path.join(work_dir, os.path.basename(self.quantized_path))
+                quantize_onnx_model(
+                    self.float_path,
+                    temp_path,
+                    mode=self.mode,
+                    calibration_images=self.calibration_images(),
+                    imgsz=self.imgsz
+                )
+                os.replace(temp_path, self.quantized_path)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        model = YOLO(self.quantized_path, task='detect')
+        return model, class_names or getattr(model, 'names', {}) or {}
+
+
+# Registry of available backends, keyed by the name used in the settings file
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OnnxRuntimeInt8Backend.name: OnnxRuntimeInt8Backend,
+}
+
+
+def get_backend(name=None, **kwargs):
+    """
+    Create a backend by name
+
+    Args:
+        name: Backend name (see BACKENDS), defaults to 'torch'
+        **kwargs: Arguments passed to the backend constructor
+
+    Returns:
+        InferenceBackend instance
+    """
+    name = name or TorchBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Backend không hợp lệ: {name}. Các backend hỗ trợ: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
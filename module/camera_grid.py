@@ -0,0 +1,94 @@
+import math
+
+import cv2
+import numpy as np
+
+
+class CameraGrid:
+    """
+    Tiled mosaic of the latest frames of several camera streams.
+
+    Frames are stored as they arrive and only composed when the view is
+    refreshed, so the mosaic cost depends on the display rate rather than on the
+    number of cameras times their frame rate. The canvas is reused between
+    refreshes while the grid shape does not change.
+
+    Attributes:
+        cell_width: Width of one tile in pixels
+        cell_height: Height of one tile in pixels
+    """
+
+    def __init__(self, cell_width=640, cell_height=360):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.frames = {}  # {stream_id: {'binding_box': frame, 'warm_up': frame}}
+        self.labels = {}  # {stream_id: label}
+        self._canvases = {}
+
+    def update(self, stream_id, frames, label=None):
+        """Store the latest frames of a stream"""
+        self.frames[stream_id] = frames
+        if label is not None:
+            self.labels[stream_id] = label
+
+    def remove(self, stream_id):
+        """Forget a stream"""
+        self.frames.pop(stream_id, None)
+        self.labels.pop(stream_id, None)
+
+    def clear(self):
+        """Forget all streams"""
+        self.frames.clear()
+        self.labels.clear()
+        self._canvases.clear()
+
+    def shape(self, count):
+        """Return the (rows, columns) used for count streams"""
+        columns = max(1, math.ceil(math.sqrt(count)))
+        return max(1, math.ceil(count / columns)), columns
+
+    def compose(self, key='binding_box'):
+        """
+        Build the mosaic of one view of every stream
+
+        Args:
+            key: Frame key ('binding_box' or 'warm_up')
+
+        Returns:
+            RGB image (numpy array), or None when there is no stream
+        """
+        if not self.frames:
+            return None
+
+        stream_ids = sorted(self.frames, key=str)
+        rows, columns = self.shape(len(stream_ids))
+        canvas_shape = (rows * self.cell_height, columns * self.cell_width, 3)
+        canvas = self._canvases.get(key)
+        if canvas is None or canvas.shape != canvas_shape:
+            canvas = np.zeros(canvas_shape, dtype=np.uint8)
+            self._canvases[key] = canvas
+        else:
+            canvas.fill(0)
+
+        for position, stream_id in enumerate(stream_ids):
+            row, column = divmod(position, columns)
+            top, left = row * self.cell_height, column * self.cell_width
+            frame = self.frames[stream_id].get(key)
+            if frame is not None:
+                self._paste(canvas, frame, top, left)
+
+            label = self.labels.get(stream_id, str(stream_id))
+            cv2.putText(canvas, label, (left + 8, top + 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+        return canvas
+
+    def _paste(self, canvas, frame, top, left):
+        """Resize a frame into a cell, keeping its aspect ratio"""
+        height, width = frame.shape[:2]
+        scale = min(self.cell_width / width, self.cell_height / height)
+        new_width, new_height = max(1, int(width * scale)), max(1, int(height * scale))
+        offset_x = left + (self.cell_width - new_width) // 2
+        offset_y = top + (self.cell_height - new_height) // 2
+        canvas[offset_y:offset_y + new_height, offset_x:offset_x + new_width] = cv2.resize(
+            frame, (new_width, new_height), interpolation=cv2.INTER_AREA
+        )
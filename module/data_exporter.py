@@ -7,6 +7,9 @@ from datetime import datetime
 from PySide6.QtWidgets import QMessageBox, QProgressDialog, QFileDialog, QProgressBar
 from PySide6.QtCore import Qt
 
+from module.detections import Detections
+from module.rendering import OverlayRenderer
+
 # Define constants for save prompt types
 SAVE_TO_CONFIGURED_PATH = 0  # Save to pre-configured path
 SAVE_WITH_PROMPT = 1         # Prompt user to select path before saving
@@ -33,6 +36,7 @@ class DataExporter:
         """
         self.settings = settings
         self.last_export_path = None
+        self.renderer = None  # OverlayRenderer, created when stored frames are exported
         
     def get_destination_directory(self, title="Select directory to save data", source_type="camera"):
         """
@@ -226,7 +230,7 @@ class DataExporter:
             'original_image': image_paths.get('original_image'),
             'binding_box_image': image_paths.get('binding_box_image'),
             'warm_up_image': image_paths.get('warm_up_image'),
-            'detections': detections
+            'detections': Detections.coerce(detections).to_list()
         }
         
         # Write to file
@@ -249,50 +253,27 @@ class DataExporter:
         """
         excel_path = os.path.join(root_dir, 'data_excel', f"{base_filename}.xlsx")
         
-        # Create DataFrames for summary and details
-        df_class = pd.DataFrame(columns=['Class', 'Count'])
-        df_detail = pd.DataFrame(columns=[
-            'Class', 
-            'Confidence', 
-            'Top', 
-            'Left', 
-            'Bottom', 
-            'Right', 
-            'Width', 
-            'Height'
-        ])
+        # Build the details DataFrame column by column
+        detections = Detections.coerce(detections)
+        boxes = detections.xyxy.astype(int)
+        left, top, right, bottom = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
         
-        # Process detection data
-        class_counts = {}
-        for det in detections:
-            class_name = det['class']
-            confidence = det['confidence']
-            bbox = det['bbox']
-            
-            # Extract bounding box coordinates
-            top, left = bbox[1], bbox[0]
-            bottom, right = bbox[3], bbox[2]
-            width = right - left
-            height = bottom - top
-            
-            # Add to details DataFrame
-            df_detail.loc[len(df_detail)] = [
-                class_name, 
-                confidence, 
-                top, 
-                left, 
-                bottom, 
-                right, 
-                width, 
-                height
-            ]
-            
-            # Count by class
-            class_counts[class_name] = class_counts.get(class_name, 0) + 1
+        df_detail = pd.DataFrame({
+            'Class': detections.labels,
+            'Confidence': detections.confidence.astype(float),
+            'Top': top,
+            'Left': left,
+            'Bottom': bottom,
+            'Right': right,
+            'Width': right - left,
+            'Height': bottom - top
+        })
         
-        # Update summary DataFrame
-        for class_name, count in class_counts.items():
-            df_class.loc[len(df_class)] = [class_name, count]
+        # Count by class
+        df_class = pd.DataFrame(
+            list(detections.class_counts().items()),
+            columns=['Class', 'Count']
+        )
         
         # Save to Excel file with multiple sheets
         with pd.ExcelWriter(excel_path) as writer:
@@ -301,6 +282,41 @@ class DataExporter:
             
         return excel_path
     
+    def load_frame_images(self, frame_info, session=None):
+        """
+        Load a stored frame and render its binding box and heat map views
+        
+        Args:
+            frame_info: Stored frame with 'detections' and either 'original_path'
+                or 'session_index' (frame of a recorded session)
+            session: SessionReader of the recording, for recorded frames
+            
+        Returns:
+            dict: 'original', 'binding_box' and 'warm_up' images (empty if the frame cannot be read)
+        """
+        if 'session_index' in frame_info:
+            frame = session.frame(frame_info['session_index'])
+        else:
+            frame = self.read_image(frame_info['original_path'])
+        if frame is None:
+            return {}
+        
+        if self.renderer is None:
+            self.renderer = OverlayRenderer()
+        detections = Detections.coerce(frame_info['detections'])
+        binding_box, _ = self.renderer.draw_detections(frame, detections)
+        return {
+            'original': frame,
+            'binding_box': binding_box,
+            'warm_up': self.renderer.process_warmup(frame, detections)
+        }
+    
+    @staticmethod
+    def read_image(path):
+        """Read an image file as RGB, None if it cannot be read"""
+        image = cv2.imread(path)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if image is not None else None
+        
     def export_single_frame(self, frames, detections):
         """
         Export a single frame with its detection data
@@ -362,7 +378,8 @@ class DataExporter:
         Export all frames with detection data
         
         Args:
-            frame_data: Dictionary with 'images' and 'detections' lists
+            frame_data: Dictionary with 'images' and 'detections' lists, and a
+                SessionReader under 'session' for frames recorded to video
             
         Returns:
             dict: Dictionary with export info or None if canceled
@@ -428,8 +445,19 @@ class DataExporter:
                 base_filename = f"detection_{timestamp}"
                 
                 try:
-                    # Copy image files
-                    paths = self.copy_image_files(frame_info, root_dir, base_filename)
+                    # Copy image files, or extract recorded frames from the session video.
+                    # Frames stored without their overlay views get them rendered now
+                    if 'session_index' in frame_info:
+                        images = self.load_frame_images(frame_info, frame_data['session'])
+                        paths = self.save_images_directly(images, root_dir, base_filename)
+                    else:
+                        paths = self.copy_image_files(frame_info, root_dir, base_filename)
+                        if not frame_info.get('binding_box_path'):
+                            images = self.load_frame_images(frame_info)
+                            images.pop('original', None)
+                            rendered = self.save_images_directly(images, root_dir, base_filename)
+                            paths['binding_box_path'] = rendered['binding_box_path']
+                            paths['warmup_path'] = rendered['warmup_path']
                     all_paths['image_paths'].append(paths)
                     
                     # Save JSON and Excel data
@@ -499,6 +527,9 @@ class DataExporter:
         except Exception as e:
             QMessageBox.critical(None, "Lỗi", f"Lỗi khi xuất khung hình: {str(e)}")
             return None
+        finally:
+            if frame_data.get('session') is not None:
+                frame_data['session'].close()
 
     def get_export_statistics(self, export_result):
         """
@@ -0,0 +1,160 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from module.backends import file_hash
+from module.detections import Detections
+
+# Default location of the detection cache database
+DEFAULT_CACHE_PATH = str(Path.home() / ".cache" / "qtobjectdetection" / "detections.sqlite")
+
+
+class DetectionCache:
+    """
+    Persistent content-addressed cache of detection results (SQLite).
+
+    Entries are keyed by the SHA-256 of the image content and a model key built
+    from the weights hash and the inference settings, so a result is reused only
+    when neither the image, the model nor the settings changed. Content hashes are
+    remembered per (path, size, mtime), so unchanged files are not read again on
+    later runs.
+
+    Attributes:
+        path: Path of the SQLite database
+    """
+
+    def __init__(self, path=None):
+        """
+        Open (and create if needed) the cache database
+
+        Args:
+            path: Database path, defaults to DEFAULT_CACHE_PATH
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS files ('
+                'path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS detections ('
+                'image_hash TEXT, model_key TEXT, data BLOB, '
+                'PRIMARY KEY (image_hash, model_key))'
+            )
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Open the cache configured in the application settings
+
+        Returns:
+            DetectionCache, or None when the cache is disabled or cannot be opened
+        """
+        if not getattr(settings, 'detection_cache', False):
+            return None
+
+        try:
+            return cls(settings.detection_cache_path or None)
+        except Exception as e:
+            print(f"Không thể mở cache nhận diện: {e}")
+            return None
+
+    def content_hash(self, path):
+        """
+        Return the content hash of a file, reusing the stored one if the file is unchanged
+
+        Args:
+            path: File path
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT size, mtime, hash FROM files WHERE path = ?', (path,)
+            ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return row[2]
+
+        digest = file_hash(path)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO files (path, size, mtime, hash) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime, digest)
+            )
+        return digest
+
+    def model_key(self, model, **settings):
+        """
+        Build the key identifying a model and the settings that affect its output
+
+        Args:
+            model: Loaded YOLOModel
+            **settings: Additional inference settings (tiling, ...)
+
+        Returns:
+            str: Hex digest
+        """
+        description = {
+            'weights': self.content_hash(model.model_path),
+            'load_options': model.load_options,
+            'settings': settings
+        }
+        encoded = json.dumps(description, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, image_hash, model_key, class_names=None):
+        """
+        Look up cached detections
+
+        Args:
+            image_hash: Content hash of the image
+            model_key: Key returned by model_key()
+            class_names: Class names attached to the returned Detections
+
+        Returns:
+            Detections, or None on a cache miss
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data FROM detections WHERE image_hash = ? AND model_key = ?',
+                (image_hash, model_key)
+            ).fetchone()
+        if row is None:
+            return None
+        return Detections.from_array(np.frombuffer(row[0], dtype=np.float32), class_names)
+
+    def put(self, image_hash, model_key, detections):
+        """
+        Store the detections of an image
+
+        Args:
+            image_hash: Content hash of the image
+            model_key: Key returned by model_key()
+            detections: Detections to store
+        """
+        data = np.concatenate(
+            [detections.xyxy, detections.confidence[:, None], detections.class_id[:, None].astype(np.float32)],
+            axis=1
+        ).astype(np.float32)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO detections (image_hash, model_key, data) VALUES (?, ?, ?)',
+                (image_hash, model_key, data.tobytes())
+            )
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._connection.close()
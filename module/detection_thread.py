@@ -1,32 +1,67 @@
 from PySide6.QtCore import QThread, Signal
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QSpinBox, QLabel, QDialogButtonBox
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QSpinBox, QLabel, QDialogButtonBox, QCheckBox
 import cv2
 import time
 import os
 import tempfile
 import shutil
+import threading
 from datetime import datetime
 import numpy as np
 
 from module.model import model_instance
+from module.detections import Detections
+from module.resolution import AdaptiveResolution
+from module.rendering import OverlayRenderer
+from module.pipeline import LatestFrameSlot
+from module.pacing import FramePacer
+from module.frame_source import open_source
+from module.tracking import BoxTracker
+from module.motion import MotionGate
+from module.frame_skip import AdaptiveFrameSkip
+from module.frame_writer import FrameWriterPool
+from module.session_recorder import SessionRecorder, SessionReader
+from module.session_store import SessionStore
 
 class DetectionThread(QThread):
     frame_signal = Signal(dict) 
     error_signal = Signal(str)
-    detection_signal = Signal(list)
+    detection_signal = Signal(object)  # Detections
     static_detection_complete_signal = Signal(dict) 
+    static_batch_complete_signal = Signal()
+    source_finished_signal = Signal()  # End of a video file or image sequence
     
-    def __init__(self, camera_index):
+    def __init__(self, camera_index, model=None):
         super().__init__()
+        # Camera index, video file, image folder/pattern or stream URL (see open_source)
         self.camera_index = camera_index
+        self.source = None
+        
+        # Process file sources as fast as possible instead of at their frame rate
+        self.fast_mode = False
+        
+        # Model used by this thread (defaults to the active model)
+        self.model = model or model_instance
         self.running = False
         self.detecting = False
         self.processing_static_image = False
         
         # Temporary storage
         self.temp_dir = tempfile.mkdtemp()
-        self.temp_images = []
-        self.temp_detections = []
+        # Saved frames: recent ones in memory, older ones spilled to disk, bounded by retention limits
+        self.temp_store = SessionStore(os.path.join(self.temp_dir, "store"))
+        
+        # Optional FramePool of leased decode buffers (None = allocate every frame); frames are
+        # shared read-only between the stages, a consumer that draws on a frame works on its own copy
+        self.frame_pool = None
+        
+        # Background JPEG writers of the temporary frames (created on first use if not set)
+        self.writer = None
+        
+        # Record detected frames into a video file + detection sidecar instead of JPEG files
+        self.record_session = False
+        self.session_codec = "MJPG"
+        self.recorder = None
         
         # Frame storage
         self.current_frame = None
@@ -36,85 +71,275 @@ class DetectionThread(QThread):
         
         # Processing settings
         self.frame_count = 0
-        self.frame_skip = 1
+        
+        # Frame skip (fixed, or adapted to the measured inference times)
+        self.skip_control = AdaptiveFrameSkip()
+        
+        # Inference resolution (capture-side downscaling, optionally adaptive)
+        self.resolution = AdaptiveResolution(self.model.inference_size())
+        
+        # Shared InferenceScheduler batching frames across streams, or None
+        self.scheduler = None
+        
+        # Capture -> inference -> render pipeline (newest frame wins between stages)
+        self.inference_slot = LatestFrameSlot()
+        self.render_slot = LatestFrameSlot()
+        self.result_slot = LatestFrameSlot()
+        self.inferred_frames = 0
+        self.preview_frames = 0
+        
+        # BoxTracker carrying boxes (with track ids) across frames skipped by inference, or None
+        self.tracker = None
+        
+        # MotionGate skipping inference while the scene is static, or None
+        self.motion_gate = None
+        
+        # Capture pacing (0 = frame rate reported by the camera)
+        self.capture_fps = 0
+        self.pacer = FramePacer()
         
         # Static image processing
         self.static_image_path = None
         self.static_image_results = None
-        
-        # Performance optimization
-        self.color_cache = {}
+        self.static_image_paths = []
+        self.static_batch_size = 1
+        self.slicer = None  # SlicedInference for very large static images, or None
+        self.roi = None  # RegionInference restricting inference to regions of interest, or None
+        self.cache = None  # DetectionCache reused across folder runs, or None
+        self.cache_hits = 0
+        
+        # Bounding box and heat map rendering
+        self.renderer = OverlayRenderer()
+
+    @property
+    def frame_skip(self):
+        """Current frame skip (1 = every frame is inferred)"""
+        return self.skip_control.skip
+
+    @frame_skip.setter
+    def frame_skip(self, value):
+        self.skip_control.skip = max(1, int(value))
 
     def run(self):
         self.running = True
         
         # Handle static image processing
+        if self.processing_static_image and self.static_image_paths:
+            self.process_static_batch()
+            self.processing_static_image = False
+            return
+
         if self.processing_static_image and self.static_image_path:
             self.process_static_image()
             self.processing_static_image = False
             return
             
-        # Regular camera processing
-        cap = cv2.VideoCapture(self.camera_index)
+        # Regular camera processing (frames are decoded on the source's own thread)
+        source = open_source(self.camera_index, pool=self.frame_pool)
         
-        if not cap.isOpened():
+        if not source.is_opened():
+            source.release()
             self.error_signal.emit(f"Cannot open camera {self.camera_index}")
             self.running = False
             return
+        self.source = source
+        fast = self.fast_mode and not source.live
 
-        while self.running:
-            ret, frame = cap.read()
-            if not ret:
-                self.error_signal.emit("Error reading frame from camera")
-                break
+        # Inference and rendering run on their own threads so a slow model never stalls capture
+        for slot in (self.inference_slot, self.render_slot, self.result_slot):
+            slot.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        stages = [
+            threading.Thread(target=self._inference_stage, name=f"Inference-{self.camera_index}", daemon=True),
+            threading.Thread(target=self._render_stage, name=f"Render-{self.camera_index}", daemon=True)
+        ]
+        for stage in stages:
+            stage.start()
+        
+        self.pacer = FramePacer.for_source(source, self.capture_fps)
+
+        try:
+            while self.running:
+                ret, raw_frame, lease = source.read_leased()
+                if not ret:
+                    if source.live:
+                        self.error_signal.emit("Error reading frame from camera")
+                    else:
+                        self.source_finished_signal.emit()
+                    break
+                    
+                # Increase frame counter
+                self.frame_count += 1
                 
-            # Increase frame counter
-            self.frame_count += 1
-            
-            # Convert from BGR to RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.current_frame = frame.copy()
-            
-            # Create copies for different processing
-            binding_box_frame = frame.copy()
-            warmup_frame = frame.copy()
-            
-            # Process detection on selected frames
-            if self.frame_count % self.frame_skip == 0 and self.detecting and model_instance.model is not None:
-                try:
-                    # Perform detection
-                    detections = model_instance.detect(frame)
-                    if detections:
-                        # Draw binding box
-                        binding_box_frame, self.current_detections = self.draw_detections(
-                            binding_box_frame, 
-                            detections
-                        )
-                        # Process warm up visualization
-                        warmup_frame = self.process_warmup(
-                            warmup_frame, 
-                            detections
-                        )
-                        
-                        self.current_detected_frame = binding_box_frame.copy()
-                        self.current_warmup_frame = warmup_frame.copy()
-                        self.detection_signal.emit(detections)
-                        
-                        # Save frame and detection to temp storage
-                        self.save_temp_frame(frame, detections, binding_box_frame, warmup_frame)
-                        
-                except Exception as e:
-                    print(f"Detection error: {str(e)}")
-            
-            # Send frames to UI
-            self.frame_signal.emit({
-                'binding_box': binding_box_frame,
-                'warm_up': warmup_frame
-            })
+                # Convert from BGR to RGB: this frame is shared with the preview and writers, never pooled
+                frame = cv2.cvtColor(raw_frame, cv2.COLOR_BGR2RGB)
+                self.current_frame = frame
                 
-            time.sleep(1/30)  # Limit to 30fps
+                # Offer the frame to inference, a newer frame replaces one still waiting
+                if self.frame_count % self.frame_skip == 0 and self.detecting and self.model.model is not None:
+                    if fast:
+                        # Recorded footage: wait for inference instead of dropping frames
+                        self.inference_slot.wait_empty()
+                    # The inference stage now owns the lease of the raw frame
+                    replaced = self.inference_slot.put((self.frame_count, raw_frame, frame, time.perf_counter(), lease))
+                    lease = replaced[4] if replaced is not None else None
+                if lease is not None:
+                    lease.release()
+                
+                # Every captured frame goes to the preview
+                self.render_slot.put((self.frame_count, frame))
+                    
+                # Sleep only for what is left of the frame period
+                if fast:
+                    self.pacer.tick()
+                else:
+                    self.pacer.wait()
+        finally:
+            self.running = False
+            for slot in (self.inference_slot, self.render_slot, self.result_slot):
+                slot.close()
+            for stage in stages:
+                stage.join()
+            source.release()
+            self.source = None
 
-        cap.release()
+    def _inference_stage(self):
+        """Pipeline stage: run the model on the newest offered frame"""
+        last_detections = None
+        while self.running:
+            item = self.inference_slot.get(timeout=0.1)
+            if item is None:
+                continue
+
+            frame_id, raw_frame, frame, captured, lease = item
+            try:
+                # Static scene: reuse the last detections instead of running the model
+                gate = self.motion_gate
+                if gate is not None and last_detections is not None and not gate.check(raw_frame):
+                    self.result_slot.put((frame_id, frame, last_detections, True))
+                    continue
+
+                # Downscale the raw capture for inference before any color conversion
+                inference_frame, scale = self.resolution.prepare(raw_frame)
+                if scale != 1.0:
+                    inference_frame = cv2.cvtColor(inference_frame, cv2.COLOR_BGR2RGB)
+                else:
+                    inference_frame = frame
+
+                # Perform detection at the current inference size
+                start = time.perf_counter()
+                if self.roi is not None:
+                    # Only the region crops go to the model (batched, not through the scheduler)
+                    detections = self.roi.detect(inference_frame, imgsz=self.resolution.size)
+                elif self.scheduler is not None:
+                    detections = self.scheduler.detect(
+                        inference_frame, stream_id=self.camera_index, imgsz=self.resolution.size
+                    )
+                else:
+                    detections = self.model.detect(inference_frame, imgsz=self.resolution.size)
+                done = time.perf_counter()
+                self.resolution.update(done - start)
+                self.skip_control.update(done - start, done - captured, self.pacer.period)
+                
+                # Map boxes back to full-resolution display coordinates
+                if detections is not None and scale != 1.0:
+                    detections = detections.scale(scale)
+                if detections is not None:
+                    self.inferred_frames += 1
+                    if gate is not None:
+                        if last_detections is None:
+                            gate.check(raw_frame)  # first inference becomes the reference
+                        # Without raw Results: their plot() would show the old image
+                        last_detections = detections.subset(slice(None))
+                    self.result_slot.put((frame_id, frame, detections, False))
+                    
+            except Exception as e:
+                print(f"Detection error: {str(e)}")
+            finally:
+                # The raw frame is not used past this item (thumbnails and resized frames are copies)
+                if lease is not None:
+                    lease.release()
+
+    def _render_stage(self):
+        """Pipeline stage: overlay the latest detections on each captured frame and publish results"""
+        latest = None  # (frame_id, detections, binding_box_frame, warmup_frame) of the last inference
+        while self.running:
+            item = self.render_slot.get(timeout=0.1)
+            if item is None:
+                continue
+
+            frame_id, frame = item
+            try:
+                result = self.result_slot.get(timeout=0)
+                if result is not None:
+                    latest = self._publish_detections(*result)
+                if not self.detecting:
+                    latest = None
+
+                if latest is not None and latest[0] == frame_id and latest[1]:
+                    binding_box_frame, warmup_frame = latest[2], latest[3]
+                    if self.roi is not None:
+                        # Keep the current detected frame clean, draw the regions on a copy
+                        binding_box_frame = binding_box_frame.copy()
+                else:
+                    # Frames without inference: boxes predicted by the tracker, or the last boxes
+                    boxes = latest[1] if latest is not None else None
+                    if latest is not None and self.tracker is not None:
+                        boxes = self.tracker.predict(frame_id)
+                    if boxes:
+                        # Both renderers draw on their own copy
+                        binding_box_frame, _ = self.draw_detections(frame, boxes)
+                        warmup_frame = self.process_warmup(frame, boxes)
+                    else:
+                        # The captured frame is shared (read-only), the regions are drawn on a copy
+                        binding_box_frame = frame.copy() if self.roi is not None else frame
+                        warmup_frame = frame
+
+                if self.roi is not None:
+                    self.roi.draw(binding_box_frame)
+
+                # Send frames to UI
+                self.preview_frames += 1
+                self.frame_signal.emit({
+                    'binding_box': binding_box_frame,
+                    'warm_up': warmup_frame
+                })
+            except Exception as e:
+                print(f"Render error: {str(e)}")
+
+    def _publish_detections(self, frame_id, frame, detections, reused=False):
+        """
+        Render the inferred frame, store it and emit its detections
+
+        Detections reused by the motion gate are shown and emitted but not saved
+        again to the temporary storage.
+        """
+        if self.tracker is not None:
+            # Track ids are drawn by the overlay, so the raw Results plot is not used
+            detections = self.tracker.update(detections, frame_id)
+        if not detections:
+            return frame_id, detections, frame, frame
+
+        # Draw binding box (the renderers draw on their own copy, frame stays untouched)
+        binding_box_frame, self.current_detections = self.draw_detections(frame, detections)
+        # Process warm up visualization
+        warmup_frame = self.process_warmup(frame, detections)
+        detections.release_result()
+        
+        # Rendered frames are never modified afterwards, the references are kept as they are
+        self.current_detected_frame = binding_box_frame
+        self.current_warmup_frame = warmup_frame
+        self.detection_signal.emit(detections)
+        
+        # Save frame and detection to temp storage
+        if not reused and self.record_session:
+            self.record_temp_frame(frame_id, frame, detections)
+        elif not reused:
+            self.save_temp_frame(frame, detections)
+        return frame_id, detections, binding_box_frame, warmup_frame
 
     def detect_static_image(self, image_path):
         """Process a static image for detection"""
@@ -127,6 +352,24 @@ class DetectionThread(QThread):
         self.start()
         return True
         
+    def detect_static_images(self, image_paths, batch_size=8):
+        """
+        Process a list of static images, batch_size images per inference call
+
+        Each processed image is reported through static_detection_complete_signal
+        (with an extra 'image_path' key), and static_batch_complete_signal is
+        emitted once the whole list has been handled.
+
+        Args:
+            image_paths: List of image file paths
+            batch_size: Number of images sent to the model in one call
+        """
+        self.static_image_paths = list(image_paths)
+        self.static_batch_size = max(1, int(batch_size))
+        self.processing_static_image = True
+        self.start()
+        return True
+
     def process_static_image(self):
         """Process the static image specified by static_image_path"""
         try:
@@ -139,50 +382,17 @@ class DetectionThread(QThread):
             # Convert BGR to RGB
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            # Create copies for processing
-            binding_box_frame = frame.copy()
-            warmup_frame = frame.copy()
-            
             # Perform detection if model is loaded
-            if model_instance.model is not None:
-                detections = model_instance.detect(frame)
+            if self.model.model is not None:
+                if self.roi:
+                    detections = self.roi.detect(frame)
+                elif self.slicer:
+                    detections = self.slicer.detect(frame)
+                else:
+                    detections = self.model.detect(frame)
                 
                 if detections:
-                    # Draw binding boxes
-                    binding_box_frame, detections_data = self.draw_detections(
-                        binding_box_frame,
-                        detections
-                    )
-                    
-                    # Process warm up visualization
-                    warmup_frame = self.process_warmup(
-                        warmup_frame,
-                        detections
-                    )
-                    
-                    # Save results to temp storage
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                    
-                    # Save the processed images to temp directory
-                    temp_original_path = os.path.join(self.temp_dir, f"static_original_{timestamp}.jpg")
-                    temp_binding_box_path = os.path.join(self.temp_dir, f"static_binding_box_{timestamp}.jpg")
-                    temp_warmup_path = os.path.join(self.temp_dir, f"static_warmup_{timestamp}.jpg")
-                    
-                    cv2.imwrite(temp_original_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-                    cv2.imwrite(temp_binding_box_path, cv2.cvtColor(binding_box_frame, cv2.COLOR_RGB2BGR))
-                    cv2.imwrite(temp_warmup_path, cv2.cvtColor(warmup_frame, cv2.COLOR_RGB2BGR))
-                    
-                    # Store results
-                    self.static_image_results = {
-                        'timestamp': timestamp,
-                        'original_path': temp_original_path,
-                        'binding_box_path': temp_binding_box_path,
-                        'warmup_path': temp_warmup_path,
-                        'detections': detections,
-                        'original_frame': frame,
-                        'binding_box_frame': binding_box_frame,
-                        'warmup_frame': warmup_frame
-                    }
+                    self.static_image_results = self._build_static_results(frame, detections)
                     
                     # Emit the results
                     self.static_detection_complete_signal.emit(self.static_image_results)
@@ -194,196 +404,222 @@ class DetectionThread(QThread):
         except Exception as e:
             self.error_signal.emit(f"Error processing static image: {str(e)}")
 
-    def save_temp_frame(self, original_frame, detections, binding_box_frame, warmup_frame):
-        """Save frame and detection to temporary memory"""
+    def process_static_batch(self):
+        """
+        Process the images in static_image_paths in batches
+
+        Images found in the cache are neither decoded nor rendered: their results
+        only carry 'image_path', 'detections' and 'cached' (like the folder engine
+        results), the views are rendered by the caller when the image is shown.
+        """
+        try:
+            if self.model.model is None:
+                self.error_signal.emit("Model not loaded. Please load a model first.")
+                return
+
+            self.cache_hits = 0
+            model_key = self.cache.model_key(self.model, **self._cache_settings()) if self.cache else None
+
+            for start in range(0, len(self.static_image_paths), self.static_batch_size):
+                if not self.running:
+                    break
+
+                # Cache hits are emitted before any image is read
+                paths = []
+                hashes = []
+                for image_path in self.static_image_paths[start:start + self.static_batch_size]:
+                    image_hash, cached = self._cache_lookup(image_path, model_key)
+                    if cached is None:
+                        paths.append(image_path)
+                        hashes.append(image_hash)
+                        continue
+
+                    self.cache_hits += 1
+                    if not cached:
+                        self.error_signal.emit(f"No objects detected in the image: {os.path.basename(image_path)}")
+                        continue
+                    self.static_detection_complete_signal.emit(
+                        {'image_path': image_path, 'detections': cached, 'cached': True}
+                    )
+
+                # Read and convert the images missing from the cache
+                frames = []
+                missing = []
+                for image_path, image_hash in zip(paths, hashes):
+                    frame = cv2.imread(image_path)
+                    if frame is None:
+                        self.error_signal.emit(f"Could not read image: {image_path}")
+                        continue
+                    missing.append((image_path, image_hash))
+                    frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+                if not frames:
+                    continue
+
+                batch_detections = self._detect_frames(frames)
+                if batch_detections is None:
+                    self.error_signal.emit("Error running batch detection")
+                    break
+
+                for (image_path, image_hash), frame, detections in zip(missing, frames, batch_detections):
+                    if self.cache and image_hash is not None:
+                        self.cache.put(image_hash, model_key, detections)
+                    if not self.running:
+                        break
+
+                    if not detections:
+                        self.error_signal.emit(f"No objects detected in the image: {os.path.basename(image_path)}")
+                        continue
+
+                    results = self._build_static_results(frame, detections)
+                    results['image_path'] = image_path
+                    self.static_image_results = results
+                    self.static_detection_complete_signal.emit(results)
+
+        except Exception as e:
+            self.error_signal.emit(f"Error processing static images: {str(e)}")
+        finally:
+            self.static_image_paths = []
+            self.static_batch_complete_signal.emit()
+
+    def _cache_settings(self):
+        """Inference settings that change the detections, part of the cache key"""
+        if self.roi is not None:
+            return self.roi.cache_settings()
+        if self.slicer is None:
+            return {}
+        return {'tile_size': self.slicer.tile_size, 'tile_overlap': self.slicer.overlap}
+
+    def _cache_lookup(self, image_path, model_key):
+        """
+        Look an image up in the detection cache without decoding it
+
+        Returns:
+            tuple: (content hash or None, cached Detections or None)
+        """
+        if not self.cache:
+            return None, None
+        try:
+            image_hash = self.cache.content_hash(image_path)
+        except OSError:
+            return None, None
+        return image_hash, self.cache.get(image_hash, model_key, self.model.class_names)
+
+    def _detect_frames(self, frames):
+        """
+        Detect objects on a batch of frames
+
+        Returns:
+            list: One Detections per frame, or None on error
+        """
+        if self.roi:
+            # The region crops of all images share the inference calls
+            return self.roi.detect_batch(frames)
+        if self.slicer:
+            # Each large image already yields a batch of tiles
+            results = [self.slicer.detect(frame) for frame in frames]
+            return None if any(detections is None for detections in results) else results
+        return self.model.detect_batch(frames, batch_size=self.static_batch_size)
+
+    def _build_static_results(self, frame, detections):
+        """Render and store the visualizations of a processed static image"""
+        # Draw binding boxes
+        binding_box_frame, _ = self.draw_detections(
+            frame.copy(),
+            detections
+        )
+        
+        # Process warm up visualization
+        warmup_frame = self.process_warmup(
+            frame.copy(),
+            detections
+        )
+        detections.release_result()
+        
+        # Save results to temp storage
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         
-        # Save frames to temp directory
-        temp_original_path = os.path.join(self.temp_dir, f"frame_original_{timestamp}.jpg")
-        temp_binding_box_path = os.path.join(self.temp_dir, f"frame_binding_box_{timestamp}.jpg")
-        temp_warmup_path = os.path.join(self.temp_dir, f"frame_warmup_{timestamp}.jpg")
+        # Save the processed images to temp directory
+        temp_original_path = os.path.join(self.temp_dir, f"static_original_{timestamp}.jpg")
+        temp_binding_box_path = os.path.join(self.temp_dir, f"static_binding_box_{timestamp}.jpg")
+        temp_warmup_path = os.path.join(self.temp_dir, f"static_warmup_{timestamp}.jpg")
         
-        # Save frames
-        cv2.imwrite(temp_original_path, cv2.cvtColor(original_frame, cv2.COLOR_RGB2BGR))
+        cv2.imwrite(temp_original_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
         cv2.imwrite(temp_binding_box_path, cv2.cvtColor(binding_box_frame, cv2.COLOR_RGB2BGR))
         cv2.imwrite(temp_warmup_path, cv2.cvtColor(warmup_frame, cv2.COLOR_RGB2BGR))
         
-        # Save information
-        frame_info = {
+        return {
             'timestamp': timestamp,
             'original_path': temp_original_path,
             'binding_box_path': temp_binding_box_path,
             'warmup_path': temp_warmup_path,
+            'detections': detections,
+            'original_frame': frame,
+            'binding_box_frame': binding_box_frame,
+            'warmup_frame': warmup_frame
+        }
+
+    def save_temp_frame(self, original_frame, detections):
+        """
+        Save frame and detection to temporary memory
+
+        Only the original frame is stored; its binding box and heat map views are
+        rendered again from the detections when the frame is exported
+        (DataExporter.load_frame_images). The JPEG file is written by the
+        background writer pool, so the frame must not be modified afterwards. A
+        frame discarded by the writer's backpressure policy is removed from the
+        temporary data again.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        
+        # Save frame to temp directory
+        temp_original_path = os.path.join(self.temp_dir, f"frame_original_{timestamp}.jpg")
+        
+        # Save information
+        frame_info = {
+            'timestamp': timestamp,
+            'original_path': temp_original_path,
             'detections': detections
         }
         
-        self.temp_images.append(frame_info)
-        self.temp_detections.append(detections)
+        self.temp_store.add(frame_info, pending=True)
+        
+        # Encode and write in the background
+        if self.writer is None:
+            self.writer = FrameWriterPool(on_drop=self.forget_temp_frame, on_written=self.temp_frame_written)
+        if not self.writer.submit([(temp_original_path, original_frame)], tag=frame_info):
+            self.forget_temp_frame(frame_info)
+
+    def record_temp_frame(self, frame_id, frame, detections):
+        """Append a detected frame to the session recording (overlays are rendered again on export)"""
+        if self.recorder is None:
+            # Same retention limits as the temporary frames
+            store = self.temp_store
+            self.recorder = SessionRecorder(
+                os.path.join(self.temp_dir, "session"), fps=self.pacer.fps, codec=self.session_codec,
+                max_frames=store.max_frames, max_bytes=store.max_bytes, max_age=store.max_age
+            )
+        self.recorder.write(frame, detections, frame_id)
+
+    def forget_temp_frame(self, frame_info):
+        """Remove a frame discarded by the writer from the temporary data"""
+        self.temp_store.remove(frame_info)
+
+    def temp_frame_written(self, frame_info):
+        """Account a frame written by the writer in the temporary data"""
+        self.temp_store.written(frame_info)
 
     def get_color_for_class(self, class_id):
         """Create random but consistent color for each class"""
-        # Use cache to optimize performance
-        if class_id in self.color_cache:
-            return self.color_cache[class_id]
-        
-        # Create a unique numeric value from string for seed
-        hash_value = 0
-        for char in str(class_id):
-            hash_value = hash_value * 31 + ord(char)
-        
-        # Use hash as seed to create stable color
-        np.random.seed(hash_value % (2**32 - 1))
-        color = tuple(map(int, np.random.randint(0, 255, 3)))
-        
-        # Save to cache
-        self.color_cache[class_id] = color
-        return color
+        return self.renderer.get_color_for_class(class_id)
         
     def draw_detections(self, frame, detections):
         """Draw detection results on frame"""
-        # Try to use model's built-in plot method
-        try:
-            if model_instance.last_results is not None:
-                result_frame = model_instance.plot_detection(
-                    frame,
-                    conf=0.5,
-                    line_width=2,
-                    font_size=0.5,
-                    labels=True
-                )
-                return result_frame, detections
-        except Exception as e:
-            print(f"Error using YOLO's built-in plot: {e}")
-        
-        # Fallback: Use manual drawing method
-        frame_copy = frame.copy()
-        for det in detections:
-            bbox = det['bbox']
-            x1, y1, x2, y2 = map(int, bbox)
-            confidence = det['confidence']
-            class_id = det.get('class', 'Unknown')
-            
-            # Get color for class
-            color = self.get_color_for_class(str(class_id))
-            
-            # Draw bounding box
-            cv2.rectangle(frame_copy, (x1, y1), (x2, y2), color, 2)
-            
-            # Prepare text
-            label = f"{class_id} ({confidence:.2f})"
-            
-            # Draw background for text
-            (text_width, text_height), _ = cv2.getTextSize(
-                label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
-            cv2.rectangle(frame_copy, 
-                        (x1, y1 - text_height - 10), 
-                        (x1 + text_width + 10, y1),
-                        color, -1)
-            
-            # Draw text
-            cv2.putText(frame_copy, label,
-                    (x1 + 5, y1 - 5),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5,
-                    (255, 255, 255), 2)
-                
-        return frame_copy, detections
+        return self.renderer.draw_detections(frame, detections)
 
     def process_warmup(self, frame, detections):
         """Process warm up frame for visualization"""
-        if frame is None or not detections:
-            return frame
-        
-        # Try to use built-in visualization if available
-        try:
-            if model_instance.model is not None and hasattr(model_instance, 'last_results'):
-                results = model_instance.last_results[0]
-                
-                if hasattr(results, 'plot_heat'):
-                    return results.plot_heat()
-                elif hasattr(results, 'plot_thermal'):
-                    return results.plot_thermal()
-        except Exception as e:
-            print(f"Error using thermal visualization: {str(e)}")
-        
-        # Fallback to manual thermal processing
-        processed_frame = frame.copy()
-        
-        # Convert image to grayscale for processing
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Apply blur filter to reduce noise
-        gray = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # Create thermal background image (cool tone)
-        heat_map = cv2.applyColorMap(gray, cv2.COLORMAP_OCEAN)
-        
-        # Create mask for detection area
-        mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-        
-        # Process each detection area
-        for det in detections:
-            bbox = det['bbox']
-            x1, y1, x2, y2 = map(int, bbox)
-            
-            # Add detection area to mask
-            cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
-            
-            # Create "hot" effect for detection area
-            if y2 > y1 and x2 > x1:
-                roi = gray[y1:y2, x1:x2]
-                if roi.size > 0:
-                    # Apply heat colormap to detection area
-                    roi_heat = cv2.applyColorMap(roi, cv2.COLORMAP_JET)
-                    
-                    # Enhance brightness and contrast
-                    roi_enhanced = cv2.convertScaleAbs(roi_heat, alpha=1.3, beta=30)
-                    
-                    # Apply to original frame
-                    processed_frame[y1:y2, x1:x2] = roi_enhanced
-        
-        # Expand mask to create soft transition effect
-        kernel = np.ones((5, 5), np.uint8)
-        mask_dilated = cv2.dilate(mask, kernel, iterations=3)
-        mask_blur = cv2.GaussianBlur(mask_dilated, (21, 21), 0)
-        
-        # Create gradient mask and ensure correct data type
-        gradient_mask = mask_blur.astype(np.float32) / 255.0
-        
-        # Expand to 3 channels
-        gradient_mask_3d = np.stack([gradient_mask] * 3, axis=2)
-        
-        # Combine images
-        blended = (processed_frame.astype(np.float32) * gradient_mask_3d + 
-                heat_map.astype(np.float32) * (1.0 - gradient_mask_3d))
-        
-        # Convert to uint8
-        result = np.clip(blended, 0, 255).astype(np.uint8)
-        
-        # Add borders for detection areas
-        for det in detections:
-            bbox = det['bbox']
-            x1, y1, x2, y2 = map(int, bbox)
-            confidence = det.get('confidence', 0)
-            class_name = det.get('class', 'Unknown')
-            
-            # Border color based on object class
-            color = self.get_color_for_class(str(class_name))
-            
-            # Draw outer border with glow effect
-            cv2.rectangle(result, (x1-1, y1-1), (x2+1, y2+1), (255, 255, 255), 3)
-            cv2.rectangle(result, (x1, y1), (x2, y2), color, 2)
-            
-            # Add class and confidence information
-            label = f"{class_name}: {confidence:.2f}" if confidence else class_name
-            t_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)[0]
-            c2 = x1 + t_size[0] + 3, y1 + t_size[1] + 4
-            
-            # Background for text
-            cv2.rectangle(result, (x1, y1), c2, color, -1)
-            # Text
-            cv2.putText(result, label, (x1, y1 + t_size[1] + 4), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        
-        return result
+        return self.renderer.process_warmup(frame, detections)
 
     # Public API methods
     def get_current_frames(self):
@@ -401,29 +637,64 @@ class DetectionThread(QThread):
             'running': self.running,
             'detecting': self.detecting,
             'processing_static_image': self.processing_static_image,
+            'pending_static_images': len(self.static_image_paths),
+            'cache_hits': self.cache_hits,
             'frame_count': self.frame_count,
-            'frame_skip': self.frame_skip,
+            **self.skip_control.get_status(),
+            **(self.writer.get_stats() if self.writer is not None else {}),
+            **(self.recorder.get_stats() if self.recorder is not None else {}),
+            **self.temp_store.get_stats(),
+            **(self.frame_pool.get_stats() if self.frame_pool is not None else {}),
+            'inferred_frames': self.inferred_frames,
+            'dropped_frames': self.inference_slot.dropped,
+            'preview_frames': self.preview_frames,
+            'tracks': len(self.tracker) if self.tracker is not None else 0,
+            **(self.motion_gate.get_status() if self.motion_gate is not None else {}),
+            'source_position': self.source.position() if self.source else 0,
+            'source_frames': self.source.frame_count() if self.source else 0,
+            **self.pacer.get_status(),
+            **self.resolution.get_status(),
             'has_current_frame': self.current_frame is not None,
             'has_detections': self.current_detections is not None,
             'has_static_image_results': self.static_image_results is not None
         }
     
     def get_temp_data(self):
-        """Return temporary data"""
+        """Return temporary data (waits for the queued frames to be written)"""
+        if self.writer is not None:
+            self.writer.flush()
+        images = self.temp_store.entries()
+        detections = [frame_info['detections'] for frame_info in images]
+        
+        # Recorded frames: finalize the current video segment so it can be read back
+        session = None
+        if self.recorder is not None:
+            self.recorder.finish_segment()
+            self.recorder.flush()
+            session = SessionReader(self.recorder.directory)
+            records = [session.record(record['index']) for record in session.records]
+            images += records
+            detections += [record['detections'] for record in records]
         return {
-            'images': self.temp_images,
-            'detections': self.temp_detections,
+            'images': images,
+            'detections': detections,
+            'session': session,
             'static_image_results': self.static_image_results
         }
 
     def clear_temp_data(self):
         """Clear all temporary data"""
+        # Let the writers finish before deleting their files
+        if self.writer is not None:
+            self.writer.flush()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        
         # Delete image files
-        for frame_info in self.temp_images:
+        for frame_info in self.temp_store.entries():
             try:
                 os.remove(frame_info['original_path'])
-                os.remove(frame_info['binding_box_path'])
-                os.remove(frame_info['warmup_path'])
             except Exception as e:
                 print(f"Error removing temp files: {str(e)}")
         
@@ -446,9 +717,8 @@ class DetectionThread(QThread):
         except Exception as e:
             print(f"Error removing temp directory: {str(e)}")
         
-        # Reset lists
-        self.temp_images = []
-        self.temp_detections = []
+        # Reset the store (its spill file was in the old temp directory)
+        self.temp_store.clear(os.path.join(self.temp_dir, "store"))
         
     def __del__(self):
         """Clean up resources when object is destroyed"""
@@ -460,6 +730,13 @@ class DetectionThread(QThread):
         self.detecting = False
         self.wait()
         
+    def seek(self, frame_index):
+        """Jump to a frame of a video file or image sequence, returns False for live sources"""
+        source = self.source
+        if source is None or source.live:
+            return False
+        return source.seek(frame_index)
+        
     def start_detection(self):
         """Start object detection"""
         self.detecting = True
@@ -469,7 +746,7 @@ class DetectionThread(QThread):
         self.detecting = False
 
 class FrameSkipDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, settings=None):
         super().__init__(parent)
         
         # Thiết lập cửa sổ dialog
@@ -500,6 +777,29 @@ class FrameSkipDialog(QDialog):
         # Thêm vào form layout
         form_layout.addRow("Frame Skip:", self.frame_skip_spin)
         
+        # Chế độ tự động: frame skip thay đổi theo thời gian inference đo được
+        self.adaptive_check = QCheckBox("Adaptive (follow measured inference time)")
+        self.min_skip_spin = self._create_spin(1, 30, 1, "Smallest frame skip used in adaptive mode")
+        self.max_skip_spin = self._create_spin(1, 30, 30, "Largest frame skip used in adaptive mode")
+        self.load_spin = self._create_spin(1, 100, 50, "Share of the time inference may use (CPU budget)")
+        self.load_spin.setSuffix(" %")
+        self.latency_spin = self._create_spin(0, 5000, 0, "End-to-end latency target, 0 = disabled")
+        self.latency_spin.setSuffix(" ms")
+        if settings is not None:
+            self.adaptive_check.setChecked(bool(settings.adaptive_frame_skip))
+            self.min_skip_spin.setValue(settings.frame_skip_min)
+            self.max_skip_spin.setValue(settings.frame_skip_max)
+            self.load_spin.setValue(round(settings.frame_skip_target_load * 100))
+            self.latency_spin.setValue(settings.frame_skip_target_latency_ms)
+        self.adaptive_check.toggled.connect(self._update_adaptive_fields)
+        self._update_adaptive_fields(self.adaptive_check.isChecked())
+        
+        form_layout.addRow(self.adaptive_check)
+        form_layout.addRow("Minimum skip:", self.min_skip_spin)
+        form_layout.addRow("Maximum skip:", self.max_skip_spin)
+        form_layout.addRow("CPU budget:", self.load_spin)
+        form_layout.addRow("Target latency:", self.latency_spin)
+        
         # Thêm giải thích
         info_label = QLabel(
             "Higher values will increase speed but may miss detections.\n"
@@ -519,6 +819,35 @@ class FrameSkipDialog(QDialog):
         layout.addWidget(info_label)
         layout.addWidget(button_box)
         
+    def _create_spin(self, minimum, maximum, value, tooltip):
+        """Tạo spin box cho các thiết lập chế độ tự động"""
+        spin = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(value)
+        spin.setToolTip(tooltip)
+        return spin
+        
+    def _update_adaptive_fields(self, adaptive):
+        """Chỉ bật các ô thiết lập phù hợp với chế độ đang chọn"""
+        self.frame_skip_spin.setToolTip(
+            "Initial frame skip, adjusted automatically" if adaptive else
+            "Number of frames to skip between detections.\n"
+            "Higher values mean faster processing but may miss some frames.\n"
+            "Range: 1-30 frames"
+        )
+        for spin in (self.min_skip_spin, self.max_skip_spin, self.load_spin, self.latency_spin):
+            spin.setEnabled(adaptive)
+        
     def get_frame_skip(self):
         """Trả về giá trị frame skip được chọn"""
-        return self.frame_skip_spin.value()
\ No newline at end of file
+        return self.frame_skip_spin.value()
+        
+    def get_adaptive_settings(self):
+        """Trả về các thiết lập frame skip tự động (theo tên khóa trong cấu hình)"""
+        return {
+            'adaptive_frame_skip': self.adaptive_check.isChecked(),
+            'frame_skip_min': min(self.min_skip_spin.value(), self.max_skip_spin.value()),
+            'frame_skip_max': max(self.min_skip_spin.value(), self.max_skip_spin.value()),
+            'frame_skip_target_load': self.load_spin.value() / 100.0,
+            'frame_skip_target_latency_ms': self.latency_spin.value()
+        }
\ No newline at end of file
@@ -0,0 +1,358 @@
+import numpy as np
+
+
+class Detections:
+    """
+    Columnar container for the detections of one image.
+
+    Boxes, confidences and class ids are kept as NumPy arrays so the model output
+    can be transferred in one bulk copy. Per-box dictionaries (the format used by
+    the rest of the application) are only built when the object is indexed or
+    iterated, and are cached after the first request.
+
+    Attributes:
+        xyxy: (N, 4) float32 array of box corners (x1, y1, x2, y2)
+        confidence: (N,) float32 array of confidences
+        class_id: (N,) int32 array of class ids
+        class_names: Dictionary mapping class id to class name
+        result: Raw Ultralytics Results the detections come from (used for plotting),
+            or None
+        tracker_id: (N,) int64 array of track ids assigned by a BoxTracker, or None
+    """
+
+    def __init__(self, xyxy=None, confidence=None, class_id=None, class_names=None, result=None,
+                 tracker_id=None):
+        """
+        Initialize Detections
+
+        Args:
+            xyxy: Array-like of shape (N, 4) with box corners
+            confidence: Array-like of shape (N,) with confidences
+            class_id: Array-like of shape (N,) with class ids
+            class_names: Optional dictionary mapping class id to class name
+            result: Optional raw Ultralytics Results of the image
+            tracker_id: Optional array-like of shape (N,) with track ids
+        """
+        self.xyxy = np.asarray(xyxy if xyxy is not None else [], dtype=np.float32).reshape(-1, 4)
+        count = len(self.xyxy)
+        self.confidence = np.asarray(
+            confidence if confidence is not None else np.zeros(count), dtype=np.float32
+        ).reshape(-1)
+        self.class_id = np.asarray(
+            class_id if class_id is not None else np.zeros(count), dtype=np.int32
+        ).reshape(-1)
+        self.class_names = class_names or {}
+        self.result = result
+        self.tracker_id = None if tracker_id is None else np.asarray(tracker_id, dtype=np.int64).reshape(-1)
+        self._items = None
+
+    @classmethod
+    def from_array(cls, data, class_names=None, result=None):
+        """
+        Build Detections from an (N, 6) array of [x1, y1, x2, y2, conf, cls] rows
+
+        Args:
+            data: NumPy array as returned by results.boxes.data.cpu().numpy()
+            class_names: Optional dictionary mapping class id to class name
+            result: Optional raw Ultralytics Results of the image
+
+        Returns:
+            Detections object
+        """
+        data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+        return cls(data[:, :4], data[:, 4], data[:, 5].astype(np.int32), class_names, result)
+
+    @classmethod
+    def from_list(cls, items):
+        """
+        Build Detections from a list of detection dictionaries
+
+        Args:
+            items: List of dicts with 'bbox', 'confidence', 'class' and 'class_id' keys
+
+        Returns:
+            Detections object
+        """
+        items = list(items)
+        class_names = {}
+        for item in items:
+            class_names.setdefault(item.get('class_id', -1), item.get('class', 'Unknown'))
+
+        return cls(
+            [item['bbox'] for item in items],
+            [item['confidence'] for item in items],
+            [item.get('class_id', -1) for item in items],
+            class_names
+        )
+
+    @classmethod
+    def coerce(cls, detections):
+        """Return detections as a Detections object, converting lists when needed"""
+        if isinstance(detections, cls):
+            return detections
+        return cls.from_list(detections or [])
+
+    @classmethod
+    def empty(cls, class_names=None):
+        """Return an empty Detections object"""
+        return cls(class_names=class_names)
+
+    def __len__(self):
+        return len(self.xyxy)
+
+    def __bool__(self):
+        return len(self.xyxy) > 0
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        """Integer index returns a detection dict, slices and masks return a Detections subset"""
+        if isinstance(index, (int, np.integer)):
+            return self.to_list()[index]
+        return self.subset(index)
+
+    def __repr__(self):
+        return f"Detections(count={len(self)})"
+
+    def __getstate__(self):
+        """Pickle only the arrays (raw Results stay in the process that produced them)"""
+        state = self.__dict__.copy()
+        state['result'] = None
+        state['_items'] = None
+        return state
+
+    def release_result(self):
+        """Drop the raw Results (and the image it references) once it is no longer needed"""
+        self.result = None
+
+    def subset(self, index):
+        """Return a new Detections holding the selected rows (slice, mask or index array)"""
+        return Detections(
+            self.xyxy[index],
+            self.confidence[index],
+            self.class_id[index],
+            self.class_names,
+            tracker_id=None if self.tracker_id is None else self.tracker_id[index]
+        )
+
+    @classmethod
+    def concatenate(cls, detections_list, class_names=None):
+        """
+        Merge several Detections objects into one
+
+        Args:
+            detections_list: Iterable of Detections
+            class_names: Class names of the merged object (defaults to the first one's)
+
+        Returns:
+            Detections object
+        """
+        detections_list = list(detections_list)
+        if not detections_list:
+            return cls.empty(class_names)
+
+        return cls(
+            np.concatenate([d.xyxy for d in detections_list]),
+            np.concatenate([d.confidence for d in detections_list]),
+            np.concatenate([d.class_id for d in detections_list]),
+            class_names or detections_list[0].class_names
+        )
+
+    def translate(self, offset_x, offset_y):
+        """Return the detections with boxes shifted by (offset_x, offset_y), without raw Results"""
+        offsets = np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.float32)
+        return Detections(self.xyxy + offsets, self.confidence, self.class_id, self.class_names)
+
+    def nms(self, iou_threshold=0.5):
+        """Return the detections left after class-aware non-maximum suppression"""
+        return self.subset(non_max_suppression(self.xyxy, self.confidence, self.class_id, iou_threshold))
+
+    def scale(self, factor_x, factor_y=None):
+        """
+        Return the detections with box coordinates multiplied by a factor
+
+        Used to map boxes found on a downscaled image back to the original image.
+        The raw Results are not kept since they refer to the downscaled image.
+
+        Args:
+            factor_x: Horizontal scale factor
+            factor_y: Vertical scale factor (defaults to factor_x)
+
+        Returns:
+            Detections object
+        """
+        factor_y = factor_x if factor_y is None else factor_y
+        factors = np.array([factor_x, factor_y, factor_x, factor_y], dtype=np.float32)
+        return Detections(
+            self.xyxy * factors, self.confidence, self.class_id, self.class_names, tracker_id=self.tracker_id
+        )
+
+    @property
+    def labels(self):
+        """Array of class names, one per box"""
+        return np.array(
+            [self.class_names.get(class_id, str(class_id)) for class_id in self.class_id.tolist()],
+            dtype=object
+        )
+
+    def class_counts(self):
+        """
+        Count detections per class name
+
+        Returns:
+            dict: {class_name: count} in order of first appearance
+        """
+        class_ids, first_index, counts = np.unique(self.class_id, return_index=True, return_counts=True)
+        order = np.argsort(first_index)
+        return {
+            self.class_names.get(int(class_ids[i]), str(int(class_ids[i]))): int(counts[i])
+            for i in order
+        }
+
+    def iter_boxes(self):
+        """
+        Iterate over boxes without building detection dictionaries
+
+        Yields:
+            tuple: (x1, y1, x2, y2, confidence, class_name) with integer coordinates
+        """
+        boxes = self.xyxy.astype(np.int32).tolist()
+        for (x1, y1, x2, y2), conf, label in zip(boxes, self.confidence.tolist(), self.labels):
+            yield x1, y1, x2, y2, conf, label
+
+    def to_list(self):
+        """
+        Materialize the detections as a list of dictionaries
+
+        Returns:
+            list: [{'bbox': (x1, y1, x2, y2), 'confidence': float, 'class': str, 'class_id': int}, ...]
+                with an extra 'track_id' key when the detections are tracked
+        """
+        if self._items is None:
+            boxes = self.xyxy.astype(np.int32).tolist()
+            self._items = [
+                {
+                    'bbox': tuple(box),
+                    'confidence': conf,
+                    'class': label,
+                    'class_id': class_id
+                }
+                for box, conf, label, class_id in zip(
+                    boxes, self.confidence.tolist(), self.labels, self.class_id.tolist()
+                )
+            ]
+            if self.tracker_id is not None:
+                for item, track_id in zip(self._items, self.tracker_id.tolist()):
+                    item['track_id'] = track_id
+        return self._items
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Compute the pairwise IoU between two sets of boxes
+
+    Args:
+        boxes_a: (N, 4) array of boxes in xyxy format
+        boxes_b: (M, 4) array of boxes in xyxy format
+
+    Returns:
+        (N, M) float32 array of IoU values
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0).astype(np.float32)
+
+
+# Classes with more boxes than this are suppressed box by box instead of with an IoU matrix
+NMS_MATRIX_LIMIT = 1024
+
+
+def _torchvision_nms(boxes, scores, class_ids, iou_threshold):
+    """Class-aware NMS with torchvision.ops.batched_nms, or None when torchvision is not installed"""
+    try:
+        import torch
+        from torchvision.ops import batched_nms
+    except ImportError:
+        return None
+
+    idxs = torch.as_tensor(class_ids if class_ids is not None else np.zeros(len(boxes)), dtype=torch.int64)
+    keep = batched_nms(torch.as_tensor(boxes), torch.as_tensor(scores), idxs, float(iou_threshold))
+    return keep.numpy().astype(np.int64)
+
+
+def _greedy_nms(boxes, scores, iou_threshold):
+    """
+    Greedy NMS of the boxes of one class
+
+    Small groups use one IoU matrix; large groups compare each kept box with the
+    remaining ones only, so memory stays linear in the number of boxes.
+
+    Returns:
+        Array of kept indices, sorted by decreasing score
+    """
+    order = np.argsort(-scores, kind='stable')
+    if len(order) <= NMS_MATRIX_LIMIT:
+        overlaps = box_iou(boxes[order], boxes[order]) > iou_threshold
+        suppressed = np.zeros(len(order), dtype=bool)
+        for i in range(len(order)):
+            if suppressed[i]:
+                continue
+            # Only lower-scored boxes can be suppressed by box i
+            suppressed[i + 1:] |= overlaps[i, i + 1:]
+        return order[~suppressed]
+
+    keep = []
+    while len(order):
+        best, order = order[0], order[1:]
+        keep.append(best)
+        order = order[box_iou(boxes[best], boxes[order])[0] <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def non_max_suppression(boxes, scores, class_ids=None, iou_threshold=0.5):
+    """
+    Class-aware greedy non-maximum suppression
+
+    Uses torchvision.ops.batched_nms when torchvision is installed. Otherwise
+    each class is suppressed on its own (boxes of different classes are never
+    compared), so no IoU matrix spans all the boxes of a crowded image.
+
+    Args:
+        boxes: (N, 4) array of boxes in xyxy format
+        scores: (N,) array of confidences
+        class_ids: Optional (N,) array of class ids
+        iou_threshold: Boxes overlapping a better box above this IoU are removed
+
+    Returns:
+        Array of kept indices, sorted by decreasing score
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if class_ids is not None:
+        class_ids = np.asarray(class_ids).reshape(-1)
+
+    keep = _torchvision_nms(boxes, scores, class_ids, iou_threshold)
+    if keep is not None:
+        return keep
+
+    if class_ids is None:
+        return _greedy_nms(boxes, scores, iou_threshold)
+
+    keep = []
+    for class_id in np.unique(class_ids):
+        indices = np.flatnonzero(class_ids == class_id)
+        keep.append(indices[_greedy_nms(boxes[indices], scores[indices], iou_threshold)])
+    keep = np.concatenate(keep)
+    return keep[np.argsort(-scores[keep], kind='stable')]
@@ -0,0 +1,256 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+from PySide6.QtCore import QThread, Signal
+
+# Model of the current worker process, set by _init_worker()
+_worker = {}
+
+# Default number of worker processes: each one loads a full model
+DEFAULT_MAX_WORKERS = 4
+
+
+def _init_worker(model_path, load_options, threads, slicer_options, regions=None):
+    """
+    Process pool initializer: size the thread pools and load the model once per worker
+
+    torch and OpenCV are limited to `threads` threads each so that the workers
+    together use about one thread per core instead of oversubscribing the CPU.
+    """
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from module.model import YOLOModel
+    from module.slicing import SlicedInference
+    from module.roi import RegionInference
+
+    model = YOLOModel()
+    if not model.load_model(model_path, show_errors=False, **load_options):
+        raise RuntimeError(model.last_error or "Không thể tải model")
+
+    _worker['model'] = model
+    _worker['slicer'] = SlicedInference(model, **slicer_options) if slicer_options else None
+    _worker['roi'] = RegionInference(model, regions) if regions else None
+
+
+def _process_images(tasks, batch_size):
+    """
+    Detect a chunk of images in a worker process
+
+    Only the detections are sent back: full-resolution views would cost more
+    to pickle than to render, so the parent renders an image when it is shown.
+
+    Args:
+        tasks: List of (index, image_path) of images missing from the cache
+        batch_size: Number of images per inference call
+
+    Returns:
+        list: One result dict per readable image, with 'index', 'image_path',
+            'detections' and 'cached' keys, or 'index', 'image_path' and 'error'
+            keys on failure
+    """
+    model = _worker['model']
+    slicer = _worker['slicer']
+    roi = _worker['roi']
+
+    results = []
+    frames = []
+    for index, image_path in tasks:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            results.append({'index': index, 'image_path': image_path, 'error': f"Could not read image: {image_path}"})
+            continue
+        frames.append((index, image_path, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+
+    if not frames:
+        return results
+    if roi:
+        detected = roi.detect_batch([item[2] for item in frames])
+    elif slicer:
+        detected = [slicer.detect(item[2]) for item in frames]
+    else:
+        detected = model.detect_batch([item[2] for item in frames], batch_size=batch_size)
+    if detected is None or any(detections is None for detections in detected):
+        raise RuntimeError(model.last_error or "Error running batch detection")
+
+    for (index, image_path, _), detections in zip(frames, detected):
+        detections.release_result()
+        results.append({
+            'index': index,
+            'image_path': image_path,
+            'detections': detections,
+            'cached': False
+        })
+    return results
+
+
+class FolderEngine(QThread):
+    """
+    Folder processing engine backed by a pool of worker processes.
+
+    Each worker loads the model once and limits its torch/OpenCV thread counts to
+    cpu_count / workers. Images are sent in chunks of batch_size; results are
+    emitted in completion order through result_signal, and finished_signal
+    delivers all results in input order once the run is over. Cached detections
+    (DetectionCache) are resolved in this thread before dispatch: hits are
+    emitted without decoding the image, only misses are sent to the workers, and
+    the process pool is not started at all when every image is a hit. Results carry detections only, the views are rendered by the
+    caller when an image is displayed. A chunk that fails is reported image by
+    image through error_signal and the run continues with the other chunks.
+
+    Signals:
+        result_signal(dict): One processed image (see _process_images), completion order
+        error_signal(str): Error message for an image or for the whole run
+        finished_signal(list): [(image_path, detections), ...] in input order
+    """
+    result_signal = Signal(dict)
+    error_signal = Signal(str)
+    finished_signal = Signal(list)
+
+    def __init__(self, model, image_paths, workers=None, threads_per_worker=None,
+                 batch_size=8, slicer=None, cache=None, roi=None):
+        """
+        Initialize the engine
+
+        Args:
+            model: Loaded YOLOModel (its weights path and load options are used by the workers)
+            image_paths: Images to process
+            workers: Number of worker processes (default: cpu_count, at most DEFAULT_MAX_WORKERS)
+            threads_per_worker: torch/OpenCV threads per worker (default: cpu_count / workers)
+            batch_size: Images per chunk and per inference call
+            slicer: Optional SlicedInference whose settings the workers reuse
+            cache: Optional DetectionCache
+            roi: Optional RegionInference whose regions the workers reuse
+        """
+        super().__init__()
+        cpu_count = os.cpu_count() or 1
+        self.model = model
+        self.image_paths = list(image_paths)
+        self.workers = max(1, min(int(workers or DEFAULT_MAX_WORKERS), cpu_count))
+        self.threads_per_worker = max(1, int(threads_per_worker or cpu_count // self.workers))
+        self.batch_size = max(1, int(batch_size))
+        self.slicer = slicer
+        self.cache = cache
+        self.roi = roi
+        self.cache_hits = 0
+        self.failed = []  # [(image_path, error message), ...] of the chunks that failed
+        self.running = False
+
+    def _slicer_options(self):
+        """Tiling settings forwarded to the workers"""
+        if self.slicer is None:
+            return None
+        return {
+            'tile_size': self.slicer.tile_size,
+            'overlap': self.slicer.overlap,
+            'batch_size': self.slicer.batch_size,
+            'iou_threshold': self.slicer.iou_threshold
+        }
+
+    def _build_tasks(self):
+        """
+        Look the images up in the cache
+
+        Returns:
+            tuple: (hits, misses, hashes, model_key) where hits are result dicts
+                of the cached images, misses the (index, image_path) tasks for the
+                workers and hashes the content hash of each looked up image
+        """
+        hits = []
+        misses = []
+        hashes = {}
+        model_key = None
+        if self.cache:
+            settings = {}
+            if self.roi:
+                settings = self.roi.cache_settings()
+            elif self.slicer:
+                settings = {'tile_size': self.slicer.tile_size, 'tile_overlap': self.slicer.overlap}
+            model_key = self.cache.model_key(self.model, **settings)
+
+        for index, image_path in enumerate(self.image_paths):
+            cached = None
+            if self.cache:
+                try:
+                    hashes[index] = self.cache.content_hash(image_path)
+                    cached = self.cache.get(hashes[index], model_key, self.model.class_names)
+                except OSError:
+                    pass
+            if cached is None:
+                misses.append((index, image_path))
+                continue
+            self.cache_hits += 1
+            hits.append({'index': index, 'image_path': image_path, 'detections': cached, 'cached': True})
+        return hits, misses, hashes, model_key
+
+    def _emit_result(self, result, ordered, hashes, model_key):
+        """Store a result, cache new detections and emit it"""
+        index = result['index']
+        if self.cache and not result['cached'] and index in hashes:
+            self.cache.put(hashes[index], model_key, result['detections'])
+        ordered[index] = (result['image_path'], result['detections'])
+        self.result_signal.emit(result)
+
+    def run(self):
+        self.running = True
+        self.cache_hits = 0
+        self.failed = []
+        ordered = [None] * len(self.image_paths)
+
+        try:
+            hits, misses, hashes, model_key = self._build_tasks()
+            for result in hits:
+                if not self.running:
+                    return
+                self._emit_result(result, ordered, hashes, model_key)
+
+            chunks = [misses[start:start + self.batch_size] for start in range(0, len(misses), self.batch_size)]
+            if not chunks or not self.running:
+                return
+
+            executor = ProcessPoolExecutor(
+                max_workers=min(self.workers, max(1, len(chunks))),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model.model_path, self.model.load_options, self.threads_per_worker,
+                          self._slicer_options(), self.roi.regions if self.roi else None)
+            )
+            try:
+                futures = {executor.submit(_process_images, chunk, self.batch_size): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    if not self.running:
+                        break
+
+                    try:
+                        chunk_results = future.result()
+                    except Exception as e:
+                        # Report the images of the failed chunk and go on with the others
+                        for _, image_path in futures[future]:
+                            self.failed.append((image_path, str(e)))
+                            self.error_signal.emit(f"{os.path.basename(image_path)}: {str(e)}")
+                        continue
+
+                    for result in chunk_results:
+                        if 'error' in result:
+                            self.error_signal.emit(result['error'])
+                            continue
+
+                        self._emit_result(result, ordered, hashes, model_key)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        except Exception as e:
+            self.error_signal.emit(f"Error processing static images: {str(e)}")
+        finally:
+            self.running = False
+            self.finished_signal.emit([item for item in ordered if item is not None])
+
+    def stop(self):
+        """Stop after the chunks that are already running"""
+        self.running = False
@@ -0,0 +1,107 @@
+import threading
+
+import numpy as np
+
+
+class FrameLease:
+    """
+    Exclusive use of a pooled buffer until release() is called.
+
+    The holder of a lease is the only one allowed to touch its array. Ownership
+    is handed over with the lease itself (decoder queue, capture loop, inference
+    stage) and the last holder calls release(); a lease that is dropped without
+    being released is never reused, its buffer is simply garbage collected.
+
+    Attributes:
+        array: The leased buffer
+    """
+
+    def __init__(self, pool, array):
+        self.array = array
+        self._pool = pool
+
+    def release(self):
+        """Give the buffer back to the pool (further calls do nothing)"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool._give_back(self.array)
+
+
+class FramePool:
+    """
+    Preallocated frame buffers reused by the capture loop.
+
+    Frames are decoded (cap.read(image=...)) into leased buffers instead of a
+    newly allocated array each time. A buffer goes back to the pool only when its
+    lease is explicitly released, so the pool never guesses whether a frame is
+    still in use; frames that leave the capture pipeline (preview, writers,
+    session files) are converted into new arrays and are never pooled. When no
+    free buffer matches, a new one is allocated, which is what the loop did
+    before.
+
+    Attributes:
+        max_buffers: Maximum number of free buffers kept by the pool
+        reused: Number of leases served by a free buffer
+        allocated: Number of buffers allocated
+    """
+
+    def __init__(self, max_buffers=16):
+        self.max_buffers = max(1, int(max_buffers))
+        self.reused = 0
+        self.allocated = 0
+        self._free = []
+        self._leased = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create the pool from the application settings, None if it is disabled"""
+        if not settings.frame_pool_size:
+            return None
+        return cls(settings.frame_pool_size)
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        Lease a buffer
+
+        Args:
+            shape: Frame shape, e.g. (height, width, 3)
+            dtype: Element type
+
+        Returns:
+            FrameLease whose array has undefined content
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        with self._lock:
+            self._leased += 1
+            for index, buffer in enumerate(self._free):
+                if buffer.shape == shape and buffer.dtype == dtype:
+                    del self._free[index]
+                    self.reused += 1
+                    return FrameLease(self, buffer)
+            self.allocated += 1
+        return FrameLease(self, np.empty(shape, dtype))
+
+    def _give_back(self, buffer):
+        """Return a released buffer to the free list, dropping the oldest one when full"""
+        with self._lock:
+            self._leased = max(0, self._leased - 1)
+            self._free.append(buffer)
+            if len(self._free) > self.max_buffers:
+                del self._free[0]
+
+    def clear(self):
+        """Drop the free buffers (leased buffers stay valid)"""
+        with self._lock:
+            self._free = []
+
+    def get_stats(self):
+        """Return the number of free and leased buffers, reused buffers and allocations"""
+        with self._lock:
+            return {
+                'frame_pool_buffers': len(self._free),
+                'frame_pool_leased': self._leased,
+                'frame_pool_reused': self.reused,
+                'frame_pool_allocated': self.allocated
+            }
@@ -0,0 +1,124 @@
+import math
+import time
+from collections import deque
+
+
+class AdaptiveFrameSkip:
+    """
+    Frame skip controller for live detection.
+
+    In fixed mode the skip is the value chosen by the operator. In adaptive mode
+    the skip follows the measured inference times: with a CPU budget of
+    target_load, inference may use at most that fraction of the wall-clock time,
+    so one frame in ceil(inference_time / (target_load * frame_period)) is
+    inferred. With a latency target, the skip is also raised while the
+    end-to-end latency (capture to result) stays above it. The skip is always
+    kept between min_skip and max_skip, and every change is logged.
+
+    Attributes:
+        skip: Current frame skip (1 = every frame is inferred)
+        adaptive: Whether the skip follows the measurements
+        target_load: Fraction (0 - 1) of the time inference may use
+        target_latency: End-to-end latency target in seconds, 0 to disable
+        min_skip: Smallest skip used in adaptive mode
+        max_skip: Largest skip used in adaptive mode
+        changes: Number of adjustments made so far
+        history: Recent changes as (time, old_skip, new_skip, reason) tuples
+    """
+
+    def __init__(self, skip=1, adaptive=False, target_load=0.5, target_latency=0.0,
+                 min_skip=1, max_skip=30, window=10, history=100):
+        """
+        Initialize the controller
+
+        Args:
+            skip: Initial (or fixed) frame skip
+            adaptive: Adjust the skip to the measurements
+            target_load: Fraction of the time inference may use
+            target_latency: End-to-end latency target in seconds, 0 to disable
+            min_skip: Smallest skip used in adaptive mode
+            max_skip: Largest skip used in adaptive mode
+            window: Number of inferences averaged before each decision
+            history: Number of changes kept in the log
+        """
+        self.min_skip = max(1, int(min_skip))
+        self.max_skip = max(self.min_skip, int(max_skip))
+        self.skip = max(1, int(skip))
+        if adaptive:
+            self.skip = min(max(self.skip, self.min_skip), self.max_skip)
+        self.adaptive = adaptive
+        self.target_load = min(max(float(target_load), 0.01), 1.0)
+        self.target_latency = max(0.0, float(target_latency))
+        self.changes = 0
+        self.history = deque(maxlen=max(1, int(history)))
+        self._samples = deque(maxlen=max(1, int(window)))
+
+    @classmethod
+    def from_settings(cls, settings, skip=1):
+        """Create the controller from the application settings and the chosen skip"""
+        return cls(
+            skip,
+            adaptive=bool(settings.adaptive_frame_skip),
+            target_load=settings.frame_skip_target_load,
+            target_latency=settings.frame_skip_target_latency_ms / 1000.0,
+            min_skip=settings.frame_skip_min,
+            max_skip=settings.frame_skip_max
+        )
+
+    def update(self, inference_time, latency, frame_period):
+        """
+        Record one inference and adjust the skip if needed
+
+        Args:
+            inference_time: Time spent in the model, in seconds
+            latency: Time from capture to result, in seconds
+            frame_period: Capture frame period in seconds
+
+        Returns:
+            bool: True if the skip changed
+        """
+        if not self.adaptive:
+            return False
+
+        self._samples.append((inference_time, latency))
+        if len(self._samples) < self._samples.maxlen:
+            return False
+
+        mean_time = sum(sample[0] for sample in self._samples) / len(self._samples)
+        mean_latency = sum(sample[1] for sample in self._samples) / len(self._samples)
+
+        # Smallest skip keeping inference within the CPU budget
+        skip = math.ceil(mean_time / (self.target_load * max(frame_period, 1e-3)))
+        reason = f"inference {mean_time * 1000:.0f} ms, CPU budget {self.target_load * 100:.0f}%"
+
+        if self.target_latency:
+            if mean_latency > self.target_latency:
+                if skip <= self.skip:
+                    skip = self.skip + 1
+                reason += f", latency {mean_latency * 1000:.0f} ms > {self.target_latency * 1000:.0f} ms"
+            elif skip < self.skip and mean_latency > self.target_latency * 0.8:
+                # Close to the latency target: do not lower the skip yet
+                skip = self.skip
+
+        # Start a new window so the next decision only sees the new skip
+        self._samples.clear()
+        return self._set(min(max(skip, self.min_skip), self.max_skip), reason)
+
+    def _set(self, skip, reason):
+        """Apply a new skip and log the change"""
+        if skip == self.skip:
+            return False
+
+        self.history.append((time.time(), self.skip, skip, reason))
+        print(f"Frame skip {self.skip} -> {skip} ({reason})")
+        self.skip = skip
+        self.changes += 1
+        return True
+
+    def get_status(self):
+        """Return the current skip, the mode and the number of changes"""
+        return {
+            'frame_skip': self.skip,
+            'adaptive_frame_skip': self.adaptive,
+            'frame_skip_changes': self.changes
+        }
@@ -0,0 +1,312 @@
+import os
+import glob
+import queue
+import threading
+import time
+
+import cv2
+
+# Extensions recognised as images when a folder is opened as a sequence
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')
+
+
+class FrameSource:
+    """
+    Base class of the frame sources used by the camera pipeline.
+
+    Every source returns BGR frames like cv2.VideoCapture.read().
+
+    Attributes:
+        name: Human readable description of the source
+        live: True for cameras and network streams (frames cannot be replayed)
+    """
+    live = False
+
+    def __init__(self, name):
+        self.name = name
+
+    def is_opened(self):
+        raise NotImplementedError
+
+    def read(self):
+        """Return (ok, frame) like cv2.VideoCapture.read()"""
+        raise NotImplementedError
+
+    def read_leased(self):
+        """
+        Return (ok, frame, lease) where lease is the FrameLease of a pooled frame, or None
+
+        The caller owns the lease and must release() it once it no longer uses
+        the frame; the frame of a lease must not be kept after that.
+        """
+        ok, frame = self.read()
+        return ok, frame, None
+
+    def fps(self):
+        """Frame rate reported by the source, 0 when unknown"""
+        return 0.0
+
+    def frame_count(self):
+        """Number of frames, 0 for live sources"""
+        return 0
+
+    def position(self):
+        """Index of the next frame"""
+        return 0
+
+    def seek(self, frame_index):
+        """Move to a frame, returns False when the source cannot seek"""
+        return False
+
+    def release(self):
+        pass
+
+
+class CaptureSource(FrameSource):
+    """
+    Camera index, video file or network stream (RTSP, HTTP, ...) read with cv2.VideoCapture
+
+    With a FramePool, read_leased() decodes into leased buffers of the size of
+    the previous frame instead of newly allocated arrays; read() never uses the
+    pool since its caller cannot give the buffer back.
+    """
+
+    def __init__(self, source, pool=None):
+        super().__init__(str(source))
+        self.live = isinstance(source, int) or '://' in str(source)
+        self.cap = cv2.VideoCapture(source)
+        self.pool = pool
+        self._shape = None
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ok, frame = self.cap.read()
+        if ok:
+            self._shape = frame.shape
+        return ok, frame
+
+    def read_leased(self):
+        if self.pool is None or self._shape is None:
+            ok, frame = self.read()
+            return ok, frame, None
+
+        lease = self.pool.acquire(self._shape)
+        ok, frame = self.cap.read(image=lease.array)
+        if not ok or frame is not lease.array:
+            # Failed read or new resolution (OpenCV allocated another array)
+            lease.release()
+            lease = None
+        if ok:
+            self._shape = frame.shape
+        return ok, frame, lease
+
+    def fps(self):
+        return self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    def frame_count(self):
+        return 0 if self.live else int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    def position(self):
+        return int(self.cap.get(cv2.CAP_PROP_POS_FRAMES) or 0)
+
+    def seek(self, frame_index):
+        if self.live:
+            return False
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, max(0, int(frame_index)))
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Folder of images or glob pattern, read in file name order"""
+
+    def __init__(self, pattern, fps=30.0):
+        super().__init__(pattern)
+        if os.path.isdir(pattern):
+            paths = [
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            ]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(paths)
+        self._fps = fps
+        self._index = 0
+
+    def is_opened(self):
+        return bool(self.paths)
+
+    def read(self):
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index])
+            self._index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def fps(self):
+        return self._fps
+
+    def frame_count(self):
+        return len(self.paths)
+
+    def position(self):
+        return self._index
+
+    def seek(self, frame_index):
+        self._index = min(max(0, int(frame_index)), len(self.paths))
+        return True
+
+
+class ThreadedSource(FrameSource):
+    """
+    Decode the frames of another source on a dedicated thread.
+
+    Live sources keep only the newest decoded frame so the consumer never reads a
+    stale buffer. Replayable sources (files, image sequences) use a small bounded
+    queue so no frame is lost and decoding overlaps with processing.
+    """
+
+    def __init__(self, source, queue_size=4):
+        super().__init__(source.name)
+        self.source = source
+        self.live = source.live
+        self._frames = queue.Queue(maxsize=1 if source.live else max(1, queue_size))
+        self._lock = threading.Lock()
+        self._position = source.position()
+        self._generation = 0
+        self._stopped = False
+        # Guards the hand-off of source.release() to a decoder still blocked in read()
+        self._exit_lock = threading.Lock()
+        self._exited = False
+        self._release_on_exit = False
+        self._thread = threading.Thread(target=self._decode, name=f"Decode-{source.name}", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _release(item):
+        """Give back the lease of a queued frame that will never be read"""
+        if item[4] is not None:
+            item[4].release()
+
+    def _decode(self):
+        """Decoder thread"""
+        try:
+            self._decode_frames()
+        finally:
+            with self._exit_lock:
+                self._exited = True
+                release = self._release_on_exit
+            if release:
+                self.source.release()
+
+    def _decode_frames(self):
+        """Decode frames into the queue until release()"""
+        while not self._stopped:
+            with self._lock:
+                generation = self._generation
+                position = self.source.position()
+                ok, frame, lease = self.source.read_leased()
+
+            item = (generation, position, ok, frame, lease)
+            if self.live:
+                # Replace the frame that was not consumed yet
+                try:
+                    self._release(self._frames.get_nowait())
+                except queue.Empty:
+                    pass
+                self._frames.put(item)
+            else:
+                while not self._stopped:
+                    try:
+                        self._frames.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+            if not ok and not self.live:
+                # End of file: wait for a seek or for release()
+                while not self._stopped and generation == self._generation:
+                    time.sleep(0.05)
+
+    def is_opened(self):
+        return self.source.is_opened()
+
+    def read(self, timeout=5.0):
+        ok, frame, lease = self.read_leased(timeout)
+        if lease is not None:
+            # The caller keeps the frame: copy it and give the buffer back
+            frame = frame.copy()
+            lease.release()
+        return ok, frame
+
+    def read_leased(self, timeout=5.0):
+        while True:
+            try:
+                item = self._frames.get(timeout=timeout)
+            except queue.Empty:
+                return False, None, None
+            generation, position, ok, frame, lease = item
+            # Skip frames decoded before the last seek
+            if generation == self._generation:
+                self._position = position + 1
+                return ok, frame, lease
+            self._release(item)
+
+    def fps(self):
+        return self.source.fps()
+
+    def frame_count(self):
+        return self.source.frame_count()
+
+    def position(self):
+        return self._position
+
+    def seek(self, frame_index):
+        with self._lock:
+            if not self.source.seek(frame_index):
+                return False
+            self._generation += 1
+            self._position = self.source.position()
+        return True
+
+    def release(self):
+        self._stopped = True
+        self._thread.join(timeout=1.0)
+        with self._exit_lock:
+            if not self._exited:
+                # Still blocked in read() (stalled stream): the decoder releases the source when it returns
+                self._release_on_exit = True
+                return
+        self.source.release()
+
+
+def open_source(spec, threaded=True, pool=None):
+    """
+    Open a frame source from a camera index, video file, image folder/pattern or stream URL
+
+    Args:
+        spec: int or digit string (camera), URL containing '://' (stream),
+            folder or glob pattern (image sequence), or file path (video)
+        threaded: Decode on a dedicated thread
+        pool: Optional FramePool the video frames are decoded into (see read_leased())
+
+    Returns:
+        FrameSource
+    """
+    if isinstance(spec, str) and spec.isdigit():
+        spec = int(spec)
+
+    if isinstance(spec, int) or '://' in spec:
+        source = CaptureSource(spec, pool)
+    elif os.path.isdir(spec) or any(char in spec for char in '*?['):
+        source = ImageSequenceSource(spec)
+    else:
+        source = CaptureSource(spec, pool)
+
+    if threaded and source.is_opened():
+        return ThreadedSource(source)
+    return source
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+# Policies applied when the queue is full
+BLOCK = "block"              # Wait for a free slot
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued job
+DROP_NEW = "drop_new"        # Discard the job being submitted
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEW)
+
+
+class FrameWriterPool:
+    """
+    Background JPEG writers with a bounded queue.
+
+    A job is a group of frames written together (for example the original,
+    binding box and heat map views of one detection). Jobs are encoded and
+    written by a few worker threads so the detection pipeline never waits on
+    the encoder or the disk, except with the BLOCK policy when the queue is
+    full. With DROP_OLDEST / DROP_NEW a job is discarded instead and the
+    on_drop callback receives its tag; the on_written callback receives the
+    tag of each job once its files are written.
+
+    Attributes:
+        max_queue: Maximum number of queued jobs
+        policy: One of BLOCK, DROP_OLDEST, DROP_NEW
+        written: Number of jobs written
+        dropped: Number of jobs discarded by the backpressure policy
+        failed: Number of jobs with at least one failed write
+    """
+
+    def __init__(self, workers=2, max_queue=32, policy=DROP_OLDEST, on_drop=None, on_written=None):
+        """
+        Initialize the pool and start its worker threads
+
+        Args:
+            workers: Number of writer threads
+            max_queue: Maximum number of queued jobs
+            policy: Backpressure policy when the queue is full
+            on_drop: Optional callable receiving the tag of each discarded job
+            on_written: Optional callable receiving the tag of each written job
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.max_queue = max(1, int(max_queue))
+        self.policy = policy
+        self.on_drop = on_drop
+        self.on_written = on_written
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._jobs = deque()
+        self._active = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._max_depth = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._threads = [
+            threading.Thread(target=self._work, name=f"FrameWriter-{index}", daemon=True)
+            for index in range(max(1, int(workers)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @classmethod
+    def from_settings(cls, settings, on_drop=None, on_written=None):
+        """Create the pool from the application settings"""
+        policy = settings.writer_policy if settings.writer_policy in POLICIES else DROP_OLDEST
+        return cls(settings.writer_threads, settings.writer_queue_size, policy, on_drop, on_written)
+
+    def submit(self, files, tag=None):
+        """
+        Queue frames for writing
+
+        Args:
+            files: List of (path, RGB image) pairs; the images must not be modified afterwards
+            tag: Value passed to on_drop if the job is discarded
+
+        Returns:
+            bool: True if the job was queued, False if it was discarded (DROP_NEW or closed pool)
+        """
+        queued = True
+        discarded = []
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._jobs) >= self.max_queue:
+                if self.policy == DROP_NEW:
+                    queued = False
+                    discarded.append(tag)
+                elif self.policy == DROP_OLDEST:
+                    discarded.append(self._jobs.popleft()[1])
+                else:
+                    self._condition.wait_for(lambda: len(self._jobs) < self.max_queue or self._closed)
+                    if self._closed:
+                        return False
+            self.dropped += len(discarded)
+
+            if queued:
+                self._jobs.append((files, tag, time.perf_counter()))
+                self._max_depth = max(self._max_depth, len(self._jobs))
+                self._condition.notify_all()
+
+        # Outside the lock: the callback may take other locks
+        if self.on_drop is not None:
+            for discarded_tag in discarded:
+                self.on_drop(discarded_tag)
+        return queued
+
+    def _work(self):
+        """Writer thread: encode and write the queued jobs"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs or self._closed)
+                if not self._jobs:
+                    return
+                files, tag, queued_at = self._jobs.popleft()
+                self._active += 1
+                self._condition.notify_all()
+
+            ok = True
+            for path, image in files:
+                try:
+                    ok = cv2.imwrite(path, cv2.cvtColor(image, cv2.COLOR_RGB2BGR)) and ok
+                except Exception as e:
+                    print(f"Error writing frame {path}: {e}")
+                    ok = False
+
+            # Before the job is marked done, so flush() also waits for the callback
+            if self.on_written is not None:
+                try:
+                    self.on_written(tag)
+                except Exception as e:
+                    print(f"Error in frame writer callback: {e}")
+
+            latency = time.perf_counter() - queued_at
+            with self._condition:
+                self._active -= 1
+                self.written += 1
+                self.failed += 0 if ok else 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued job has been written
+
+        Returns:
+            bool: True if the queue was drained before the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._jobs and not self._active, timeout)
+
+    def close(self, wait=True):
+        """Write the queued jobs (when wait is True) and stop the worker threads"""
+        if wait:
+            self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+
+    def get_stats(self):
+        """
+        Return the writer metrics
+
+        Returns:
+            dict: current and maximum queue depth, jobs written / dropped / failed and
+                mean / maximum latency from submit to written, in milliseconds
+        """
+        with self._condition:
+            return {
+                'writer_queue_depth': len(self._jobs),
+                'writer_max_depth': self._max_depth,
+                'writer_written': self.written,
+                'writer_dropped': self.dropped,
+                'writer_failed': self.failed,
+                'writer_latency_ms': self._latency_total / self.written * 1000 if self.written else 0.0,
+                'writer_max_latency_ms': self._latency_max * 1000
+            }
@@ -1,84 +1,324 @@
-from PySide6.QtCore import QObject
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QThread, QCoreApplication
 from PySide6.QtWidgets import QMessageBox
-from ultralytics import YOLO
+
+from module.backends import OnnxRuntimeBackend, OnnxRuntimeInt8Backend, get_backend
+from module.detections import Detections
 
 class YOLOModel(QObject):
     def __init__(self):
         super().__init__()
         self.model = None
-        self.last_results = None  # Thêm biến để lưu kết quả nguyên bản
         self.class_names = {}  # Thêm biến để lưu tên các lớp
+        self.backend = None  # Backend inference đang được sử dụng
+        self.model_path = None
+        self.load_options = {}
+        self.last_error = None
+        self.pool = None  # ModelReplicaPool khi bật chế độ nhiều bản sao
         
-    def load_model(self, model_path):
+        # Thời gian tải, warm-up và độ trễ inference ổn định (giây)
+        self.metrics = {
+            'load_time': None,
+            'warmup_time': None,
+            'latency': None
+        }
+        
+    def load_model(self, model_path, backend=None, cache_dir=None, imgsz=None,
+                   quantization=None, calibration_folder=None, show_errors=True):
+        """
+        Load a model through an inference backend
+
+        Args:
+            model_path: Path to the weights file
+            backend: Backend name ('torch', 'onnx' or 'onnx-int8'), defaults to 'torch'
+            cache_dir: Directory for exported models (ONNX, ...)
+            imgsz: Inference size, or None for the model default
+            quantization: None, 'dynamic' or 'static' to run an INT8 quantized model
+                (implies the 'onnx-int8' backend)
+            calibration_folder: Image folder used for static calibration and the report
+            show_errors: Show a message box on failure; when False (worker threads) the
+                error is only stored in last_error
+
+        Returns:
+            bool: True if the model was loaded
+        """
         try:
-            self.model = YOLO(model_path)
-            # Lưu tên các lớp nếu có
-            if hasattr(self.model, 'names'):
-                self.class_names = self.model.names
+            start = time.perf_counter()
+            backend_options = {}
+            if quantization:
+                backend = OnnxRuntimeInt8Backend.name
+                backend_options = {'mode': quantization, 'calibration_folder': calibration_folder}
+
+            inference_backend = get_backend(backend, cache_dir=cache_dir, imgsz=imgsz, **backend_options)
+            self.model, self.class_names = inference_backend.load(model_path)
+            self.backend = inference_backend
+            self.model_path = model_path
+            self.load_options = {
+                'backend': backend,
+                'cache_dir': cache_dir,
+                'imgsz': imgsz,
+                'quantization': quantization,
+                'calibration_folder': calibration_folder
+            }
+            self.last_error = None
+            self.metrics = {
+                'load_time': time.perf_counter() - start,
+                'warmup_time': None,
+                'latency': None
+            }
             return True
         except Exception as e:
-            QMessageBox.critical(
-                None,
-                "Lỗi tải Model",
-                f"Không thể tải model: {str(e)}\nVui lòng kiểm tra đường dẫn và thử lại."
-            )
+            self.last_error = str(e)
+            if show_errors:
+                QMessageBox.critical(
+                    None,
+                    "Lỗi tải Model",
+                    f"Không thể tải model: {str(e)}\nVui lòng kiểm tra đường dẫn và thử lại."
+                )
             return False
+
+    def use(self, other):
+        """
+        Switch this instance to an already loaded model (no reloading)
+
+        Args:
+            other: Loaded YOLOModel whose model and backend are shared
+        """
+        self.model = other.model
+        self.class_names = other.class_names
+        self.backend = other.backend
+        self.model_path = other.model_path
+        self.metrics = other.metrics
+        self.load_options = other.load_options
+        self.pool = other.pool
+
+    def enable_replicas(self, replicas, threads_per_replica=None, warmup_runs=0):
+        """
+        Serve detect()/detect_batch() from a pool of independent model replicas
+
+        Concurrent callers (camera and folder tabs, several cameras) then run on
+        separate replicas instead of sharing one model object. The model already
+        loaded here is the first replica, so only replicas - 1 copies are added.
+
+        Args:
+            replicas: Number of replicas, values below 2 disable the pool
+            threads_per_replica: Process-wide PyTorch thread count of each inference
+                call (default: cpu_count / replicas)
+            warmup_runs: Warm-up passes run by each added replica
+        """
+        from module.model_pool import ModelReplicaPool
+
+        self.disable_replicas()
+        if self.model is None or replicas < 2:
+            return
+
+        self.pool = ModelReplicaPool(
+            self.model_path,
+            replicas=replicas,
+            threads_per_replica=threads_per_replica,
+            load_options=self.load_options,
+            warmup_runs=warmup_runs,
+            primary=self
+        )
+
+    def disable_replicas(self):
+        """Stop the replica pool, if any"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def _report_error(self, title, message):
+        """Show an error dialog on the GUI thread, print it on worker threads"""
+        self.last_error = message
+        app = QCoreApplication.instance()
+        if app is not None and QThread.currentThread() == app.thread():
+            QMessageBox.critical(None, title, message)
+        else:
+            print(f"{title}: {message}")
+
+    def inference_size(self):
+        """Return the inference resolution used by the current backend"""
+        if self.backend is not None and self.backend.imgsz:
+            return self.backend.imgsz
+        return 640
+
+    def warmup(self, runs=3, imgsz=None):
+        """
+        Run dummy inference passes so the first real detection is not slowed down
+        by lazy initialization (memory allocation, kernel selection, ...)
+
+        Args:
+            runs: Number of warm-up passes
+            imgsz: Warm-up resolution, defaults to the inference resolution
+
+        Returns:
+            float: Total warm-up time in seconds
+        """
+        if self.model is None or runs <= 0:
+            return 0.0
+
+        size = imgsz or self.inference_size()
+        dummy = np.zeros((size, size, 3), dtype=np.uint8)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            run_start = time.perf_counter()
+            self._predict(dummy)
+            # The last pass is the best estimate of the steady-state latency
+            self.metrics['latency'] = time.perf_counter() - run_start
+
+        self.metrics['warmup_time'] = time.perf_counter() - start
+        return self.metrics['warmup_time']
+
+    def _record_latency(self, seconds):
+        """Update the steady-state latency with an exponential moving average"""
+        previous = self.metrics.get('latency')
+        self.metrics['latency'] = seconds if previous is None else 0.9 * previous + 0.1 * seconds
         
-    def detect(self, image):
+    def detect(self, image, imgsz=None):
+        """
+        Detect objects in one image
+
+        Results are returned to the caller only (nothing is stored on the model),
+        so detect() can be called from several threads when a replica pool is enabled.
+
+        Args:
+            image: RGB image (numpy array)
+            imgsz: Inference size for this call, defaults to the backend size
+
+        Returns:
+            Detections, or None on error
+        """
         if self.model is None:
             return None
+
+        if self.pool is not None:
+            return self.pool.detect(image, imgsz=imgsz)
             
         try:
             # Thực hiện inference
-            results = self.model(image, verbose=False)
-            
-            # Lưu kết quả nguyên bản để sử dụng trong các phương thức vẽ
-            self.last_results = results
-            
-            # Lấy kết quả detection
-            detections = []
+            start = time.perf_counter()
+            results = self._predict(image, imgsz=imgsz)
+            self._record_latency(time.perf_counter() - start)
             
             # Check if we have any results
             if results and len(results) > 0:
-                for result in results[0].boxes.data:
-                    # Convert tensor to list if needed
-                    result_data = result.cpu().numpy() if hasattr(result, 'cpu') else result
-                    
-                    # Extract detection data
-                    x1, y1, x2, y2, conf, cls = result_data
-                    class_id = int(cls)
-                    
-                    # Lấy tên lớp nếu có
-                    class_name = self.class_names.get(class_id, str(class_id)) if self.class_names else str(class_id)
-                    
-                    detections.append({
-                        'bbox': (int(x1), int(y1), int(x2), int(y2)),
-                        'confidence': float(conf),
-                        'class': class_name,
-                        'class_id': class_id
-                    })
-                
-            return detections
+                return self._parse_result(results[0])
+            return Detections.empty(self.class_names)
         except Exception as e:
-            QMessageBox.critical(
-                None,
+            self._report_error(
                 "Lỗi nhận diện",
                 f"Đã xảy ra lỗi trong quá trình nhận diện: {str(e)}\nVui lòng thử lại."
             )
             return None
+
+    def detect_batch(self, images, batch_size=8, imgsz=None):
+        """
+        Run inference on a list of images, batch_size images per forward pass
+
+        Args:
+            images: List of images (numpy arrays)
+            batch_size: Maximum number of images sent to the model in one call
+            imgsz: Inference size for this call, defaults to the backend size
+
+        Returns:
+            list: One Detections object per input image (same order), or None on error
+        """
+        if self.model is None:
+            return None
+
+        if self.pool is not None:
+            return self.pool.detect_batch(images, batch_size=batch_size, imgsz=imgsz)
+
+        batch_size = max(1, int(batch_size))
+        all_detections = []
+
+        try:
+            for start in range(0, len(images), batch_size):
+                chunk = list(images[start:start + batch_size])
+                call_start = time.perf_counter()
+                results = self._predict(chunk, imgsz=imgsz)
+                self._record_latency((time.perf_counter() - call_start) / max(1, len(chunk)))
+                all_detections.extend(self._parse_result(result) for result in results)
+
+            return all_detections
+        except Exception as e:
+            self._report_error(
+                "Lỗi nhận diện",
+                f"Đã xảy ra lỗi trong quá trình nhận diện: {str(e)}\nVui lòng thử lại."
+            )
+            return None
+
+    def _predict(self, images, imgsz=None):
+        """Gọi model với các tham số của backend hiện tại (imgsz ghi đè độ phân giải nếu có)"""
+        kwargs = self.backend.predict_kwargs() if self.backend is not None else {}
+        if imgsz:
+            kwargs['imgsz'] = imgsz
+        return self.model(images, verbose=False, **kwargs)
+
+    def _parse_result(self, result):
+        """Chuyển kết quả của một ảnh thành Detections (một lần copy duy nhất từ tensor)"""
+        data = result.boxes.data
+        
+        # Convert tensor to numpy in one bulk transfer
+        data = data.cpu().numpy() if hasattr(data, 'cpu') else data
+        
+        # Kết quả nguyên bản được gắn vào Detections, không lưu trên model (an toàn giữa các luồng)
+        return Detections.from_array(data, self.class_names, result=result)
     
-    def get_original_results(self):
-        """Trả về kết quả nguyên bản từ model"""
-        return self.last_results
-    
-    def plot_detection(self, image, conf=0.5, line_width=2, font_size=0.5, labels=True):
-        """Sử dụng phương thức plot có sẵn của Ultralytics để vẽ"""
-        if self.last_results is None or len(self.last_results) == 0:
+    def quantization_report(self, report_path=None):
+        """
+        Compare the quantized model with its float ONNX counterpart on the calibration set
+
+        The report (latency and box IoU / class agreement) is written as JSON, by default
+        next to the quantized model in the cache directory.
+
+        Args:
+            report_path: Optional path of the JSON report
+
+        Returns:
+            dict: The report, or None if no quantized model or calibration images are available
+        """
+        from module.quantization import write_quantization_report
+
+        if not isinstance(self.backend, OnnxRuntimeInt8Backend):
+            return None
+
+        image_paths = self.backend.calibration_images()
+        if not image_paths:
+            return None
+
+        float_model = YOLOModel()
+        if not float_model.load_model(
+            self.model_path,
+            backend=OnnxRuntimeBackend.name,
+            cache_dir=self.backend.cache_dir,
+            imgsz=self.backend.imgsz
+        ):
+            return None
+
+        return write_quantization_report(
+            report_path or self.backend.report_path(),
+            float_model,
+            self,
+            image_paths,
+            model_path=self.model_path,
+            quantization_mode=self.backend.mode,
+            reference_backend=OnnxRuntimeBackend.name,
+            quantized_model_path=self.backend.quantized_path
+        )
+
+    def plot_detection(self, image, detections, conf=0.5, line_width=2, font_size=0.5, labels=True):
+        """Sử dụng phương thức plot có sẵn của Ultralytics để vẽ kết quả gắn với detections"""
+        result = getattr(detections, 'result', None)
+        if result is None:
             return image.copy()
         
         try:
             # Sử dụng phương thức plot có sẵn
-            result_image = self.last_results[0].plot(
+            result_image = result.plot(
                 conf=conf,
                 line_width=line_width,
                 font_size=font_size,
@@ -86,8 +326,7 @@ class YOLOModel(QObject):
             )
             return result_image
         except Exception as e:
-            QMessageBox.critical(
-                None,
+            self._report_error(
                 "Lỗi hiển thị",
                 f"Đã xảy ra lỗi khi vẽ kết quả nhận diện: {str(e)}\nVui lòng thử lại."
             )
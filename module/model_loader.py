@@ -0,0 +1,71 @@
+from PySide6.QtCore import QThread, Signal
+
+from module.model_registry import model_registry
+
+
+class ModelLoaderThread(QThread):
+    """
+    Load a model through the model registry and warm it up outside the GUI thread.
+
+    Models already held by the registry are returned immediately without warm-up.
+
+    Signals:
+        progress_signal(int, str): Progress percentage and a status message
+        loaded_signal(dict): Emitted on success with the model metrics
+        error_signal(str): Emitted with the error message on failure
+    """
+    progress_signal = Signal(int, str)
+    loaded_signal = Signal(dict)
+    error_signal = Signal(str)
+
+    def __init__(self, model_path, load_options=None, warmup_runs=3, quantization_report=False,
+                 replicas=0, threads_per_replica=None):
+        """
+        Initialize the loader
+
+        Args:
+            model_path: Path to the weights file
+            load_options: Keyword arguments passed to YOLOModel.load_model()
+            warmup_runs: Number of warm-up passes after loading
+            quantization_report: Write the INT8 comparison report after warm-up
+            replicas: Number of model replicas serving concurrent callers (0/1 = disabled)
+            threads_per_replica: PyTorch threads per replica (None = automatic)
+        """
+        super().__init__()
+        self.model = None  # Loaded YOLOModel, available once loaded_signal is emitted
+        self.model_path = model_path
+        self.load_options = load_options or {}
+        self.warmup_runs = warmup_runs
+        self.quantization_report = quantization_report
+        self.replicas = replicas
+        self.threads_per_replica = threads_per_replica
+        self.report = None
+
+    def run(self):
+        try:
+            self.progress_signal.emit(0, f"Đang tải Model từ: {self.model_path}")
+            self.model, cached = model_registry.load(self.model_path, self.load_options)
+
+            if cached:
+                self.progress_signal.emit(100, "Model đã có trong bộ nhớ")
+                self.loaded_signal.emit(dict(self.model.metrics))
+                return
+
+            if self.warmup_runs > 0:
+                self.progress_signal.emit(50, f"Đang warm-up model ({self.warmup_runs} lượt) ...")
+                self.model.warmup(self.warmup_runs)
+
+            if self.replicas > 1:
+                self.progress_signal.emit(65, f"Đang khởi tạo {self.replicas} bản sao model ...")
+                self.model.enable_replicas(self.replicas, self.threads_per_replica, warmup_runs=self.warmup_runs)
+                model_registry.refresh(self.model)
+
+            if self.quantization_report:
+                self.progress_signal.emit(80, "Đang so sánh model INT8 với model gốc ...")
+                self.report = self.model.quantization_report()
+
+            self.progress_signal.emit(100, "Model đã được khởi tạo")
+            self.loaded_signal.emit(dict(self.model.metrics))
+
+        except Exception as e:
+            self.error_signal.emit(str(e))
@@ -0,0 +1,139 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class ModelReplicaPool:
+    """
+    Pool of independent model replicas served by dedicated worker threads.
+
+    Ultralytics models keep per-call predictor state, so a single model object must
+    not run inference from several threads at once. The pool serves one replica per
+    worker thread; callers submit work to a shared queue and any idle replica picks
+    it up. An already loaded model can be passed as the first replica, so the pool
+    holds exactly `replicas` copies of the weights.
+
+    torch.set_num_threads() is process-wide, so the thread count is not a budget
+    per replica: it is set once and caps the intra-op threads of every inference
+    call in the process. With the default (cpu_count / replicas), replicas running
+    at the same time together use about one thread per core.
+
+    Attributes:
+        replicas: Number of replicas
+        threads_per_replica: PyTorch intra-op threads of each inference call (process-wide)
+    """
+
+    def __init__(self, model_path, replicas=2, threads_per_replica=None, load_options=None, warmup_runs=0,
+                 primary=None):
+        """
+        Create the workers and load the replicas
+
+        Args:
+            model_path: Path to the weights file
+            replicas: Number of replicas (worker threads)
+            threads_per_replica: Process-wide PyTorch thread count, defaults to cpu_count / replicas
+            load_options: Keyword arguments passed to YOLOModel.load_model()
+            warmup_runs: Warm-up passes run by each newly loaded replica
+            primary: Optional loaded YOLOModel served as the first replica instead of
+                loading another copy (callers must not run it outside the pool)
+
+        Raises:
+            RuntimeError: If a replica fails to load
+        """
+        self.replicas = max(1, int(replicas))
+        self.threads_per_replica = threads_per_replica or max(1, (os.cpu_count() or 1) // self.replicas)
+        self._tasks = queue.Queue()
+        self._workers = []
+        self._errors = []
+        ready = threading.Barrier(self.replicas + 1)
+
+        try:
+            import torch
+            torch.set_num_threads(self.threads_per_replica)
+        except ImportError:
+            pass
+
+        for index in range(self.replicas):
+            worker = threading.Thread(
+                target=self._worker,
+                args=(model_path, load_options or {}, warmup_runs, ready, primary if index == 0 else None),
+                name=f"ModelReplica-{index}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        # Wait until every replica is loaded (or failed)
+        ready.wait()
+        if self._errors:
+            self.close()
+            raise RuntimeError(f"Không thể tải bản sao model: {self._errors[0]}")
+
+    def __len__(self):
+        return self.replicas
+
+    def _worker(self, model_path, load_options, warmup_runs, ready, primary=None):
+        """Load a replica (or reuse primary), then serve tasks from the shared queue until closed"""
+        from module.model import YOLOModel
+
+        model = YOLOModel()
+        if primary is not None:
+            # Same weights object, without the pool that routes calls back here
+            model.use(primary)
+            model.pool = None
+            loaded = True
+        else:
+            loaded = model.load_model(model_path, show_errors=False, **load_options)
+            if loaded:
+                model.warmup(warmup_runs)
+            else:
+                self._errors.append(model.last_error)
+        ready.wait()
+        if not loaded:
+            return
+
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+
+            method, args, kwargs, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(getattr(model, method)(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Run a YOLOModel method on the next idle replica
+
+        Args:
+            method: Method name ('detect', 'detect_batch', ...)
+            *args, **kwargs: Method arguments
+
+        Returns:
+            concurrent.futures.Future with the method result
+        """
+        if not self._workers:
+            raise RuntimeError("Pool bản sao model đã bị đóng")
+
+        future = Future()
+        self._tasks.put((method, args, kwargs, future))
+        return future
+
+    def detect(self, image, imgsz=None):
+        """Detect objects in one image on an idle replica (blocking)"""
+        return self.submit('detect', image, imgsz=imgsz).result()
+
+    def detect_batch(self, images, batch_size=8, imgsz=None):
+        """Detect objects in a list of images on an idle replica (blocking)"""
+        return self.submit('detect_batch', images, batch_size=batch_size, imgsz=imgsz).result()
+
+    def close(self):
+        """Stop the workers once the queued tasks are done"""
+        for _ in self._workers:
+            self._tasks.put(None)
+        self._workers = []
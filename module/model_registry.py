@@ -0,0 +1,213 @@
+import os
+import threading
+from collections import OrderedDict
+
+from module.model import YOLOModel
+
+
+class ModelRegistry:
+    """
+    LRU cache of loaded models bounded by a memory budget.
+
+    Models are keyed by their weights path and load options, so selecting a model
+    that is already cached returns the loaded instance immediately. When the
+    estimated memory of the cached models exceeds the budget, the least recently
+    used models are dropped (the most recently used one is always kept) and their
+    replica pools are closed. Models used by a tab or as the active model are
+    pinned (pin()/unpin()) and never evicted, since the tabs share their pool.
+
+    Attributes:
+        memory_budget: Maximum estimated memory of the cached models, in bytes
+    """
+
+    def __init__(self, memory_budget_mb=2048):
+        """
+        Initialize the registry
+
+        Args:
+            memory_budget_mb: Memory budget in megabytes
+        """
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()  # {key: {'model': YOLOModel, 'size': bytes}}
+        self._pins = {}  # {owner: YOLOModel} models in use, never evicted
+        self._lock = threading.RLock()
+
+    def set_memory_budget(self, memory_budget_mb):
+        """Change the memory budget (in megabytes) and evict models over it"""
+        with self._lock:
+            self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+            evicted = self._evict()
+        self._release(evicted)
+
+    def pin(self, owner, model):
+        """
+        Mark a model as used by an owner (a tab, the active model) so it is not evicted
+
+        Args:
+            owner: Hashable identifier of the user, its previous model is unpinned
+            model: YOLOModel in use, None to only unpin
+        """
+        with self._lock:
+            if model is None:
+                self._pins.pop(owner, None)
+            else:
+                self._pins[owner] = model
+            evicted = self._evict()
+        self._release(evicted)
+
+    def unpin(self, owner):
+        """Release the model used by an owner"""
+        self.pin(owner, None)
+
+    def is_pinned(self, model):
+        """Whether a model is in use by any owner"""
+        with self._lock:
+            return any(pinned is model for pinned in self._pins.values())
+
+    @staticmethod
+    def make_key(model_path, load_options=None):
+        """
+        Build the cache key of a model
+
+        Args:
+            model_path: Path to the weights file
+            load_options: Keyword arguments passed to YOLOModel.load_model()
+
+        Returns:
+            tuple: Hashable key
+        """
+        options = tuple(sorted((k, v) for k, v in (load_options or {}).items() if v is not None))
+        return (os.path.abspath(model_path),) + options
+
+    @staticmethod
+    def estimate_size(model):
+        """
+        Estimate the memory used by a loaded model
+
+        Args:
+            model: Loaded YOLOModel
+
+        Returns:
+            int: Estimated size in bytes (parameter and buffer size for PyTorch
+                models, model file size otherwise), including its replicas
+        """
+        # The loaded model is the first replica of its pool
+        copies = len(model.pool) if model.pool is not None else 1
+        module = getattr(model.model, 'model', None)
+        if hasattr(module, 'parameters') and hasattr(module, 'buffers'):
+            tensors = list(module.parameters()) + list(module.buffers())
+            return copies * sum(t.numel() * t.element_size() for t in tensors)
+
+        for path in (getattr(model.backend, 'quantized_path', None), model.model_path):
+            if path and os.path.exists(path):
+                return copies * os.path.getsize(path)
+        return 0
+
+    def get(self, key):
+        """Return a cached model (and mark it as most recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry['model']
+
+    def load(self, model_path, load_options=None):
+        """
+        Return a cached model or load it
+
+        Args:
+            model_path: Path to the weights file
+            load_options: Keyword arguments passed to YOLOModel.load_model()
+
+        Returns:
+            tuple: (model, cached) where cached tells whether it was a cache hit
+
+        Raises:
+            RuntimeError: If the model could not be loaded
+        """
+        key = self.make_key(model_path, load_options)
+        model = self.get(key)
+        if model is not None:
+            return model, True
+
+        # Load outside the lock so a slow load does not block switching between cached models
+        model = YOLOModel()
+        if not model.load_model(model_path, show_errors=False, **(load_options or {})):
+            raise RuntimeError(model.last_error or "Không thể tải model")
+
+        self.put(key, model)
+        return model, False
+
+    def put(self, key, model):
+        """Insert a loaded model and evict least recently used models over the budget"""
+        with self._lock:
+            self._entries[key] = {'model': model, 'size': self.estimate_size(model)}
+            self._entries.move_to_end(key)
+            evicted = self._evict()
+        self._release(evicted)
+
+    def refresh(self, model):
+        """Re-estimate the size of a cached model (e.g. after enabling replicas)"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry['model'] is model:
+                    entry['size'] = self.estimate_size(model)
+            evicted = self._evict()
+        self._release(evicted)
+
+    def _evict(self):
+        """
+        Drop least recently used, unpinned models until the budget is respected (lock held)
+
+        Returns:
+            list: Evicted models, to be released with _release() outside the lock
+        """
+        evicted = []
+        usage = self.memory_usage()
+        most_recent = next(reversed(self._entries), None)
+        for key in list(self._entries):
+            if usage <= self.memory_budget:
+                break
+            model = self._entries[key]['model']
+            if key == most_recent or self.is_pinned(model):
+                continue
+            usage -= self._entries.pop(key)['size']
+            evicted.append(model)
+        return evicted
+
+    def _release(self, models):
+        """Close the replica pools of evicted models (outside the lock, it joins worker threads)"""
+        for model in models:
+            if self.is_pinned(model):
+                continue
+            try:
+                model.disable_replicas()
+            except Exception as e:
+                print(f"Error releasing model {model.model_path}: {e}")
+
+    def remove(self, key):
+        """Remove a model from the registry (its pool is closed unless it is in use)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._release([entry['model']])
+
+    def memory_usage(self):
+        """Return the estimated memory of the cached models in bytes"""
+        with self._lock:
+            return sum(entry['size'] for entry in self._entries.values())
+
+    def entries(self):
+        """
+        Return the cached models, most recently used last
+
+        Returns:
+            list: [(key, model, size_in_bytes), ...]
+        """
+        with self._lock:
+            return [(key, entry['model'], entry['size']) for key, entry in self._entries.items()]
+
+
+# Shared registry instance
+model_registry = ModelRegistry()
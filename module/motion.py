@@ -0,0 +1,113 @@
+import time
+
+import cv2
+
+
+class MotionGate:
+    """
+    Cheap motion check deciding whether a frame needs a new inference.
+
+    Frames are downscaled to a small grayscale thumbnail and compared with the
+    thumbnail of the last inferred frame. When the fraction of changed pixels is
+    below the sensitivity, the scene is considered static and the last detections
+    can be reused. Comparing with the last inferred frame (not the previous one)
+    lets slow changes accumulate until they trigger an inference, and an inference
+    is forced after max_idle seconds so the results never get too old.
+
+    Attributes:
+        sensitivity: Fraction of changed pixels (0 - 1) that counts as motion
+        pixel_threshold: Gray level difference above which a pixel has changed
+        max_idle: Maximum time in seconds between two inferences, 0 for no limit
+        width: Width of the thumbnails compared
+        checks: Number of frames checked
+        skipped: Number of frames found static (inference skipped)
+    """
+
+    def __init__(self, sensitivity=0.01, pixel_threshold=25, max_idle=2.0, width=160):
+        """
+        Initialize the gate
+
+        Args:
+            sensitivity: Fraction of changed pixels that counts as motion
+            pixel_threshold: Gray level difference above which a pixel has changed
+            max_idle: Maximum time in seconds between two inferences, 0 for no limit
+            width: Width of the thumbnails compared
+        """
+        self.sensitivity = max(0.0, float(sensitivity))
+        self.pixel_threshold = pixel_threshold
+        self.max_idle = max(0.0, float(max_idle))
+        self.width = max(16, int(width))
+        self.reset()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Create a motion gate from the application settings
+
+        Returns:
+            MotionGate, or None when the gate is disabled
+        """
+        if not getattr(settings, 'motion_gate', False):
+            return None
+
+        return cls(sensitivity=settings.motion_sensitivity, max_idle=settings.motion_max_idle_s)
+
+    def reset(self):
+        """Forget the reference frame and the statistics"""
+        self.checks = 0
+        self.skipped = 0
+        self._reference = None
+        self._reference_time = None
+
+    def _thumbnail(self, frame):
+        """Downscale (first, so the rest works on few pixels), convert to gray and blur"""
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, round(height * self.width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def check(self, frame):
+        """
+        Decide whether a frame must be inferred
+
+        Args:
+            frame: Image (numpy array, BGR or RGB)
+
+        Returns:
+            bool: True when the scene changed (or max_idle elapsed) and the frame
+                becomes the new reference, False when the last detections can be reused
+        """
+        self.checks += 1
+        thumbnail = self._thumbnail(frame)
+        now = time.monotonic()
+
+        if (
+            self._reference is not None
+            and self._reference.shape == thumbnail.shape
+            and not (self.max_idle and now - self._reference_time >= self.max_idle)
+        ):
+            changed = cv2.countNonZero(
+                cv2.threshold(cv2.absdiff(thumbnail, self._reference), self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]
+            )
+            if changed < self.sensitivity * thumbnail.size:
+                self.skipped += 1
+                return False
+
+        self._reference = thumbnail
+        self._reference_time = now
+        return True
+
+    def get_status(self):
+        """
+        Return the gate statistics
+
+        Returns:
+            dict: frames checked, frames skipped and hit rate (fraction of frames skipped)
+        """
+        return {
+            'motion_checks': self.checks,
+            'motion_skipped': self.skipped,
+            'motion_hit_rate': self.skipped / self.checks if self.checks else 0.0
+        }
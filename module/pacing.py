@@ -0,0 +1,109 @@
+import time
+from collections import deque
+
+# Frame rate used when the source does not report one
+DEFAULT_FPS = 30.0
+
+
+class FramePacer:
+    """
+    Deadline-based frame pacing for capture loops.
+
+    Each iteration has a deadline on the monotonic clock, one frame period after
+    the previous one. wait() only sleeps for the time left until the deadline, so
+    the work done in the iteration counts toward the period, and it never sleeps
+    when the loop is already behind. A loop that falls more than one period behind
+    is counted as an overrun and re-anchored to the current time instead of trying
+    to catch up with a burst of frames.
+
+    Attributes:
+        fps: Target frame rate
+        overruns: Number of iterations that missed their deadline
+    """
+
+    def __init__(self, fps=None, window=60):
+        """
+        Initialize the pacer
+
+        Args:
+            fps: Target frame rate, DEFAULT_FPS when unknown or invalid
+            window: Number of frame intervals used for the fps and jitter statistics
+        """
+        self.fps = fps if fps and 0 < fps <= 1000 else DEFAULT_FPS
+        self.period = 1.0 / self.fps
+        self.overruns = 0
+        self._deadline = None
+        self._last_tick = None
+        self._intervals = deque(maxlen=max(2, int(window)))
+
+    @classmethod
+    def for_source(cls, source, fps=None):
+        """
+        Create a pacer for a frame source
+
+        Args:
+            source: FrameSource
+            fps: Frame rate override, None or 0 to use the rate reported by the source
+        """
+        return cls(fps or source.fps())
+
+    def wait(self):
+        """
+        Wait until the deadline of the current frame and schedule the next one
+
+        Returns:
+            float: Time slept in seconds (0 when the loop is behind)
+        """
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+
+        slept = 0.0
+        remaining = self._deadline - now
+        if remaining > 0:
+            time.sleep(remaining)
+            slept = remaining
+        elif -remaining > self.period:
+            # Too far behind: count it and re-anchor instead of bursting to catch up
+            self.overruns += 1
+            self._deadline = now
+
+        self.tick()
+        self._deadline += self.period
+        return slept
+
+    def tick(self):
+        """Record a frame for the statistics without pacing (used when running as fast as possible)"""
+        tick = time.monotonic()
+        if self._last_tick is not None:
+            self._intervals.append(tick - self._last_tick)
+        self._last_tick = tick
+
+    def reset(self):
+        """Forget the schedule and the statistics"""
+        self.overruns = 0
+        self._deadline = None
+        self._last_tick = None
+        self._intervals.clear()
+
+    def get_status(self):
+        """
+        Return the pacing statistics
+
+        Returns:
+            dict: target and achieved fps, jitter (standard deviation of the frame
+                interval, in ms) and the number of overruns
+        """
+        intervals = list(self._intervals)
+        achieved = 0.0
+        jitter = 0.0
+        if intervals:
+            mean = sum(intervals) / len(intervals)
+            achieved = 1.0 / mean if mean > 0 else 0.0
+            jitter = (sum((i - mean) ** 2 for i in intervals) / len(intervals)) ** 0.5 * 1000
+        return {
+            'target_fps': self.fps,
+            'achieved_fps': achieved,
+            'jitter_ms': jitter,
+            'overruns': self.overruns
+        }
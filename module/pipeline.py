@@ -0,0 +1,91 @@
+import threading
+
+
+class LatestFrameSlot:
+    """
+    Single-item hand-off between pipeline stages where the newest item wins.
+
+    The producer never blocks: putting an item replaces the one still waiting,
+    which is counted as dropped. The consumer always receives the freshest item,
+    so a slow stage works on current data instead of a backlog of stale frames.
+
+    Attributes:
+        dropped: Number of items replaced before they were consumed
+        put_count: Number of items put in the slot
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self.dropped = 0
+        self.put_count = 0
+
+    def put(self, item):
+        """
+        Store an item, replacing (and counting as dropped) any unconsumed one
+
+        Returns:
+            The replaced item, or None
+        """
+        with self._condition:
+            replaced = self._item if self._has_item else None
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self.put_count += 1
+            self._condition.notify()
+            return replaced
+
+    def get(self, timeout=None):
+        """
+        Wait for an item and take it out of the slot
+
+        Args:
+            timeout: Maximum wait in seconds, None to wait until an item or close()
+
+        Returns:
+            The newest item, or None on timeout or when the slot is closed
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._has_item or self._closed, timeout):
+                return None
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            self._condition.notify_all()
+            return item
+
+    def wait_empty(self, timeout=None):
+        """
+        Wait until the waiting item has been consumed (backpressure for lossless producers)
+
+        Returns:
+            bool: True if the slot is empty
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._has_item or self._closed, timeout)
+
+    def peek(self):
+        """Return the waiting item without consuming it, or None"""
+        with self._condition:
+            return self._item
+
+    def close(self):
+        """Wake up waiting consumers; get() then returns None once the slot is empty"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reset(self):
+        """Empty and reopen the slot"""
+        with self._condition:
+            self._item = None
+            self._has_item = False
+            self._closed = False
+            self.dropped = 0
+            self.put_count = 0
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from module.detections import Detections, box_iou
+
+# Supported quantization modes
+QUANTIZATION_DYNAMIC = 'dynamic'  # Weights quantized ahead of time, activations at run time
+QUANTIZATION_STATIC = 'static'    # Weights and activations quantized using a calibration set
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')
+
+
+def list_calibration_images(folder, max_images=None):
+    """
+    List the images of a calibration folder in a stable order
+
+    Args:
+        folder: Folder containing calibration images
+        max_images: Optional maximum number of images
+
+    Returns:
+        list: Sorted image paths
+    """
+    image_files = sorted(
+        os.path.join(folder, f) for f in os.listdir(folder)
+        if f.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    return image_files[:max_images] if max_images else image_files
+
+
+def preprocess_image(image, imgsz):
+    """
+    Letterbox a BGR image to a square NCHW float32 tensor, as the YOLO models expect
+
+    Args:
+        image: BGR image (numpy array)
+        imgsz: Target square size
+
+    Returns:
+        (1, 3, imgsz, imgsz) float32 array with values in [0, 1]
+    """
+    height, width = image.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_height, new_width = round(height * ratio), round(width * ratio)
+    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - new_height) // 2
+    left = (imgsz - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = resized
+
+    # BGR -> RGB, HWC -> CHW, add batch dimension
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1)[None]
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+
+
+def quantize_onnx_model(onnx_path, output_path, mode=QUANTIZATION_DYNAMIC, calibration_images=None, imgsz=640):
+    """
+    Quantize an ONNX model to INT8
+
+    Args:
+        onnx_path: Path to the float ONNX model
+        output_path: Path of the quantized model to write
+        mode: QUANTIZATION_DYNAMIC or QUANTIZATION_STATIC
+        calibration_images: Image paths used to calibrate activations (static mode)
+        imgsz: Input size used to preprocess calibration images
+
+    Returns:
+        str: output_path
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+
+    if mode == QUANTIZATION_DYNAMIC:
+        # QUInt8 weights: ConvInteger is only implemented for uint8 on the CPU provider
+        quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QUInt8)
+        return output_path
+
+    if mode != QUANTIZATION_STATIC:
+        raise ValueError(f"Chế độ lượng tử hóa không hợp lệ: {mode}")
+
+    if not calibration_images:
+        raise ValueError("Chế độ static cần thư mục ảnh hiệu chỉnh (calibration)")
+
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        """Feed preprocessed calibration images to the quantizer one by one"""
+
+        def __init__(self):
+            self.paths = iter(calibration_images)
+
+        def get_next(self):
+            for path in self.paths:
+                image = cv2.imread(path)
+                if image is not None:
+                    return {input_name: preprocess_image(image, imgsz)}
+            return None
+
+    quantize_static(
+        onnx_path,
+        output_path,
+        ImageCalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8
+    )
+    return output_path
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Greedily match candidate boxes to reference boxes by IoU (class agnostic)
+
+    Args:
+        reference: Detections from the reference (float) model
+        candidate: Detections from the candidate (quantized) model
+        iou_threshold: Minimum IoU for two boxes to be considered the same object
+
+    Returns:
+        tuple: (matched IoU values, number of matches with the same class)
+    """
+    if not reference or not candidate:
+        return np.zeros(0, dtype=np.float32), 0
+
+    iou = box_iou(reference.xyxy, candidate.xyxy)
+    used_reference = np.zeros(len(reference), dtype=bool)
+    used_candidate = np.zeros(len(candidate), dtype=bool)
+    matched_iou = []
+    class_matches = 0
+
+    # Visit pairs from the highest IoU down
+    rows, cols = np.unravel_index(np.argsort(-iou, axis=None), iou.shape)
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        if iou[row, col] < iou_threshold:
+            break
+        if used_reference[row] or used_candidate[col]:
+            continue
+        used_reference[row] = used_candidate[col] = True
+        matched_iou.append(iou[row, col])
+        class_matches += int(reference.class_id[row] == candidate.class_id[col])
+
+    return np.asarray(matched_iou, dtype=np.float32), class_matches
+
+
+def _latency_summary(latencies):
+    """Summarize a list of latencies in seconds as milliseconds"""
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    if values.size == 0:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0}
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95))
+    }
+
+
+def compare_models(float_model, quantized_model, image_paths, iou_threshold=0.5):
+    """
+    Compare latency and detection agreement of a float and a quantized model
+
+    Args:
+        float_model: Loaded reference YOLOModel
+        quantized_model: Loaded quantized YOLOModel
+        image_paths: Images to run both models on
+        iou_threshold: Minimum IoU for a box match
+
+    Images on which either model fails to run are left out of every metric and
+    counted in 'failed_images', so an inference error never looks like an image
+    without objects.
+
+    Returns:
+        dict: Report with latency statistics and agreement metrics
+    """
+    float_latencies, quantized_latencies = [], []
+    float_count = quantized_count = class_matches = failed = 0
+    matched_iou = []
+
+    for path in image_paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        start = time.perf_counter()
+        reference = float_model.detect(image)
+        float_latency = time.perf_counter() - start
+
+        start = time.perf_counter()
+        candidate = quantized_model.detect(image)
+        quantized_latency = time.perf_counter() - start
+
+        if reference is None or candidate is None:
+            failed += 1
+            continue
+        reference, candidate = Detections.coerce(reference), Detections.coerce(candidate)
+        float_latencies.append(float_latency)
+        quantized_latencies.append(quantized_latency)
+
+        ious, matches = match_detections(reference, candidate, iou_threshold)
+        float_count += len(reference)
+        quantized_count += len(candidate)
+        class_matches += matches
+        matched_iou.extend(ious.tolist())
+
+    float_latency = _latency_summary(float_latencies)
+    quantized_latency = _latency_summary(quantized_latencies)
+    matched = len(matched_iou)
+
+    return {
+        'images': len(float_latencies),
+        'failed_images': failed,
+        'iou_threshold': iou_threshold,
+        'float_latency_ms': float_latency,
+        'int8_latency_ms': quantized_latency,
+        'speedup': (float_latency['mean'] / quantized_latency['mean']) if quantized_latency['mean'] else 0.0,
+        'float_detections': float_count,
+        'int8_detections': quantized_count,
+        'matched_detections': matched,
+        # Fraction of float detections reproduced by the quantized model
+        'recall': matched / float_count if float_count else 1.0,
+        # Fraction of quantized detections that correspond to a float detection
+        'precision': matched / quantized_count if quantized_count else 1.0,
+        'mean_iou': float(np.mean(matched_iou)) if matched_iou else 0.0,
+        'class_match_rate': class_matches / matched if matched else 1.0
+    }
+
+
+def write_quantization_report(report_path, float_model, quantized_model, image_paths, **metadata):
+    """
+    Run compare_models and save the result as JSON
+
+    Args:
+        report_path: Path of the JSON report
+        float_model: Loaded reference YOLOModel
+        quantized_model: Loaded quantized YOLOModel
+        image_paths: Calibration images to compare on
+        **metadata: Extra fields stored in the report (model path, mode, ...)
+
+    Returns:
+        dict: The report
+    """
+    report = {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        **metadata,
+        **compare_models(float_model, quantized_model, image_paths)
+    }
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+
+    return report
@@ -0,0 +1,170 @@
+import cv2
+import numpy as np
+
+from module.detections import Detections
+
+
+class OverlayRenderer:
+    """
+    Draw detection results (bounding boxes and heat map view) on frames.
+
+    Kept separate from the detection threads so the same rendering can run in
+    worker processes.
+    """
+
+    def __init__(self):
+        # Performance optimization
+        self.color_cache = {}
+
+    def get_color_for_class(self, class_id):
+        """Create random but consistent color for each class"""
+        # Use cache to optimize performance
+        if class_id in self.color_cache:
+            return self.color_cache[class_id]
+        
+        # Create a unique numeric value from string for seed
+        hash_value = 0
+        for char in str(class_id):
+            hash_value = hash_value * 31 + ord(char)
+        
+        # Use hash as seed to create stable color
+        np.random.seed(hash_value % (2**32 - 1))
+        color = tuple(map(int, np.random.randint(0, 255, 3)))
+        
+        # Save to cache
+        self.color_cache[class_id] = color
+        return color
+        
+    def draw_detections(self, frame, detections):
+        """Draw detection results on frame"""
+        # Try to use Ultralytics' built-in plot method
+        try:
+            if getattr(detections, 'result', None) is not None:
+                result_frame = detections.result.plot(
+                    conf=0.5,
+                    line_width=2,
+                    font_size=0.5,
+                    labels=True
+                )
+                return result_frame, detections
+        except Exception as e:
+            print(f"Error using YOLO's built-in plot: {e}")
+        
+        # Fallback: Use manual drawing method
+        frame_copy = frame.copy()
+        detections = Detections.coerce(detections)
+        track_ids = detections.tracker_id.tolist() if detections.tracker_id is not None else [None] * len(detections)
+        for (x1, y1, x2, y2, confidence, class_id), track_id in zip(detections.iter_boxes(), track_ids):
+            # Get color for class
+            color = self.get_color_for_class(str(class_id))
+            
+            # Draw bounding box
+            cv2.rectangle(frame_copy, (x1, y1), (x2, y2), color, 2)
+            
+            # Prepare text (tracked objects show their id)
+            label = f"{class_id} ({confidence:.2f})" if track_id is None else f"#{track_id} {class_id} ({confidence:.2f})"
+            
+            # Draw background for text
+            (text_width, text_height), _ = cv2.getTextSize(
+                label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
+            cv2.rectangle(frame_copy, 
+                        (x1, y1 - text_height - 10), 
+                        (x1 + text_width + 10, y1),
+                        color, -1)
+            
+            # Draw text
+            cv2.putText(frame_copy, label,
+                    (x1 + 5, y1 - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                    (255, 255, 255), 2)
+                
+        return frame_copy, detections
+
+    def process_warmup(self, frame, detections):
+        """Process warm up frame for visualization"""
+        if frame is None or not detections:
+            return frame
+        
+        # Try to use built-in visualization if available
+        try:
+            results = getattr(detections, 'result', None)
+            if results is not None:
+                if hasattr(results, 'plot_heat'):
+                    return results.plot_heat()
+                elif hasattr(results, 'plot_thermal'):
+                    return results.plot_thermal()
+        except Exception as e:
+            print(f"Error using thermal visualization: {str(e)}")
+        
+        # Fallback to manual thermal processing
+        detections = Detections.coerce(detections)
+        processed_frame = frame.copy()
+        
+        # Convert image to grayscale for processing
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        # Apply blur filter to reduce noise
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        
+        # Create thermal background image (cool tone)
+        heat_map = cv2.applyColorMap(gray, cv2.COLORMAP_OCEAN)
+        
+        # Create mask for detection area
+        mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+        
+        # Process each detection area
+        for x1, y1, x2, y2, _, _ in detections.iter_boxes():
+            # Add detection area to mask
+            cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
+            
+            # Create "hot" effect for detection area
+            if y2 > y1 and x2 > x1:
+                roi = gray[y1:y2, x1:x2]
+                if roi.size > 0:
+                    # Apply heat colormap to detection area
+                    roi_heat = cv2.applyColorMap(roi, cv2.COLORMAP_JET)
+                    
+                    # Enhance brightness and contrast
+                    roi_enhanced = cv2.convertScaleAbs(roi_heat, alpha=1.3, beta=30)
+                    
+                    # Apply to original frame
+                    processed_frame[y1:y2, x1:x2] = roi_enhanced
+        
+        # Expand mask to create soft transition effect
+        kernel = np.ones((5, 5), np.uint8)
+        mask_dilated = cv2.dilate(mask, kernel, iterations=3)
+        mask_blur = cv2.GaussianBlur(mask_dilated, (21, 21), 0)
+        
+        # Create gradient mask and ensure correct data type
+        gradient_mask = mask_blur.astype(np.float32) / 255.0
+        
+        # Expand to 3 channels
+        gradient_mask_3d = np.stack([gradient_mask] * 3, axis=2)
+        
+        # Combine images
+        blended = (processed_frame.astype(np.float32) * gradient_mask_3d + 
+                heat_map.astype(np.float32) * (1.0 - gradient_mask_3d))
+        
+        # Convert to uint8
+        result = np.clip(blended, 0, 255).astype(np.uint8)
+        
+        # Add borders for detection areas
+        for x1, y1, x2, y2, confidence, class_name in detections.iter_boxes():
+            # Border color based on object class
+            color = self.get_color_for_class(str(class_name))
+            
+            # Draw outer border with glow effect
+            cv2.rectangle(result, (x1-1, y1-1), (x2+1, y2+1), (255, 255, 255), 3)
+            cv2.rectangle(result, (x1, y1), (x2, y2), color, 2)
+            
+            # Add class and confidence information
+            label = f"{class_name}: {confidence:.2f}" if confidence else class_name
+            t_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)[0]
+            c2 = x1 + t_size[0] + 3, y1 + t_size[1] + 4
+            
+            # Background for text
+            cv2.rectangle(result, (x1, y1), c2, color, -1)
+            # Text
+            cv2.putText(result, label, (x1, y1 + t_size[1] + 4), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        
+        return result
@@ -0,0 +1,118 @@
+from collections import deque
+
+import cv2
+
+
+class AdaptiveResolution:
+    """
+    Inference resolution controller for live detection.
+
+    Frames are downscaled on the capture side (before color conversion) so their
+    longest side matches the inference size, and the model is called with that
+    size. In adaptive mode the size is lowered or raised one step at a time so the
+    average per-frame inference latency stays within the target budget.
+
+    Attributes:
+        size: Current inference size (longest side, multiple of step)
+        adaptive: Whether the size follows the latency budget
+        target_latency: Latency budget per frame in seconds
+        min_size: Smallest size used in adaptive mode
+        max_size: Largest size used in adaptive mode
+        step: Size change per adjustment (the model stride)
+        changes: Number of adjustments made so far
+    """
+
+    def __init__(self, imgsz=640, adaptive=False, target_latency=0.1, min_size=320,
+                 max_size=None, step=32, tolerance=0.2, window=5):
+        """
+        Initialize the controller
+
+        Args:
+            imgsz: Initial inference size
+            adaptive: Adjust the size to the latency budget
+            target_latency: Latency budget per frame in seconds
+            min_size: Smallest size used in adaptive mode
+            max_size: Largest size used in adaptive mode (defaults to imgsz)
+            step: Size change per adjustment, sizes are kept multiples of it
+            tolerance: Relative band around the target in which the size is kept
+            window: Number of latency samples averaged before each decision
+        """
+        self.step = max(1, int(step))
+        self.max_size = self._round(max_size or imgsz)
+        self.min_size = min(self._round(min_size), self.max_size)
+        self.size = min(max(self._round(imgsz), self.min_size), self.max_size)
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.tolerance = tolerance
+        self.changes = 0
+        self._latencies = deque(maxlen=max(1, int(window)))
+
+    def _round(self, size):
+        """Round a size to a multiple of step (at least one step)"""
+        return max(self.step, int(round(size / self.step)) * self.step)
+
+    def prepare(self, frame):
+        """
+        Downscale a frame so its longest side does not exceed the inference size
+
+        Args:
+            frame: Image (numpy array), typically the raw BGR capture
+
+        Returns:
+            tuple: (image, scale) where scale maps image coordinates back to the
+                frame (1.0 when the frame is returned unchanged)
+        """
+        height, width = frame.shape[:2]
+        longest = max(height, width)
+        if longest <= self.size:
+            return frame, 1.0
+
+        scale = longest / self.size
+        resized = cv2.resize(
+            frame,
+            (max(1, round(width / scale)), max(1, round(height / scale))),
+            interpolation=cv2.INTER_AREA
+        )
+        return resized, scale
+
+    def update(self, latency):
+        """
+        Record the latency of one inference and adjust the size if needed
+
+        Args:
+            latency: Inference time in seconds
+
+        Returns:
+            bool: True if the size changed
+        """
+        if not self.adaptive:
+            return False
+
+        self._latencies.append(latency)
+        if len(self._latencies) < self._latencies.maxlen:
+            return False
+
+        average = sum(self._latencies) / len(self._latencies)
+        size = self.size
+        if average > self.target_latency * (1 + self.tolerance):
+            size = max(self.min_size, size - self.step)
+        elif average < self.target_latency * (1 - self.tolerance):
+            size = min(self.max_size, size + self.step)
+
+        # Start a new window so the next decision only sees the new size
+        self._latencies.clear()
+        if size == self.size:
+            return False
+
+        self.size = size
+        self.changes += 1
+        return True
+
+    def get_status(self):
+        """Return the current size and latency budget"""
+        return {
+            'inference_size': self.size,
+            'adaptive_resolution': self.adaptive,
+            'target_latency_ms': self.target_latency * 1000,
+            'resolution_changes': self.changes
+        }
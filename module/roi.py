@@ -0,0 +1,182 @@
+import cv2
+
+from module.detections import Detections
+
+
+class RegionInference:
+    """
+    Inference restricted to user-defined regions of interest (ROIs).
+
+    Regions are stored normalized to the image size (0 - 1) so the same settings
+    apply to any camera resolution and to the downscaled inference frames. They
+    are saved per tab and source under a key such as 'camera:<source>', 'picture'
+    or 'folder:<path>', so regions drawn for one layout never crop another. Only
+    the region crops (views, no copies) are sent to the model, all together in
+    one batched call; boxes are shifted back to full-image coordinates and the
+    duplicates found in overlapping regions are removed with class-aware NMS.
+
+    Attributes:
+        model: YOLOModel used for inference
+        regions: List of (x1, y1, x2, y2) tuples normalized to the image size
+        batch_size: Number of crops per inference call
+        iou_threshold: IoU above which duplicates of overlapping regions are merged
+    """
+
+    def __init__(self, model, regions, batch_size=8, iou_threshold=0.5):
+        """
+        Initialize the region inference
+
+        Args:
+            model: YOLOModel used for inference
+            regions: Iterable of normalized (x1, y1, x2, y2) regions
+            batch_size: Number of crops per inference call
+            iou_threshold: IoU threshold of the NMS between overlapping regions
+        """
+        self.model = model
+        self.regions = self.normalize(regions)
+        self.batch_size = max(1, int(batch_size))
+        self.iou_threshold = iou_threshold
+
+    @classmethod
+    def from_settings(cls, model, settings, key):
+        """
+        Create the region inference from the application settings
+
+        Args:
+            model: YOLOModel used for inference
+            settings: Application settings
+            key: Tab and source of the regions (see settings_regions())
+
+        Returns:
+            RegionInference, or None when no region is defined for the key
+        """
+        regions = cls.normalize(cls.settings_regions(settings, key))
+        if not regions:
+            return None
+
+        return cls(model, regions, batch_size=settings.batch_size)
+
+    @staticmethod
+    def settings_regions(settings, key):
+        """
+        Return the regions saved for a tab and source
+
+        Args:
+            settings: Application settings
+            key: 'camera:<source>', 'picture' or 'folder:<path>'
+
+        Returns:
+            list: Normalized [x1, y1, x2, y2] regions, empty if none
+        """
+        rois = getattr(settings, 'rois', None) or {}
+        if not isinstance(rois, dict):
+            # Older configurations kept one list drawn on a camera: it only applies to cameras
+            return list(rois) if key.startswith('camera:') else []
+        return list(rois.get(key) or [])
+
+    @staticmethod
+    def save_regions(settings, key, regions):
+        """Store the regions of a tab and source in the settings (an empty list removes them)"""
+        rois = getattr(settings, 'rois', None)
+        rois = dict(rois) if isinstance(rois, dict) else {}
+        if regions:
+            rois[key] = [list(region) for region in regions]
+        else:
+            rois.pop(key, None)
+        settings.rois = rois
+
+    @staticmethod
+    def normalize(regions):
+        """Clip regions to [0, 1], order their corners and drop the empty ones"""
+        normalized = []
+        for region in regions:
+            x1, y1, x2, y2 = (min(max(float(value), 0.0), 1.0) for value in region)
+            x1, x2 = sorted((x1, x2))
+            y1, y2 = sorted((y1, y2))
+            if x2 - x1 > 0.001 and y2 - y1 > 0.001:
+                normalized.append((x1, y1, x2, y2))
+        return normalized
+
+    def pixel_boxes(self, width, height):
+        """
+        Convert the regions to pixel boxes for an image size
+
+        Returns:
+            list: [(x1, y1, x2, y2), ...] integer pixel coordinates
+        """
+        boxes = []
+        for x1, y1, x2, y2 in self.regions:
+            left, top = int(x1 * width), int(y1 * height)
+            right, bottom = max(left + 1, int(round(x2 * width))), max(top + 1, int(round(y2 * height)))
+            boxes.append((left, top, min(right, width), min(bottom, height)))
+        return boxes
+
+    def cache_settings(self):
+        """Settings that change the detections, part of the DetectionCache key"""
+        return {'rois': [list(region) for region in self.regions]}
+
+    def detect(self, image, imgsz=None):
+        """
+        Detect objects inside the regions of one image
+
+        Args:
+            image: RGB image (numpy array)
+            imgsz: Maximum inference size, None for the model default
+
+        Returns:
+            Detections in full-image coordinates, or None on error
+        """
+        results = self.detect_batch([image], imgsz)
+        return results[0] if results is not None else None
+
+    def detect_batch(self, images, imgsz=None):
+        """
+        Detect objects inside the regions of several images with batched crops
+
+        The crops of all images are run together; the inference size is the
+        longest crop side (rounded to the model stride), capped by imgsz, so small
+        regions are not upscaled to the full model input.
+
+        Args:
+            images: List of RGB images (numpy arrays)
+            imgsz: Maximum inference size, None for the model default
+
+        Returns:
+            list: One Detections per image in full-image coordinates, or None on error
+        """
+        crops = []
+        owners = []
+        for index, image in enumerate(images):
+            height, width = image.shape[:2]
+            for x1, y1, x2, y2 in self.pixel_boxes(width, height):
+                crops.append(image[y1:y2, x1:x2])
+                owners.append((index, x1, y1))
+
+        if not crops:
+            return [Detections.empty(self.model.class_names) for _ in images]
+
+        longest = max(max(crop.shape[:2]) for crop in crops)
+        size = max(32, -(-longest // 32) * 32)
+        size = min(size, imgsz or self.model.inference_size())
+
+        crop_detections = self.model.detect_batch(crops, batch_size=self.batch_size, imgsz=size)
+        if crop_detections is None:
+            return None
+
+        grouped = [[] for _ in images]
+        for (index, x, y), detections in zip(owners, crop_detections):
+            if detections:
+                grouped[index].append(detections.translate(x, y))
+
+        results = []
+        for parts in grouped:
+            merged = Detections.concatenate(parts, class_names=self.model.class_names)
+            results.append(merged.nms(self.iou_threshold) if len(parts) > 1 else merged)
+        return results
+
+    def draw(self, frame, color=(255, 200, 0), thickness=2):
+        """Draw the region outlines on a frame (in place) and return it"""
+        height, width = frame.shape[:2]
+        for x1, y1, x2, y2 in self.pixel_boxes(width, height):
+            cv2.rectangle(frame, (x1, y1), (x2 - 1, y2 - 1), color, thickness)
+        return frame
@@ -0,0 +1,112 @@
+from PySide6.QtCore import Qt, QPoint, QRect
+from PySide6.QtGui import QPainter, QPen, QColor
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDialogButtonBox
+
+from module.image_utils import ImageUtils
+
+
+class RoiCanvas(QLabel):
+    """Image on which regions of interest are drawn with the mouse"""
+
+    def __init__(self, image, regions=None, max_width=960, max_height=540, parent=None):
+        super().__init__(parent)
+        pixmap = ImageUtils.cv_to_pixmap(image)
+        self.setPixmap(pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.setFixedSize(self.pixmap().size())
+        self.regions = list(regions or [])  # Normalized (x1, y1, x2, y2)
+        self._start = None
+        self._current = None
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._start = event.position().toPoint()
+            self._current = self._start
+
+    def mouseMoveEvent(self, event):
+        if self._start is not None:
+            self._current = event.position().toPoint()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self._start is None:
+            return
+        rect = QRect(self._start, event.position().toPoint()).normalized()
+        self._start = self._current = None
+        # Ignore clicks without drag
+        if rect.width() > 4 and rect.height() > 4:
+            width, height = self.width(), self.height()
+            self.regions.append((
+                max(0.0, rect.left() / width), max(0.0, rect.top() / height),
+                min(1.0, (rect.right() + 1) / width), min(1.0, (rect.bottom() + 1) / height)
+            ))
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        painter = QPainter(self)
+        painter.setPen(QPen(QColor(0, 200, 255), 2))
+        width, height = self.width(), self.height()
+        for x1, y1, x2, y2 in self.regions:
+            painter.drawRect(QRect(QPoint(int(x1 * width), int(y1 * height)),
+                                   QPoint(int(x2 * width) - 1, int(y2 * height) - 1)))
+        if self._start is not None:
+            painter.setPen(QPen(QColor(255, 200, 0), 2, Qt.DashLine))
+            painter.drawRect(QRect(self._start, self._current).normalized())
+        painter.end()
+
+
+class RoiDialog(QDialog):
+    def __init__(self, image, regions=None, parent=None):
+        super().__init__(parent)
+
+        # Thiết lập cửa sổ dialog
+        self.setWindowTitle("Vùng quan tâm (ROI)")
+        self.setModal(True)
+
+        layout = QVBoxLayout(self)
+
+        # Hướng dẫn
+        info_label = QLabel(
+            "Kéo chuột trên ảnh để vẽ vùng quan tâm. Chỉ các vùng này được đưa vào model.\n"
+            "Không có vùng nào = nhận diện trên toàn bộ khung hình."
+        )
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        # Ảnh để vẽ vùng
+        self.canvas = RoiCanvas(image, regions, parent=self)
+        layout.addWidget(self.canvas, alignment=Qt.AlignCenter)
+
+        # Nút xóa vùng
+        edit_layout = QHBoxLayout()
+        undo_button = QPushButton("Xóa vùng cuối")
+        undo_button.clicked.connect(self.remove_last_region)
+        clear_button = QPushButton("Xóa tất cả")
+        clear_button.clicked.connect(self.clear_regions)
+        edit_layout.addWidget(undo_button)
+        edit_layout.addWidget(clear_button)
+        edit_layout.addStretch()
+        layout.addLayout(edit_layout)
+
+        # Tạo button box
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel
+        )
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def remove_last_region(self):
+        """Xóa vùng được vẽ sau cùng"""
+        if self.canvas.regions:
+            self.canvas.regions.pop()
+            self.canvas.update()
+
+    def clear_regions(self):
+        """Xóa tất cả các vùng"""
+        self.canvas.regions.clear()
+        self.canvas.update()
+
+    def get_regions(self):
+        """Trả về danh sách vùng đã vẽ (tọa độ chuẩn hóa 0 - 1)"""
+        return [list(region) for region in self.canvas.regions]
@@ -0,0 +1,202 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class InferenceScheduler:
+    """
+    Dynamic batching of frames coming from several live streams.
+
+    Streams submit single frames; a dispatcher thread groups the pending frames
+    into micro-batches and runs them with one detect_batch() call. A batch is
+    flushed as soon as it holds max_batch frames or when the oldest frame has
+    waited max_wait seconds. Each stream receives its own Detections through a
+    Future.
+
+    Shared schedulers (shared()) are reference counted: each owner calls
+    release() when its streams stop or switch model, and the last release stops
+    the dispatcher and forgets the scheduler, so no model is kept alive by it.
+
+    Attributes:
+        model: YOLOModel used for inference
+        max_batch: Maximum number of frames per inference call
+        max_wait: Maximum time (seconds) a frame waits for the batch to fill
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, model, max_batch=8, max_wait=0.01):
+        """
+        Initialize the scheduler and start its dispatcher thread
+
+        Args:
+            model: YOLOModel used for inference
+            max_batch: Maximum number of frames per inference call
+            max_wait: Maximum wait for a batch to fill, in seconds
+        """
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait))
+        self._requests = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stream_stats = {}
+        self._batches = 0
+        self._batched_frames = 0
+        self._users = 0
+        self._submit_lock = threading.Lock()
+        self._running = True
+        self._dispatcher = threading.Thread(target=self._dispatch, name="InferenceScheduler", daemon=True)
+        self._dispatcher.start()
+
+    @classmethod
+    def shared(cls, model, max_batch=8, max_wait=0.01):
+        """
+        Return the scheduler shared by all streams using a model, creating it if needed
+
+        The batch size and wait deadline of an existing scheduler are updated.
+        Every call must be balanced by a call to release().
+        """
+        with cls._shared_lock:
+            scheduler = cls._shared.get(id(model))
+            if scheduler is None or scheduler.model is not model or not scheduler._running:
+                scheduler = cls(model, max_batch, max_wait)
+                cls._shared[id(model)] = scheduler
+            else:
+                scheduler.max_batch = max(1, int(max_batch))
+                scheduler.max_wait = max(0.0, float(max_wait))
+            scheduler._users += 1
+            return scheduler
+
+    def release(self):
+        """Give back a scheduler returned by shared(), closing it after its last user"""
+        with self._shared_lock:
+            self._users = max(0, self._users - 1)
+            if self._users:
+                return
+            if self._shared.get(id(self.model)) is self:
+                del self._shared[id(self.model)]
+        self.close()
+
+    def submit(self, image, stream_id=None, imgsz=None):
+        """
+        Queue a frame for inference
+
+        Args:
+            image: RGB image (numpy array)
+            stream_id: Identifier of the stream, used for the statistics
+            imgsz: Inference size, frames with different sizes are batched separately
+
+        Returns:
+            concurrent.futures.Future resolving to Detections (or None on error)
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._running:
+                self._requests.put((stream_id, image, imgsz, time.perf_counter(), future))
+                return future
+
+        # Closed (e.g. a stream still holding it after a model switch): run the frame directly
+        try:
+            future.set_result(self.model.detect(image, imgsz=imgsz))
+        except Exception as e:
+            print(f"Lỗi nhận diện: {e}")
+            future.set_result(None)
+        return future
+
+    def detect(self, image, stream_id=None, imgsz=None):
+        """Queue a frame and wait for its Detections"""
+        return self.submit(image, stream_id, imgsz).result()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or the deadline passes"""
+        batch = [self._requests.get()]
+        if batch[0] is None:
+            return None
+
+        deadline = batch[0][3] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Stop after this batch, the marker ends the dispatcher on the next collect
+                self._requests.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _dispatch(self):
+        """Dispatcher thread: run the collected micro-batches"""
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+
+            # Frames with different inference sizes cannot share a forward pass
+            groups = {}
+            for request in batch:
+                groups.setdefault(request[2], []).append(request)
+
+            for imgsz, requests in groups.items():
+                try:
+                    results = self.model.detect_batch(
+                        [request[1] for request in requests], batch_size=self.max_batch, imgsz=imgsz
+                    )
+                except Exception as e:
+                    print(f"Lỗi nhận diện theo lô: {e}")
+                    results = None
+                if results is None:
+                    results = [None] * len(requests)
+
+                done = time.perf_counter()
+                self._record_batch(requests, done)
+                for request, detections in zip(requests, results):
+                    request[4].set_result(detections)
+
+    def _record_batch(self, requests, done):
+        """Update the fill-rate and per-stream latency statistics"""
+        with self._stats_lock:
+            self._batches += 1
+            self._batched_frames += len(requests)
+            for stream_id, _, _, submitted, _ in requests:
+                stats = self._stream_stats.setdefault(stream_id, {'frames': 0, 'latency': None})
+                latency = done - submitted
+                stats['frames'] += 1
+                previous = stats['latency']
+                stats['latency'] = latency if previous is None else 0.9 * previous + 0.1 * latency
+
+    def get_stats(self):
+        """
+        Return the scheduler statistics
+
+        Returns:
+            dict: batches, mean batch size, fill rate (mean batch size / max_batch)
+                and per-stream frame count and smoothed latency in milliseconds
+        """
+        with self._stats_lock:
+            mean_batch = self._batched_frames / self._batches if self._batches else 0.0
+            return {
+                'batches': self._batches,
+                'mean_batch_size': mean_batch,
+                'fill_rate': mean_batch / self.max_batch,
+                'pending': self._requests.qsize(),
+                'streams': {
+                    stream_id: {
+                        'frames': stats['frames'],
+                        'latency_ms': (stats['latency'] or 0.0) * 1000
+                    }
+                    for stream_id, stats in self._stream_stats.items()
+                }
+            }
+
+    def close(self):
+        """Stop the dispatcher once the queued frames are processed"""
+        with self._submit_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._requests.put(None)
@@ -0,0 +1,330 @@
+import bisect
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import cv2
+
+from module.detections import Detections
+
+SIDECAR_NAME = "detections.jsonl"
+
+
+class SessionRecorder:
+    """
+    Record the detected frames of a camera session into video files plus a sidecar.
+
+    Frames are appended to a video container (MJPEG AVI by default, which seeks
+    frame-accurately) instead of three JPEG files per frame. Their detections go
+    to an append-only JSON Lines sidecar, one line per frame with its session
+    index, timestamp, source frame number and video location. Encoding and disk
+    access run on a background thread behind a bounded queue; when the queue is
+    full the new frame is dropped (and counted) so the pipeline never waits.
+
+    A video file is finalized at the end of each segment (finish_segment(), or
+    every segment_seconds of frames), so a session can be read back while
+    recording continues in a new segment.
+
+    Nothing per frame is kept in memory: records only live in the sidecar. The
+    retention limits of the session store apply here too (frame count, bytes
+    on disk, age); a finalized segment is deleted once all of its frames are
+    out of the limits, and the sidecar is rewritten without their lines.
+
+    Attributes:
+        directory: Folder holding the segments and the sidecar
+        fps: Frame rate stored in the video files
+        codec: FourCC of the video codec
+        max_frames: Maximum number of retained frames (0 = no limit)
+        max_bytes: Maximum size of the retained segments (0 = no limit)
+        max_age: Maximum age of a retained frame in seconds (0 = no limit)
+        retained: Number of recorded frames still on disk
+        evicted: Number of frames deleted by the retention limits
+        dropped: Number of frames dropped because the queue was full
+    """
+
+    def __init__(self, directory, fps=30.0, codec="MJPG", max_queue=64,
+                 max_frames=0, max_bytes=0, max_age=0, segment_seconds=60):
+        """
+        Initialize the recorder and start its writer thread
+
+        Args:
+            directory: Output folder (created if needed)
+            fps: Frame rate stored in the video files
+            codec: FourCC of the video codec ("MJPG", "mp4v", ...)
+            max_queue: Maximum number of frames waiting to be written
+            max_frames: Maximum number of retained frames (0 = no limit)
+            max_bytes: Maximum size of the retained segments (0 = no limit)
+            max_age: Maximum age of a retained frame in seconds (0 = no limit)
+            segment_seconds: Length of a segment, in seconds of frames at fps
+        """
+        self.directory = directory
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.codec = codec
+        self.extension = ".avi" if codec.upper() == "MJPG" else ".mp4"
+        self.max_frames = max(0, int(max_frames))
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_age = max(0.0, float(max_age))
+        self.segment_length = max(1, int(self.fps * segment_seconds))
+        self.retained = 0
+        self.evicted = 0
+        self.dropped = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._segment = 0
+        self._segment_frames = 0
+        self._segments = deque()  # Finalized segments: (segment, frames, last frame time, bytes)
+        self._bytes = 0
+        self._dead_lines = 0
+        self._writer = None
+        self._sidecar = open(os.path.join(directory, SIDECAR_NAME), 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._work, name="SessionRecorder", daemon=True)
+        self._thread.start()
+
+    def segment_path(self, segment):
+        """Path of the video file of a segment"""
+        return os.path.join(self.directory, f"segment_{segment:04d}{self.extension}")
+
+    def write(self, frame, detections, frame_id=None):
+        """
+        Queue a detected frame for recording
+
+        Args:
+            frame: RGB image (numpy array), must not be modified afterwards
+            detections: Detections of the frame
+            frame_id: Frame number in the source
+
+        Returns:
+            dict: The record of the frame, or None if it was dropped
+        """
+        with self._lock:
+            record = {
+                'session_index': self._next_index,
+                'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S_%f"),
+                'frame_id': frame_id,
+                'detections': detections
+            }
+            try:
+                self._queue.put_nowait(('frame', frame, record))
+            except queue.Full:
+                self.dropped += 1
+                return None
+            self._next_index += 1
+            return record
+
+    def finish_segment(self):
+        """Finalize the current video file; the next frame starts a new segment"""
+        self._queue.put(('segment', None, None))
+
+    def flush(self):
+        """Wait until every queued frame is written"""
+        self._queue.join()
+
+    def _work(self):
+        """Writer thread"""
+        while True:
+            kind, frame, record = self._queue.get()
+            try:
+                if kind == 'frame':
+                    self._write_frame(frame, record)
+                    if self._segment_frames >= self.segment_length:
+                        self._finish()
+                elif kind in ('segment', 'close'):
+                    self._finish()
+                self._enforce()
+            except Exception as e:
+                print(f"Error recording session frame: {e}")
+            finally:
+                self._queue.task_done()
+            if kind == 'close':
+                return
+
+    def _write_frame(self, frame, record):
+        """Append one frame to the current segment and its line to the sidecar"""
+        if self._writer is None:
+            height, width = frame.shape[:2]
+            self._writer = cv2.VideoWriter(
+                self.segment_path(self._segment), cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height)
+            )
+            if not self._writer.isOpened():
+                self._writer = None
+                raise RuntimeError(f"Cannot open video writer {self.segment_path(self._segment)}")
+
+        self._writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        line = {
+            'index': record['session_index'],
+            'timestamp': record['timestamp'],
+            'frame_id': record['frame_id'],
+            'segment': self._segment,
+            'segment_frame': self._segment_frames,
+            'detections': Detections.coerce(record['detections']).to_list()
+        }
+        self._segment_frames += 1
+        self._last_frame_time = time.time()
+        self.retained += 1
+        self._sidecar.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._sidecar.flush()
+
+    def _finish(self):
+        """Finalize the current video file, the next frame starts a new segment"""
+        if self._writer is None:
+            return
+        self._writer.release()
+        self._writer = None
+        try:
+            size = os.path.getsize(self.segment_path(self._segment))
+        except OSError:
+            size = 0
+        self._segments.append((self._segment, self._segment_frames, self._last_frame_time, size))
+        self._bytes += size
+        self._segment += 1
+        self._segment_frames = 0
+
+    def _over_limit(self, frames, last_time):
+        """Whether the oldest finalized segment (frames, last frame time) is out of the limits"""
+        if self.max_frames and self.retained - frames >= self.max_frames:
+            return True
+        if self.max_age and time.time() - last_time > self.max_age:
+            return True
+        return bool(self.max_bytes) and self._bytes > self.max_bytes
+
+    def _enforce(self):
+        """Delete the oldest segments whose frames are all out of the retention limits"""
+        while self._segments and self._over_limit(*self._segments[0][1:3]):
+            segment, frames, _, size = self._segments.popleft()
+            try:
+                os.remove(self.segment_path(segment))
+            except OSError as e:
+                print(f"Error removing session segment: {e}")
+            self._bytes -= size
+            self.retained -= frames
+            self.evicted += frames
+            self._dead_lines += frames
+
+        # Rewrite the sidecar once it is mostly made of deleted frames
+        if self._dead_lines > 1000 and self._dead_lines > self.retained:
+            self._compact()
+
+    def _compact(self):
+        """Drop the lines of deleted segments from the sidecar"""
+        first_segment = self._segments[0][0] if self._segments else self._segment
+        sidecar_path = os.path.join(self.directory, SIDECAR_NAME)
+        temp_path = sidecar_path + ".tmp"
+        self._sidecar.close()
+        with open(sidecar_path, 'r', encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as target:
+            for line in source:
+                try:
+                    if json.loads(line)['segment'] >= first_segment:
+                        target.write(line)
+                except json.JSONDecodeError:
+                    continue
+        os.replace(temp_path, sidecar_path)
+        self._sidecar = open(sidecar_path, 'a', encoding='utf-8')
+        self._dead_lines = 0
+
+    def close(self):
+        """Write the queued frames, finalize the video file and close the sidecar"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(('close', None, None))
+        self._thread.join()
+        self._sidecar.close()
+
+    def get_stats(self):
+        """Return the number of retained, queued, dropped and evicted frames"""
+        return {
+            'recorded_frames': self.retained,
+            'recorder_queue_depth': self._queue.qsize(),
+            'recorder_dropped': self.dropped,
+            'recorder_evicted': self.evicted
+        }
+
+
+class SessionReader:
+    """
+    Read back a session written by SessionRecorder.
+
+    The sidecar is loaded into an index by session index and timestamp; frames
+    are decoded on demand from their segment, seeking only when the requested
+    frame is not the next one.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.records = []
+        self._captures = {}
+        self._next_frame = {}
+
+        sidecar_path = os.path.join(directory, SIDECAR_NAME)
+        if os.path.exists(sidecar_path):
+            with open(sidecar_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        self.records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Last line of an interrupted session
+                        break
+        self._segments = {
+            int(os.path.basename(path)[len("segment_"):].split('.')[0]): path
+            for path in glob.glob(os.path.join(directory, "segment_*"))
+        }
+        # Lines of segments deleted by the retention limits and not compacted yet
+        self.records = [record for record in self.records if record['segment'] in self._segments]
+        self.records.sort(key=lambda record: record['index'])
+        self._by_index = {record['index']: record for record in self.records}
+        self._timestamps = [record['timestamp'] for record in self.records]
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, index):
+        """Sidecar entry of a session index, with its detections as Detections and its 'session_index'"""
+        record = dict(self._by_index[index])
+        record['detections'] = Detections.from_list(record['detections'])
+        record['session_index'] = index
+        return record
+
+    def index_at(self, timestamp):
+        """Session index of the last frame recorded at or before a timestamp ("%Y%m%d_%H%M%S_%f")"""
+        position = bisect.bisect_right(self._timestamps, timestamp) - 1
+        return self.records[max(0, position)]['index'] if self.records else None
+
+    def frame(self, index):
+        """
+        Decode the frame of a session index
+
+        Returns:
+            RGB image (numpy array), or None if it cannot be read
+        """
+        record = self._by_index.get(index)
+        if record is None or record['segment'] not in self._segments:
+            return None
+
+        segment = record['segment']
+        capture = self._captures.get(segment)
+        if capture is None:
+            capture = cv2.VideoCapture(self._segments[segment])
+            self._captures[segment] = capture
+            self._next_frame[segment] = 0
+        if self._next_frame[segment] != record['segment_frame']:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, record['segment_frame'])
+
+        ok, frame = capture.read()
+        if not ok:
+            self._next_frame[segment] = -1
+            return None
+        self._next_frame[segment] = record['segment_frame'] + 1
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def close(self):
+        """Release the open video files"""
+        for capture in self._captures.values():
+            capture.release()
+        self._captures.clear()
@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from module.detections import Detections
+
+SPILL_NAME = "spill.jsonl"
+FILE_KEYS = ('original_path', 'binding_box_path', 'warmup_path')
+
+
+class SessionStore:
+    """
+    Bounded store of the frames saved during a camera session.
+
+    Entries are the frame_info dicts of DetectionThread.save_temp_frame() (image
+    paths, timestamp and Detections). The most recent memory_frames entries are
+    kept in memory as a ring buffer; older ones are spilled to an append-only
+    JSON Lines file and only a small (sequence, time, paths) tuple stays in
+    memory. Retention limits (frame count, bytes on disk, age) evict the oldest
+    entries and delete their image files, so memory and disk usage stay flat for
+    sessions of any length. A limit of 0 disables it.
+
+    Entries added with pending=True have files still queued in a writer: their
+    size is counted once written() is called, and if they are evicted before
+    that, their files are deleted when the write completes instead of being
+    left behind as orphans.
+
+    Attributes:
+        directory: Folder of the spill file
+        max_frames: Maximum number of retained frames
+        max_bytes: Maximum size of the retained image files
+        max_age: Maximum age of a retained frame, in seconds
+        memory_frames: Number of recent entries kept in memory
+        evicted: Number of entries removed by the retention limits
+    """
+
+    def __init__(self, directory, max_frames=0, max_bytes=0, max_age=0, memory_frames=64):
+        self.directory = directory
+        self.max_frames = max(0, int(max_frames))
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_age = max(0.0, float(max_age))
+        self.memory_frames = max(1, int(memory_frames))
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    @classmethod
+    def from_settings(cls, directory, settings):
+        """Create the store with the retention limits of the application settings"""
+        return cls(
+            directory,
+            max_frames=settings.session_max_frames,
+            max_bytes=settings.session_max_mb * 1024 * 1024,
+            max_age=settings.session_max_age_s,
+            memory_frames=settings.session_memory_frames
+        )
+
+    def _reset_state(self):
+        self.evicted = 0
+        self._sequence = 0
+        self._recent = deque()  # (sequence, added, frame_info)
+        self._spilled = deque()  # (sequence, added, paths)
+        self._sizes = {}  # sequence -> bytes on disk, once the files are written
+        self._bytes = 0
+        self._pending = {}  # id(frame_info) -> sequence, files still queued for writing
+        self._orphans = {}  # sequence -> paths of evicted entries still queued for writing
+        self._dead_lines = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._recent) + len(self._spilled)
+
+    @property
+    def spill_path(self):
+        return os.path.join(self.directory, SPILL_NAME)
+
+    @staticmethod
+    def _paths(frame_info):
+        return [frame_info[key] for key in FILE_KEYS if frame_info.get(key)]
+
+    @staticmethod
+    def _size(paths):
+        """Size on disk of the image files of an entry"""
+        size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    @staticmethod
+    def _delete(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def add(self, frame_info, pending=False):
+        """
+        Store a new frame and apply the retention limits
+
+        Args:
+            frame_info: Frame entry with its image paths and detections
+            pending: True if the image files are still queued for writing (see written())
+        """
+        with self._lock:
+            sequence = self._sequence
+            self._sequence += 1
+            if pending:
+                self._pending[id(frame_info)] = sequence
+            else:
+                self._account(sequence, self._paths(frame_info))
+
+            self._recent.append((sequence, time.time(), frame_info))
+            while len(self._recent) > self.memory_frames:
+                self._spill(*self._recent.popleft())
+            self._enforce()
+
+    def written(self, frame_info):
+        """Count the size of a pending entry once its files are on disk"""
+        with self._lock:
+            sequence = self._pending.pop(id(frame_info), None)
+            if sequence is None:
+                return
+            orphan = self._orphans.pop(sequence, None)
+            if orphan is not None:
+                # Evicted while queued: the write just recreated the files
+                self._delete(orphan)
+                return
+            self._account(sequence, self._paths(frame_info))
+            self._enforce()
+
+    def remove(self, frame_info):
+        """
+        Forget a frame whose files were never written (the writer discarded it)
+
+        Returns:
+            bool: True if the frame was still stored
+        """
+        with self._lock:
+            sequence = self._pending.pop(id(frame_info), None)
+            if sequence is None or self._orphans.pop(sequence, None) is not None:
+                return False
+            for index, (entry_sequence, _, _) in enumerate(self._recent):
+                if entry_sequence == sequence:
+                    del self._recent[index]
+                    return True
+            for index, (entry_sequence, _, _) in enumerate(self._spilled):
+                if entry_sequence == sequence:
+                    # Its spill file line is skipped from now on and dropped on compaction
+                    del self._spilled[index]
+                    self._dead_lines += 1
+                    return True
+        return False
+
+    def _account(self, sequence, paths):
+        size = self._size(paths)
+        self._sizes[sequence] = size
+        self._bytes += size
+
+    def _spill(self, sequence, added, frame_info):
+        """Move an entry from memory to the spill file"""
+        line = {key: value for key, value in frame_info.items() if key != 'detections'}
+        line['sequence'] = sequence
+        line['detections'] = Detections.coerce(frame_info.get('detections')).to_list()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.spill_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._spilled.append((sequence, added, self._paths(frame_info)))
+
+    def _over_limit(self, now):
+        count = len(self._recent) + len(self._spilled)
+        if not count:
+            return False
+        if self.max_frames and count > self.max_frames:
+            return True
+        oldest = self._spilled[0][1] if self._spilled else self._recent[0][1]
+        if self.max_age and now - oldest > self.max_age:
+            return True
+        return bool(self.max_bytes) and self._bytes > self.max_bytes
+
+    def _enforce(self):
+        """Evict the oldest entries until every retention limit is met"""
+        now = time.time()
+        while self._over_limit(now):
+            if self._spilled:
+                sequence, _, paths = self._spilled.popleft()
+                self._dead_lines += 1
+            else:
+                sequence, _, info = self._recent.popleft()
+                paths = self._paths(info)
+
+            if sequence in self._sizes:
+                self._bytes -= self._sizes.pop(sequence)
+                self._delete(paths)
+            else:
+                # Not written yet: deleting now would leave the late write behind
+                self._orphans[sequence] = paths
+            self.evicted += 1
+
+        # Rewrite the spill file once it is mostly made of evicted lines
+        if self._dead_lines > 1000 and self._dead_lines > len(self._spilled):
+            self._compact()
+
+    def _read_spilled(self):
+        """Yield the spill file lines of the retained entries"""
+        if not self._spilled or not os.path.exists(self.spill_path):
+            return
+        retained = {entry[0] for entry in self._spilled}
+        with open(self.spill_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry['sequence'] in retained:
+                    yield entry
+
+    def _compact(self):
+        """Drop the evicted lines from the spill file"""
+        temp_path = self.spill_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for entry in self._read_spilled():
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.spill_path)
+        self._dead_lines = 0
+
+    def entries(self):
+        """
+        Return every retained frame, oldest first
+
+        Returns:
+            list: frame_info dicts, spilled entries read back with Detections objects
+        """
+        with self._lock:
+            entries = []
+            for entry in self._read_spilled():
+                entry.pop('sequence', None)
+                entry['detections'] = Detections.from_list(entry['detections'])
+                entries.append(entry)
+            entries.extend(info for _, _, info in self._recent)
+            return entries
+
+    def clear(self, directory=None):
+        """
+        Forget every entry and remove the spill file (image files are left to the caller)
+
+        Args:
+            directory: New folder for the spill file, None to keep the current one
+        """
+        with self._lock:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            if directory is not None:
+                self.directory = directory
+            self._reset_state()
+
+    def get_stats(self):
+        """
+        Return the store usage
+
+        Returns:
+            dict: retained, in-memory and spilled frame counts, evicted frames and
+                size of the retained image files in MB
+        """
+        with self._lock:
+            return {
+                'stored_frames': len(self._recent) + len(self._spilled),
+                'memory_frames': len(self._recent),
+                'spilled_frames': len(self._spilled),
+                'evicted_frames': self.evicted,
+                'stored_mb': self._bytes / (1024 * 1024)
+            }
@@ -0,0 +1,165 @@
+import numpy as np
+
+from module.detections import Detections, non_max_suppression
+
+
+class SlicedInference:
+    """
+    Sliced (tiled) inference for images much larger than the model input.
+
+    The image is cut into overlapping tiles (views, no copies) that are run in
+    batches of batch_size images per forward pass. When the model has a replica
+    pool, the batches are spread over the replicas and run in parallel. Boxes are
+    shifted back to full-image coordinates and the duplicates found in several
+    tiles are removed with class-aware NMS. Only the boxes reaching into an
+    overlap band go through the NMS: a box inside the part of its tile no other
+    tile covers cannot have a duplicate.
+
+    Attributes:
+        model: YOLOModel used for inference
+        tile_size: Tile width and height in pixels
+        overlap: Fraction of the tile shared with its neighbours (0 - 0.9)
+        batch_size: Number of tiles per inference call
+        iou_threshold: IoU above which cross-tile duplicates are merged
+    """
+
+    def __init__(self, model, tile_size=1024, overlap=0.2, batch_size=8, iou_threshold=0.5):
+        """
+        Initialize the slicer
+
+        Args:
+            model: YOLOModel used for inference
+            tile_size: Tile width and height in pixels
+            overlap: Fraction of the tile shared with its neighbours
+            batch_size: Number of tiles per inference call
+            iou_threshold: IoU threshold of the cross-tile NMS
+        """
+        self.model = model
+        self.tile_size = max(32, int(tile_size))
+        self.overlap = min(max(float(overlap), 0.0), 0.9)
+        self.batch_size = max(1, int(batch_size))
+        self.iou_threshold = iou_threshold
+
+    @classmethod
+    def from_settings(cls, model, settings):
+        """
+        Create a slicer from the application settings
+
+        Returns:
+            SlicedInference, or None when sliced inference is disabled
+        """
+        if not getattr(settings, 'sliced_inference', False):
+            return None
+
+        return cls(
+            model,
+            tile_size=settings.tile_size,
+            overlap=settings.tile_overlap,
+            batch_size=settings.tile_batch_size or settings.batch_size
+        )
+
+    def _axis_offsets(self, length):
+        """Tile start positions along one axis, the last tile is aligned to the border"""
+        if length <= self.tile_size:
+            return [0]
+
+        stride = max(1, int(self.tile_size * (1 - self.overlap)))
+        offsets = list(range(0, length - self.tile_size, stride))
+        offsets.append(length - self.tile_size)
+        return offsets
+
+    def _exclusive_bounds(self, length):
+        """{offset: (start, end)} of the part of each tile along one axis not covered by its neighbours"""
+        offsets = self._axis_offsets(length)
+        return {
+            offset: (
+                offsets[index - 1] + self.tile_size if index > 0 else 0,
+                offsets[index + 1] if index + 1 < len(offsets) else length
+            )
+            for index, offset in enumerate(offsets)
+        }
+
+    def tile_offsets(self, width, height):
+        """
+        Compute the top-left corners of the tiles covering an image
+
+        Args:
+            width: Image width
+            height: Image height
+
+        Returns:
+            list: [(x, y), ...]
+        """
+        return [(x, y) for y in self._axis_offsets(height) for x in self._axis_offsets(width)]
+
+    def detect(self, image):
+        """
+        Detect objects on a large image tile by tile
+
+        Images that fit in one tile are passed to the model directly.
+
+        Args:
+            image: RGB image (numpy array)
+
+        Returns:
+            Detections in full-image coordinates, or None on error
+        """
+        height, width = image.shape[:2]
+        if width <= self.tile_size and height <= self.tile_size:
+            return self.model.detect(image)
+
+        offsets = self.tile_offsets(width, height)
+        tiles = [image[y:y + self.tile_size, x:x + self.tile_size] for x, y in offsets]
+
+        tile_detections = self._detect_tiles(tiles)
+        if tile_detections is None:
+            return None
+
+        x_bounds = self._exclusive_bounds(width)
+        y_bounds = self._exclusive_bounds(height)
+        parts = []
+        border = []
+        for (x, y), detections in zip(offsets, tile_detections):
+            if not detections:
+                continue
+            shifted = detections.translate(x, y)
+            (x_start, x_end), (y_start, y_end) = x_bounds[x], y_bounds[y]
+            boxes = shifted.xyxy
+            border.append(~(
+                (boxes[:, 0] >= x_start) & (boxes[:, 2] <= x_end) & (boxes[:, 1] >= y_start) & (boxes[:, 3] <= y_end)
+            ))
+            parts.append(shifted)
+
+        merged = Detections.concatenate(parts, class_names=self.model.class_names)
+        if not parts:
+            return merged
+
+        # Cross-tile duplicates can only be found among the boxes in the overlap bands
+        border = np.concatenate(border)
+        candidates = np.flatnonzero(border)
+        kept = np.concatenate([
+            np.flatnonzero(~border),
+            candidates[non_max_suppression(
+                merged.xyxy[candidates], merged.confidence[candidates], merged.class_id[candidates], self.iou_threshold
+            )]
+        ])
+        return merged.subset(kept[np.argsort(-merged.confidence[kept], kind='stable')])
+
+    def _detect_tiles(self, tiles):
+        """Run the tiles in batches, in parallel over the replica pool when there is one"""
+        pool = getattr(self.model, 'pool', None)
+        if pool is None:
+            return self.model.detect_batch(tiles, batch_size=self.batch_size)
+
+        futures = [
+            pool.submit('detect_batch', tiles[start:start + self.batch_size], batch_size=self.batch_size)
+            for start in range(0, len(tiles), self.batch_size)
+        ]
+        results = []
+        for future in futures:
+            detections = future.result()
+            if detections is None:
+                return None
+            results.extend(detections)
+        return results
+
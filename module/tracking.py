@@ -0,0 +1,211 @@
+import numpy as np
+
+from module.detections import Detections, box_iou
+
+
+class BoxTracker:
+    """
+    Lightweight multi-object tracker (IoU association + constant-velocity Kalman filter).
+
+    Every track keeps the center, width and height of its box together with their
+    velocities. The four coordinates are filtered independently, so the state of
+    all tracks is held in a few NumPy arrays and predicted / corrected with
+    vectorized operations. Detections are associated to the predicted tracks
+    greedily by IoU (boxes of different classes are never matched) and keep the
+    id of their track, new objects start a new track.
+
+    Between two inferences, predict() extrapolates the boxes of the tracks seen in
+    the last inference so the overlay follows the objects on skipped frames.
+
+    Attributes:
+        iou_threshold: Minimum IoU between a predicted box and a detection to match them
+        max_age: Number of frames a track survives without being detected
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=30):
+        """
+        Initialize the tracker
+
+        Args:
+            iou_threshold: Minimum IoU to associate a detection to a track
+            max_age: Frames without detection after which a track is dropped
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max(1, int(max_age))
+        self.reset()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Create a tracker from the application settings
+
+        Returns:
+            BoxTracker, or None when tracking is disabled
+        """
+        if not getattr(settings, 'tracking', False):
+            return None
+
+        return cls(iou_threshold=settings.track_iou_threshold, max_age=settings.track_max_age)
+
+    def reset(self):
+        """Drop every track and restart the ids"""
+        self.frame_id = None
+        self.next_id = 1
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.class_id = np.zeros(0, dtype=np.int32)
+        self.confidence = np.zeros(0, dtype=np.float32)
+        self.last_seen = np.zeros(0, dtype=np.int64)
+        self.position = np.zeros((0, 4), dtype=np.float64)  # cx, cy, w, h
+        self.velocity = np.zeros((0, 4), dtype=np.float64)  # per frame
+        self.covariance = np.zeros((0, 4, 3), dtype=np.float64)  # P00, P01, P11 per coordinate
+        self.class_names = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _to_state(xyxy):
+        """Convert (N, 4) xyxy boxes to (N, 4) center / size"""
+        xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+        size = xyxy[:, 2:] - xyxy[:, :2]
+        return np.hstack([xyxy[:, :2] + size / 2, size])
+
+    @staticmethod
+    def _to_xyxy(state):
+        """Convert (N, 4) center / size to xyxy boxes"""
+        half = np.maximum(state[:, 2:], 1.0) / 2
+        return np.hstack([state[:, :2] - half, state[:, :2] + half]).astype(np.float32)
+
+    def _noise(self):
+        """Process and measurement noise variances, proportional to the box size"""
+        scale = np.maximum(self.position[:, 2:], 1.0).mean(axis=1, keepdims=True)
+        return (0.05 * scale) ** 2, (0.01 * scale) ** 2, (0.1 * scale) ** 2
+
+    def _extrapolate(self, frame_id):
+        """Return the positions and covariances of all tracks predicted to frame_id"""
+        dt = 0 if self.frame_id is None else max(0, frame_id - self.frame_id)
+        position = self.position + self.velocity * dt
+        covariance = self.covariance.copy()
+        if dt and len(self.ids):
+            q_position, q_velocity, _ = self._noise()
+            p00, p01, p11 = (self.covariance[..., k] for k in range(3))
+            covariance[..., 0] = p00 + 2 * dt * p01 + dt * dt * p11 + q_position * dt
+            covariance[..., 1] = p01 + dt * p11
+            covariance[..., 2] = p11 + q_velocity * dt
+        return position, covariance
+
+    def predict(self, frame_id):
+        """
+        Predict the boxes of the tracks detected in the last update
+
+        Does not change the tracker state, so it can be called for every displayed
+        frame between two inferences.
+
+        Args:
+            frame_id: Index of the frame to predict
+
+        Returns:
+            Detections with tracker_id set
+        """
+        visible = self.last_seen == self.frame_id
+        if self.frame_id is None or not visible.any():
+            return Detections.empty(self.class_names)
+
+        position, _ = self._extrapolate(frame_id)
+        return Detections(
+            self._to_xyxy(position[visible]),
+            self.confidence[visible],
+            self.class_id[visible],
+            self.class_names,
+            tracker_id=self.ids[visible]
+        )
+
+    def _associate(self, predicted_xyxy, detections):
+        """Greedy class-aware IoU matching, returns (track_indices, detection_indices)"""
+        if not len(predicted_xyxy) or not len(detections):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        iou = box_iou(predicted_xyxy, detections.xyxy)
+        iou[self.class_id[:, None] != detections.class_id[None, :]] = 0.0
+        iou[iou < self.iou_threshold] = 0.0
+
+        tracks, matches = [], []
+        while True:
+            track, detection = np.unravel_index(np.argmax(iou), iou.shape)
+            if iou[track, detection] <= 0:
+                break
+            tracks.append(track)
+            matches.append(detection)
+            iou[track, :] = 0.0
+            iou[:, detection] = 0.0
+        return np.asarray(tracks, dtype=np.int64), np.asarray(matches, dtype=np.int64)
+
+    def update(self, detections, frame_id):
+        """
+        Associate the detections of an inferred frame to the tracks and correct them
+
+        Args:
+            detections: Detections of the frame
+            frame_id: Index of the frame (frames are counted by the capture loop)
+
+        Returns:
+            Detections with the same boxes and a tracker_id per box
+        """
+        detections = Detections.coerce(detections)
+        self.class_names = detections.class_names or self.class_names
+
+        # Advance every track to the frame of the detections
+        self.position, self.covariance = self._extrapolate(frame_id)
+        self.frame_id = frame_id if self.frame_id is None else max(self.frame_id, frame_id)
+
+        tracks, matched = self._associate(self._to_xyxy(self.position), detections)
+
+        # Kalman correction of the matched tracks (the measurement is the box itself)
+        if len(tracks):
+            _, _, r = self._noise()
+            r = r[tracks]
+            p00, p01, p11 = (self.covariance[tracks, :, k] for k in range(3))
+            gain_position = p00 / (p00 + r)
+            gain_velocity = p01 / (p00 + r)
+            innovation = self._to_state(detections.xyxy[matched]) - self.position[tracks]
+            self.position[tracks] += gain_position * innovation
+            self.velocity[tracks] += gain_velocity * innovation
+            self.covariance[tracks, :, 0] = (1 - gain_position) * p00
+            self.covariance[tracks, :, 1] = (1 - gain_position) * p01
+            self.covariance[tracks, :, 2] = p11 - gain_velocity * p01
+            self.confidence[tracks] = detections.confidence[matched]
+            self.last_seen[tracks] = self.frame_id
+
+        tracker_id = np.zeros(len(detections), dtype=np.int64)
+        tracker_id[matched] = self.ids[tracks]
+
+        # Start a track for every unmatched detection
+        new = np.setdiff1d(np.arange(len(detections)), matched)
+        if len(new):
+            new_ids = np.arange(self.next_id, self.next_id + len(new))
+            self.next_id += len(new)
+            tracker_id[new] = new_ids
+            state = self._to_state(detections.xyxy[new])
+            scale = np.maximum(state[:, 2:], 1.0).mean(axis=1, keepdims=True)
+            covariance = np.zeros((len(new), 4, 3))
+            covariance[..., 0] = (0.1 * scale) ** 2
+            covariance[..., 2] = (0.1 * scale) ** 2
+
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.class_id = np.concatenate([self.class_id, detections.class_id[new]])
+            self.confidence = np.concatenate([self.confidence, detections.confidence[new]])
+            self.last_seen = np.concatenate([self.last_seen, np.full(len(new), self.frame_id)])
+            self.position = np.vstack([self.position, state])
+            self.velocity = np.vstack([self.velocity, np.zeros_like(state)])
+            self.covariance = np.concatenate([self.covariance, covariance])
+
+        # Forget the tracks that have not been detected for too long
+        alive = self.frame_id - self.last_seen <= self.max_age
+        if not alive.all():
+            for name in ('ids', 'class_id', 'confidence', 'last_seen', 'position', 'velocity', 'covariance'):
+                setattr(self, name, getattr(self, name)[alive])
+
+        return Detections(
+            detections.xyxy, detections.confidence, detections.class_id, detections.class_names,
+            tracker_id=tracker_id
+        )
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("ultralytics")  # module.backends, which provides file_hash, imports it
+
+from module.detection_cache import DetectionCache
+from module.detections import Detections
+
+
+class WeightsModel:
+    """Model attributes read by DetectionCache.model_key()"""
+
+    def __init__(self, model_path, **load_options):
+        self.model_path = model_path
+        self.load_options = load_options
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DetectionCache(str(tmp_path / "detections.sqlite"))
+    yield cache
+    cache.close()
+
+
+def _write(path, content):
+    with open(path, 'wb') as file:
+        file.write(content)
+    return str(path)
+
+
+def test_put_get_round_trip(cache):
+    detections = Detections([[1, 2, 3, 4], [5, 6, 7, 8]], [0.5, 0.25], [0, 3])
+    cache.put('image', 'model', detections)
+
+    cached = cache.get('image', 'model', {3: 'car'})
+    np.testing.assert_array_equal(cached.xyxy, detections.xyxy)
+    np.testing.assert_array_equal(cached.class_id, [0, 3])
+    assert cached.labels.tolist() == ['0', 'car']
+
+
+def test_miss_and_empty_hit(cache):
+    assert cache.get('image', 'model') is None
+    cache.put('image', 'model', Detections.empty())
+    hit = cache.get('image', 'model')
+    assert hit is not None and len(hit) == 0
+
+
+def test_content_hash_follows_file_content(cache, tmp_path):
+    path = _write(tmp_path / "a.jpg", b'first')
+    copy = _write(tmp_path / "b.jpg", b'first')
+    assert cache.content_hash(path) == cache.content_hash(copy)
+
+    before = cache.content_hash(path)
+    _write(path, b'second content')
+    os.utime(path, ns=(1, 1))
+    assert cache.content_hash(path) != before
+
+
+def test_model_key_changes_with_weights_and_settings(cache, tmp_path):
+    weights = _write(tmp_path / "model.pt", b'weights')
+    model = WeightsModel(weights, imgsz=640)
+    key = cache.model_key(model)
+
+    assert cache.model_key(model) == key
+    assert cache.model_key(WeightsModel(weights, imgsz=320)) != key
+    assert cache.model_key(model, tile_size=512) != key
+
+    _write(weights, b'retrained weights')
+    os.utime(weights, ns=(1, 1))
+    assert cache.model_key(model) != key
@@ -0,0 +1,74 @@
+import numpy as np
+
+from module import detections as detections_module
+from module.detections import Detections, box_iou, non_max_suppression
+
+
+def _reference_nms(boxes, scores, class_ids, iou_threshold):
+    """Plain per-class greedy NMS used as the expected result"""
+    keep = []
+    for index in np.argsort(-scores, kind='stable'):
+        if all(
+            class_ids[index] != class_ids[kept] or box_iou(boxes[index], boxes[kept])[0, 0] <= iou_threshold
+            for kept in keep
+        ):
+            keep.append(index)
+    return np.array(keep, dtype=np.int64)
+
+
+def _random_boxes(count, seed=0):
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0, 500, size=(count, 2))
+    sizes = rng.uniform(10, 80, size=(count, 2))
+    boxes = np.hstack([corners, corners + sizes]).astype(np.float32)
+    scores = rng.uniform(0.1, 1.0, size=count).astype(np.float32)
+    class_ids = rng.integers(0, 3, size=count)
+    return boxes, scores, class_ids
+
+
+def test_box_iou():
+    iou = box_iou([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    np.testing.assert_allclose(iou, [[1.0, 1 / 3, 0.0]], rtol=1e-6)
+
+
+def test_nms_matches_reference():
+    boxes, scores, class_ids = _random_boxes(300)
+    keep = non_max_suppression(boxes, scores, class_ids, 0.5)
+    np.testing.assert_array_equal(keep, _reference_nms(boxes, scores, class_ids, 0.5))
+
+
+def test_nms_never_suppresses_other_classes():
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 10]], dtype=np.float32)
+    keep = non_max_suppression(boxes, [0.9, 0.8], [0, 1], 0.5)
+    np.testing.assert_array_equal(keep, [0, 1])
+
+
+def test_nms_linear_memory_path_matches_matrix_path(monkeypatch):
+    boxes, scores, class_ids = _random_boxes(200, seed=1)
+    expected = non_max_suppression(boxes, scores, class_ids, 0.4)
+    monkeypatch.setattr(detections_module, 'NMS_MATRIX_LIMIT', 8)
+    np.testing.assert_array_equal(non_max_suppression(boxes, scores, class_ids, 0.4), expected)
+
+
+def test_nms_empty():
+    assert len(non_max_suppression(np.zeros((0, 4)), np.zeros(0))) == 0
+
+
+def test_list_round_trip():
+    detections = Detections([[1, 2, 30, 40]], [0.75], [2], {2: 'car'})
+    items = detections.to_list()
+    assert items == [{'bbox': (1, 2, 30, 40), 'confidence': 0.75, 'class': 'car', 'class_id': 2}]
+
+    restored = Detections.from_list(items)
+    np.testing.assert_array_equal(restored.xyxy, detections.xyxy)
+    assert restored.class_names == {2: 'car'}
+
+
+def test_translate_scale_and_subset():
+    detections = Detections([[0, 0, 10, 10], [5, 5, 20, 20]], [0.9, 0.5], [0, 1])
+    np.testing.assert_array_equal(detections.translate(100, 50).xyxy[0], [100, 50, 110, 60])
+    np.testing.assert_array_equal(detections.scale(2.0).xyxy[1], [10, 10, 40, 40])
+
+    subset = detections[detections.confidence > 0.6]
+    assert len(subset) == 1
+    assert subset.class_counts() == {'0': 1}
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("ultralytics")
+
+from module import detection_thread, folder_engine
+from module.detection_cache import DetectionCache
+from module.detection_thread import DetectionThread
+from module.detections import Detections
+from module.folder_engine import FolderEngine
+
+
+class CountingModel:
+    """Stand-in YOLOModel returning one box per image and counting the images it runs"""
+
+    def __init__(self, model_path):
+        self.model = object()
+        self.model_path = model_path
+        self.load_options = {}
+        self.class_names = {0: 'object'}
+        self.last_error = None
+        self.inferred = 0
+
+    def inference_size(self):
+        return 640
+
+    def detect_batch(self, images, batch_size=8, imgsz=None):
+        self.inferred += len(images)
+        return [Detections([[1, 1, 5, 5]], [0.9], [0], self.class_names) for _ in images]
+
+
+@pytest.fixture
+def folder(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_bytes(b'weights')
+    paths = []
+    for index in range(5):
+        path = str(tmp_path / f"image_{index}.png")
+        cv2.imwrite(path, np.full((16, 16, 3), index * 40, dtype=np.uint8))
+        paths.append(path)
+
+    cache = DetectionCache(str(tmp_path / "detections.sqlite"))
+    yield CountingModel(str(weights)), paths, cache
+    cache.close()
+
+
+def _run_thread(model, paths, cache):
+    thread = DetectionThread(0, model=model)
+    thread.cache = cache
+    thread.static_image_paths = list(paths)
+    thread.static_batch_size = 2
+    thread.running = True
+    results = []
+    thread.static_detection_complete_signal.connect(results.append)
+    thread.process_static_batch()
+    return thread, results
+
+
+def test_thread_rerun_skips_decoding_and_rendering(folder, monkeypatch):
+    model, paths, cache = folder
+    _, first = _run_thread(model, paths, cache)
+    assert model.inferred == 5 and all('binding_box_frame' in result for result in first)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hits must not be decoded")
+
+    monkeypatch.setattr(detection_thread.cv2, 'imread', fail)
+    thread, second = _run_thread(model, paths, cache)
+
+    assert model.inferred == 5
+    assert thread.cache_hits == 5
+    assert [result['image_path'] for result in second] == paths
+    assert all(result['cached'] and 'binding_box_frame' not in result for result in second)
+
+
+def test_thread_only_infers_changed_images(folder):
+    model, paths, cache = folder
+    _run_thread(model, paths, cache)
+    cv2.imwrite(paths[2], np.full((16, 16, 3), 255, dtype=np.uint8))
+
+    thread, _ = _run_thread(model, paths, cache)
+    assert model.inferred == 6
+    assert thread.cache_hits == 4
+
+
+def test_engine_resolves_every_hit_without_a_process_pool(folder, monkeypatch):
+    model, paths, cache = folder
+    _run_thread(model, paths, cache)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no worker process is needed when every image is cached")
+
+    monkeypatch.setattr(folder_engine, 'ProcessPoolExecutor', no_pool)
+    engine = FolderEngine(model, paths, workers=2, batch_size=2, cache=cache)
+    finished = []
+    errors = []
+    engine.finished_signal.connect(finished.append)
+    engine.error_signal.connect(errors.append)
+    engine.run()
+
+    assert not errors
+    assert engine.cache_hits == 5
+    assert [image_path for image_path, _ in finished[0]] == paths
@@ -0,0 +1,69 @@
+import os
+
+from module.detections import Detections
+from module.session_store import SessionStore
+
+
+def _frame(directory, index, size=100):
+    path = os.path.join(directory, f"frame_{index}.jpg")
+    with open(path, 'wb') as file:
+        file.write(b'\0' * size)
+    return {
+        'timestamp': str(index),
+        'original_path': path,
+        'detections': Detections([[0, 0, 10, 10]], [0.5], [0], {0: 'person'})
+    }
+
+
+def test_entries_come_back_in_order_after_spilling(tmp_path):
+    store = SessionStore(str(tmp_path / "store"), memory_frames=2)
+    for index in range(5):
+        store.add(_frame(str(tmp_path), index))
+
+    entries = store.entries()
+    assert [entry['timestamp'] for entry in entries] == ['0', '1', '2', '3', '4']
+    assert isinstance(entries[0]['detections'], Detections)
+    assert store.get_stats()['spilled_frames'] == 3
+
+
+def test_frame_limit_evicts_and_deletes_files(tmp_path):
+    store = SessionStore(str(tmp_path / "store"), max_frames=3, memory_frames=2)
+    frames = [_frame(str(tmp_path), index) for index in range(6)]
+    for frame in frames:
+        store.add(frame)
+
+    assert [entry['timestamp'] for entry in store.entries()] == ['3', '4', '5']
+    assert store.evicted == 3
+    assert [os.path.exists(frame['original_path']) for frame in frames] == [False] * 3 + [True] * 3
+
+
+def test_byte_limit(tmp_path):
+    store = SessionStore(str(tmp_path / "store"), max_bytes=250)
+    for index in range(5):
+        store.add(_frame(str(tmp_path), index, size=100))
+    assert len(store) == 2
+    assert store.get_stats()['stored_mb'] * 1024 * 1024 == 200
+
+
+def test_evicted_pending_frame_is_deleted_once_written(tmp_path):
+    store = SessionStore(str(tmp_path / "store"), max_frames=1)
+    pending = _frame(str(tmp_path), 0)
+    os.remove(pending['original_path'])  # still queued in the writer
+
+    store.add(pending, pending=True)
+    store.add(_frame(str(tmp_path), 1))
+    assert len(store) == 1
+
+    # The writer now creates the file of the evicted frame
+    with open(pending['original_path'], 'wb') as file:
+        file.write(b'\0')
+    store.written(pending)
+    assert not os.path.exists(pending['original_path'])
+
+
+def test_dropped_pending_frame_is_forgotten(tmp_path):
+    store = SessionStore(str(tmp_path / "store"))
+    pending = _frame(str(tmp_path), 0)
+    store.add(pending, pending=True)
+    assert store.remove(pending)
+    assert len(store) == 0
@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+
+from module.detections import Detections
+from module.slicing import SlicedInference
+
+
+class BlobModel:
+    """Stand-in model reporting every white blob fully inside an image as one box"""
+    class_names = {0: 'blob'}
+    pool = None
+
+    def detect(self, image):
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images, batch_size=8):
+        results = []
+        for image in images:
+            height, width = image.shape[:2]
+            count, _, stats, _ = cv2.connectedComponentsWithStats((image[..., 0] > 0).astype(np.uint8))
+            boxes = [
+                [x, y, x + w, y + h] for x, y, w, h, _ in stats[1:count]
+                if x > 0 and y > 0 and x + w < width and y + h < height
+            ]
+            results.append(Detections(boxes, [0.9] * len(boxes), [0] * len(boxes), self.class_names))
+        return results
+
+
+def _image(width, height, blobs):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    for x1, y1, x2, y2 in blobs:
+        image[y1:y2, x1:x2] = 255
+    return image
+
+
+def test_tiles_cover_the_image():
+    slicer = SlicedInference(BlobModel(), tile_size=100, overlap=0.5)
+    offsets = slicer.tile_offsets(250, 100)
+    assert offsets == [(0, 0), (50, 0), (100, 0), (150, 0)]
+
+
+def test_small_image_skips_tiling():
+    slicer = SlicedInference(BlobModel(), tile_size=100)
+    detections = slicer.detect(_image(80, 80, [(10, 10, 30, 30)]))
+    np.testing.assert_array_equal(detections.xyxy, [[10, 10, 30, 30]])
+
+
+def test_duplicates_in_overlap_are_merged():
+    # The first blob is seen whole by the tiles at x=0 and x=50, the second only by x=100
+    slicer = SlicedInference(BlobModel(), tile_size=100, overlap=0.5)
+    detections = slicer.detect(_image(200, 100, [(60, 10, 90, 40), (160, 60, 190, 90)]))
+
+    boxes = sorted(detections.xyxy.tolist())
+    assert boxes == [[60, 10, 90, 40], [160, 60, 190, 90]]
+
+
+class FirstTileModel(BlobModel):
+    """Stand-in model returning two overlapping boxes in the first tile only"""
+
+    def detect_batch(self, images, batch_size=8):
+        boxes = [[5, 5, 30, 30], [8, 8, 33, 33]]
+        first = Detections(boxes, [0.9, 0.8], [0, 0], self.class_names)
+        return [first] + [Detections.empty(self.class_names) for _ in images[1:]]
+
+
+def test_interior_boxes_are_kept_without_nms():
+    # Boxes in the part of a tile no other tile covers cannot be cross-tile duplicates
+    slicer = SlicedInference(FirstTileModel(), tile_size=100, overlap=0.5)
+    detections = slicer.detect(np.zeros((100, 200, 3), dtype=np.uint8))
+    assert len(detections) == 2
@@ -0,0 +1,46 @@
+import numpy as np
+
+from module.detections import Detections
+from module.tracking import BoxTracker
+
+
+def _box(x, y, class_id=0):
+    return Detections([[x, y, x + 40, y + 40]], [0.9], [class_id], {0: 'person', 1: 'car'})
+
+
+def test_ids_follow_a_moving_object():
+    tracker = BoxTracker(iou_threshold=0.3)
+    ids = [tracker.update(_box(100 + 5 * frame, 100), frame).tracker_id[0] for frame in range(10)]
+    assert ids == [1] * 10
+
+
+def test_new_object_gets_a_new_id():
+    tracker = BoxTracker()
+    tracker.update(_box(0, 0), 0)
+    tracked = tracker.update(Detections.concatenate([_box(2, 0), _box(300, 300)]), 1)
+    np.testing.assert_array_equal(tracked.tracker_id, [1, 2])
+
+
+def test_classes_are_never_matched():
+    tracker = BoxTracker()
+    tracker.update(_box(0, 0, class_id=0), 0)
+    assert tracker.update(_box(0, 0, class_id=1), 1).tracker_id[0] == 2
+
+
+def test_predict_extrapolates_between_inferences():
+    tracker = BoxTracker()
+    for frame in range(0, 20, 2):
+        tracker.update(_box(10 * frame, 0), frame)
+
+    predicted = tracker.predict(19)
+    assert predicted.tracker_id.tolist() == [1]
+    # Moving 10 px per frame: the box keeps going right after the last update at frame 18
+    assert predicted.xyxy[0, 0] > tracker.predict(18).xyxy[0, 0]
+
+
+def test_reset_restarts_ids():
+    tracker = BoxTracker()
+    tracker.update(_box(0, 0), 0)
+    tracker.reset()
+    assert len(tracker) == 0
+    assert tracker.update(_box(0, 0), 0).tracker_id[0] == 1